@@ -0,0 +1,155 @@
+"""
+Lightweight HTTP client for FoodHub backend checks
+Talks to the Express API directly over pooled keep-alive connections
+instead of rendering JSON responses in a browser
+"""
+import json
+import time
+
+import urllib3
+
+from impact_index import EndpointRecorder
+
+
+class ApiError(Exception):
+    """Backend answered with an unexpected status code"""
+
+    def __init__(self, response):
+        super().__init__(
+            f"{response.method} {response.url} returned {response.status}: {response.text[:200]}"
+        )
+        self.response = response
+
+
+class ApiResponse:
+    """Status, headers and decoded body of one API call"""
+
+    def __init__(self, method, url, raw, elapsed_ms):
+        self.method = method
+        self.url = url
+        self.status = raw.status
+        self.headers = raw.headers
+        self.body = raw.data
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def text(self):
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ApiError(self)
+        return self
+
+
+class ApiClient:
+    """
+    Client for the routes in backend/server.js and backend/routes
+    Method names follow src/services/api.js
+    """
+
+    def __init__(self, base_url, timeout=5.0, maxsize=10):
+        self.base_url = base_url.rstrip("/")
+        # One pool per host; connections are reused across calls and tests
+        self.http = urllib3.PoolManager(
+            maxsize=maxsize,
+            block=False,
+            retries=False,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        )
+
+    def request(self, method, path, body=None):
+        """Send a request to a path such as /api/restaurants"""
+        url = f"{self.base_url}{path}"
+        if EndpointRecorder.active is not None:
+            EndpointRecorder.active.note(method, url)
+        payload = json.dumps(body).encode() if body is not None else None
+        start = time.perf_counter()
+        raw = self.http.request(method, url, body=payload)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return ApiResponse(method, url, raw, elapsed_ms)
+
+    def get(self, path):
+        return self.request("GET", path)
+
+    def post(self, path, body=None):
+        return self.request("POST", path, body)
+
+    def put(self, path, body=None):
+        return self.request("PUT", path, body)
+
+    def patch(self, path, body=None):
+        return self.request("PATCH", path, body)
+
+    def delete(self, path):
+        return self.request("DELETE", path)
+
+    def _json(self, method, path, body=None):
+        return self.request(method, path, body).raise_for_status().json()
+
+    # Health check
+    def health(self):
+        """Parsed /health payload: status, timestamp, uptime, database"""
+        return self._json("GET", "/health")
+
+    # User APIs
+    def login(self, email):
+        return self._json("POST", "/api/users/login", {"email": email})
+
+    def register(self, user):
+        return self._json("POST", "/api/users", user)
+
+    def get_all_users(self):
+        return self._json("GET", "/api/users")
+
+    def delete_user(self, user_id):
+        return self._json("DELETE", f"/api/users/{user_id}")
+
+    # Restaurant APIs
+    def get_all_restaurants(self):
+        return self._json("GET", "/api/restaurants")
+
+    def get_restaurant(self, restaurant_id):
+        return self._json("GET", f"/api/restaurants/{restaurant_id}")
+
+    def create_restaurant(self, restaurant):
+        return self._json("POST", "/api/restaurants", restaurant)
+
+    # Menu APIs
+    def get_all_menu_items(self):
+        return self._json("GET", "/api/menu")
+
+    def get_menu_items_by_restaurant(self, restaurant_id):
+        return self._json("GET", f"/api/menu/restaurant/{restaurant_id}")
+
+    def create_menu_item(self, menu_item):
+        return self._json("POST", "/api/menu", menu_item)
+
+    def delete_menu_item(self, menu_item_id):
+        return self._json("DELETE", f"/api/menu/{menu_item_id}")
+
+    # Order APIs
+    def get_all_orders(self):
+        return self._json("GET", "/api/orders")
+
+    def create_order(self, order):
+        return self._json("POST", "/api/orders", order)
+
+    def get_orders_by_customer(self, customer_id):
+        return self._json("GET", f"/api/orders/customer/{customer_id}")
+
+    def get_orders_by_restaurant(self, restaurant_id):
+        return self._json("GET", f"/api/orders/restaurant/{restaurant_id}")
+
+    def update_order_status(self, order_id, status):
+        return self._json("PATCH", f"/api/orders/{order_id}/status", {"status": status})
+
+    def get_order_stats(self):
+        return self._json("GET", "/api/orders/stats/overview")
+
+    def close(self):
+        self.http.clear()
@@ -0,0 +1,174 @@
+"""
+Background screenshot writer
+Screenshots are captured on the test thread (WebDriver is not thread-safe)
+and handed to a small thread pool that deduplicates, optionally re-encodes
+and downscales them, and writes them within a per-run size budget.
+
+Pillow is optional: without it frames are deduplicated only when they are
+byte-identical and always written as PNG.
+"""
+import hashlib
+import io
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+POLICIES = ("failure", "every", "sampled", "off")
+FORMATS = {"png": ("PNG", ".png"), "jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+
+# dHash grid: 16x16 = 256 bits, fine enough to tell apart pages with the same layout
+HASH_SIZE = 16
+# Frames whose difference hashes differ in fewer bits are treated as the same
+DUPLICATE_DISTANCE = 8
+# Step captures kept per test for the "failure" policy
+PENDING_STEPS = 5
+
+
+def difference_hash(image, size=HASH_SIZE):
+    """dHash: brightness gradients of a (size+1) x size grayscale thumbnail"""
+    width = size + 1
+    pixels = list(image.convert("L").resize((width, size)).getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * width + col]
+            bits = (bits << 1) | (left > pixels[row * width + col + 1])
+    return bits
+
+
+class ArtifactWriter:
+    """
+    Writes screenshots off the test thread
+
+    policy decides which step captures are kept:
+      failure - steps of a test are held in memory and written only if it fails
+      every   - every step is written
+      sampled - each step is written with probability sample_rate
+      off     - nothing is written
+    A final frame is always captured for failed tests unless the policy is off.
+    Frames of a failed test are never dropped as duplicates: an earlier test
+    may have left the same page on screen.
+    """
+
+    # Writer used by TestHelpers.take_screenshot, set up by conftest
+    active = None
+
+    def __init__(self, directory, policy="failure", sample_rate=0.1, budget_bytes=200 * 1024 * 1024,
+                 image_format="png", max_width=None, quality=80, workers=2, seed=0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown screenshot policy {policy!r}, expected one of {POLICIES}")
+        self.directory = directory
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.budget_bytes = budget_bytes
+        self.image_format = image_format if Image is not None else "png"
+        self.max_width = max_width if Image is not None else None
+        self.quality = quality
+        self.random = random.Random(seed)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        self.lock = threading.Lock()
+        self.pending = []
+        self.hashes = []
+        self.stats = {"written": 0, "duplicates": 0, "over_budget": 0, "bytes": 0, "errors": 0}
+
+    @staticmethod
+    def _grab(driver):
+        driver = getattr(driver, "wrapped_driver", driver)
+        try:
+            return driver.get_screenshot_as_png()
+        except Exception as e:
+            print(f"Screenshot failed: {e}")
+            return None
+
+    def capture(self, driver, name):
+        """A step screenshot; kept or dropped according to the policy"""
+        if self.policy == "off":
+            return
+        if self.policy == "sampled" and self.random.random() >= self.sample_rate:
+            return
+        png = self._grab(driver)
+        if png is None:
+            return
+        if self.policy == "failure":
+            self.pending = (self.pending + [(name, png)])[-PENDING_STEPS:]
+        else:
+            self.submit(name, png)
+
+    def test_finished(self, driver, name, failed):
+        """End of a test: on failure write its held steps and a final frame"""
+        pending, self.pending = self.pending, []
+        if not failed or self.policy == "off":
+            return
+        for step_name, png in pending:
+            self.submit(step_name, png, dedup=False)
+        png = self._grab(driver) if driver is not None else None
+        if png is not None:
+            self.submit(f"{name}_failure", png, dedup=False)
+
+    def submit(self, name, png, dedup=True):
+        """Hand a PNG to the writer threads"""
+        self.executor.submit(self._write, name, png, dedup)
+
+    def _is_duplicate(self, png, image):
+        if image is not None:
+            fingerprint = difference_hash(image)
+            with self.lock:
+                if any(bin(fingerprint ^ seen).count("1") < DUPLICATE_DISTANCE for seen in self.hashes):
+                    return True
+                self.hashes.append(fingerprint)
+            return False
+        fingerprint = hashlib.sha1(png).digest()
+        with self.lock:
+            if fingerprint in self.hashes:
+                return True
+            self.hashes.append(fingerprint)
+        return False
+
+    def _encode(self, png, image):
+        """PNG bytes re-encoded and downscaled as configured"""
+        if image is None or (self.image_format == "png" and not self.max_width):
+            return png
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height))
+        pil_format = FORMATS[self.image_format][0]
+        if pil_format == "JPEG":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, pil_format, quality=self.quality)
+        return out.getvalue()
+
+    def _write(self, name, png, dedup=True):
+        try:
+            image = Image.open(io.BytesIO(png)) if Image is not None else None
+            if dedup and self._is_duplicate(png, image):
+                with self.lock:
+                    self.stats["duplicates"] += 1
+                return
+            data = self._encode(png, image)
+            with self.lock:
+                if self.stats["bytes"] + len(data) > self.budget_bytes:
+                    self.stats["over_budget"] += 1
+                    return
+                self.stats["bytes"] += len(data)
+                self.stats["written"] += 1
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name + FORMATS[self.image_format][1])
+            with open(path, "wb") as f:
+                f.write(data)
+        except Exception as e:
+            with self.lock:
+                self.stats["errors"] += 1
+            print(f"Writing screenshot {name} failed: {e}")
+
+    def close(self):
+        """Wait for pending writes; returns the stats"""
+        self.executor.shutdown(wait=True)
+        return dict(self.stats)
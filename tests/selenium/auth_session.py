@@ -0,0 +1,191 @@
+"""
+Logged-in browser state for role-based tests
+Logs each role in once per run and replays the resulting localStorage
+and cookies into fresh pages, so tests can open CustomerModule,
+RestaurantModule or AdminModule routes without going through Login.js
+"""
+import json
+from urllib.parse import urlsplit
+
+from selenium.webdriver.common.by import By
+
+import locator
+from api_client import ApiError
+from impact_index import EndpointRecorder
+from test_helpers import TestHelpers, TestData
+
+
+ROLE_USERS = {
+    "customer": TestData.CUSTOMER_USER,
+    "restaurant": TestData.RESTAURANT_USER,
+    "admin": TestData.ADMIN_USER,
+}
+
+# Key written by contexts/UserContext.js
+USER_STORAGE_KEY = "currentUser"
+
+# Runs before any app script on every document of the tab. The token in
+# sessionStorage makes it apply once, so a logout inside the test sticks.
+_INJECT_SCRIPT = """
+(function () {
+    var token = %(token)s;
+    if (location.origin !== %(origin)s || sessionStorage.getItem('__authInjected') === token) {
+        return;
+    }
+    var items = %(items)s;
+    localStorage.clear();
+    Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });
+    sessionStorage.setItem('__authInjected', token);
+})();
+"""
+
+
+class SessionState:
+    """localStorage entries and cookies of one logged-in role"""
+
+    def __init__(self, role, user, local_storage, cookies=()):
+        self.role = role
+        self.user = user
+        self.local_storage = local_storage
+        self.cookies = list(cookies)
+
+
+class AuthSessionCache:
+    """
+    One login per role and run, replayed into any number of pages
+
+    via="api" logs in with POST /api/users/login (registering the test
+    user first if it does not exist yet) and builds the state UserContext
+    would store. via="ui" drives Login.js once in a browser borrowed from
+    acquire_browser/release_browser and captures localStorage and cookies.
+    """
+
+    def __init__(self, api_client, base_url, via="api", acquire_browser=None, release_browser=None):
+        self.api = api_client
+        self.base_url = base_url.rstrip("/")
+        self.origin = "{0.scheme}://{0.netloc}".format(urlsplit(self.base_url))
+        self.via = via
+        self.acquire_browser = acquire_browser
+        self.release_browser = release_browser
+        self._states = {}
+        self._injections = 0
+
+    def state(self, role):
+        """Cached SessionState for a role, logging in on first use"""
+        if role not in self._states:
+            if self.via == "ui":
+                self._states[role] = self._login_ui(role)
+            else:
+                self._states[role] = self._login_api(role)
+        if EndpointRecorder.active is not None:
+            # Even when cached, the login is a dependency of the calling test
+            EndpointRecorder.active.note("POST", "/api/users/login")
+        return self._states[role]
+
+    def _login_api(self, role):
+        test_user = ROLE_USERS[role]
+        try:
+            user = self.api.login(test_user["email"])
+        except ApiError as e:
+            if e.response.status != 404:
+                raise
+            user = self.api.register({
+                "name": test_user["username"],
+                "email": test_user["email"],
+                "phone": "555-0100",
+                "role": role,
+            })
+        return SessionState(role, user, {USER_STORAGE_KEY: json.dumps(user)})
+
+    def _login_ui(self, role):
+        test_user = ROLE_USERS[role]
+        driver = self.acquire_browser()
+        try:
+            TestHelpers.open_page(driver, self.base_url + "/")
+            driver.find_element(By.CSS_SELECTOR, "input[type='email']").send_keys(test_user["email"])
+            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+
+            if not self._wait_logged_in(driver):
+                # Unknown user: Login.js shows an error, register instead
+                driver.find_element(By.XPATH, "//button[normalize-space()='Register']").click()
+                locator.find(driver, By.CSS_SELECTOR, "input[type='tel']", timeout=5)
+                driver.find_element(By.CSS_SELECTOR, "input[type='text']").send_keys(test_user["username"])
+                driver.find_element(By.CSS_SELECTOR, "input[type='tel']").send_keys("555-0100")
+                driver.execute_script(
+                    "var select = document.querySelector('select');"
+                    "var setter = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;"
+                    "setter.call(select, arguments[0]);"
+                    "select.dispatchEvent(new Event('change', {bubbles: true}));",
+                    role,
+                )
+                email = driver.find_element(By.CSS_SELECTOR, "input[type='email']")
+                email.clear()
+                email.send_keys(test_user["email"])
+                driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+                if not self._wait_logged_in(driver):
+                    raise RuntimeError(f"Could not log in or register {test_user['email']} through the UI")
+
+            local_storage = driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < localStorage.length; i++) {"
+                "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                "}"
+                "return items;"
+            )
+            cookies = driver.get_cookies()
+        finally:
+            self.release_browser(driver)
+        user = json.loads(local_storage[USER_STORAGE_KEY])
+        return SessionState(role, user, local_storage, cookies)
+
+    @staticmethod
+    def _wait_logged_in(driver, timeout=5):
+        """True once UserContext has saved the user, False if Login.js shows an error"""
+        # Either the role's module header or the login error shows up
+        locator.find_all(
+            driver, By.XPATH,
+            "//header | //*[contains(text(), 'User not found')]", timeout=timeout
+        )
+        return bool(driver.execute_script(f"return localStorage.getItem('{USER_STORAGE_KEY}');"))
+
+    def inject(self, driver, role, path="/"):
+        """Open base_url + path already logged in as role; returns the user"""
+        state = self.state(role)
+        raw = getattr(driver, "wrapped_driver", driver)
+        self._injections += 1
+        try:
+            # A second inject in the same tab replaces the first role
+            previous = getattr(raw, "_auth_script", None)
+            if previous:
+                try:
+                    raw.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                                        {"identifier": previous})
+                except Exception:
+                    pass
+            raw._auth_script = raw.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": _INJECT_SCRIPT % {
+                    "token": json.dumps(f"{role}:{self._injections}"),
+                    "origin": json.dumps(self.origin),
+                    "items": json.dumps(state.local_storage),
+                }
+            })["identifier"]
+            for cookie in state.cookies:
+                raw.execute_cdp_cmd("Network.setCookie", self._cdp_cookie(cookie))
+        except Exception:
+            # Without CDP: open the origin once and write the storage there
+            TestHelpers.open_page(driver, self.base_url + "/", require_root=False, network_idle=False)
+            for key, value in state.local_storage.items():
+                driver.execute_script("localStorage.setItem(arguments[0], arguments[1]);", key, value)
+            for cookie in state.cookies:
+                driver.add_cookie(cookie)
+        TestHelpers.open_page(driver, self.base_url + path)
+        return state.user
+
+    def _cdp_cookie(self, cookie):
+        params = {"url": self.origin, "name": cookie["name"], "value": cookie["value"]}
+        for key in ("domain", "path", "secure", "httpOnly", "sameSite"):
+            if key in cookie:
+                params[key] = cookie[key]
+        if "expiry" in cookie:
+            params["expires"] = cookie["expiry"]
+        return params
@@ -0,0 +1,198 @@
+"""
+Session-scoped pool of warm Chrome instances for Selenium tests
+Browsers are reset between tests instead of being relaunched
+"""
+import queue
+import threading
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+
+from dom_snapshot import DomSnapshot
+from driver_resolver import browser_path
+from performance_log import PerformanceLog
+
+
+DEFAULT_WINDOW_SIZE = (1920, 1080)
+# Off: lookups wait explicitly where needed (see locator.py)
+DEFAULT_IMPLICIT_WAIT = 0
+
+
+def build_chrome_options():
+    """
+    Chrome options with headless mode for CI/CD compatibility
+    Works with Chrome, Chromium, and Brave browsers
+    """
+    chrome_options = Options()
+
+    # Headless mode - required for Jenkins/AWS EC2
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=%d,%d" % DEFAULT_WINDOW_SIZE)
+
+    # Additional options for stability
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # CDP events (network activity etc.) for readiness checks
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    # Use system Chromium in Docker; the same binary ChromeDriverResolver matches
+    binary = browser_path()
+    if binary:
+        chrome_options.binary_location = binary
+
+    return chrome_options
+
+
+def launch_chrome(driver_path=None):
+    """
+    Start a new headless Chrome WebDriver
+    driver_path comes from ChromeDriverResolver; without it Selenium
+    looks for a driver on its own
+    """
+    chrome_options = build_chrome_options()
+
+    # No fixed ports: chromedriver and Chrome each pick a free one per
+    # launch, so parallel workers and extra browsers never collide
+    service = Service(driver_path) if driver_path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+
+    driver.implicitly_wait(DEFAULT_IMPLICIT_WAIT)
+    return driver
+
+
+def _origin(url):
+    """Scheme and host part of a URL, or None for about:blank, data: etc."""
+    parts = urlsplit(url or "")
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class BrowserPool:
+    """
+    Pool of warm browsers shared by every test in a session
+
+    acquire() hands out an idle browser (launching one if the pool is not
+    full yet) and release() resets it so the next test starts clean.
+    A browser that cannot be reset is quit and replaced on demand.
+    """
+
+    def __init__(self, size=1, origins=(), factory=launch_chrome):
+        self.size = max(1, size)
+        self.origins = {o for o in map(_origin, origins) if o}
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._browsers = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Get a ready-to-use browser, blocking if all are busy"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            launch = len(self._browsers) < self.size
+            if launch:
+                # Reserve the slot before the slow launch
+                self._browsers.append(None)
+
+        if not launch:
+            return self._idle.get()
+
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._lock:
+                self._browsers.remove(None)
+            raise
+        with self._lock:
+            self._browsers[self._browsers.index(None)] = driver
+        return driver
+
+    def release(self, driver):
+        """Reset a browser and return it to the pool"""
+        try:
+            self.reset(driver)
+        except Exception as e:
+            print(f"Browser reset failed, replacing it: {e}")
+            self.discard(driver)
+            return
+        self._idle.put(driver)
+
+    def discard(self, driver):
+        """Quit a browser and free its slot"""
+        with self._lock:
+            if driver in self._browsers:
+                self._browsers.remove(driver)
+        PerformanceLog.forget(driver)
+        DomSnapshot.invalidate(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def reset(self, driver):
+        """
+        Bring a browser back to a clean state
+        Clears cookies and web storage, closes extra tabs, restores window size
+        """
+        origins = set(self.origins)
+        handles = driver.window_handles
+        for handle in handles:
+            driver.switch_to.window(handle)
+            origin = _origin(driver.current_url)
+            if origin:
+                origins.add(origin)
+
+        # A brand new tab also drops sessionStorage, which lives per tab
+        driver.switch_to.new_window("tab")
+        fresh_tab = driver.current_window_handle
+        for handle in handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_tab)
+
+        self._clear_storage(driver, origins)
+        PerformanceLog.for_driver(driver).clear()
+        DomSnapshot.invalidate(driver)
+
+        size = driver.get_window_size()
+        if (size["width"], size["height"]) != DEFAULT_WINDOW_SIZE:
+            driver.set_window_size(*DEFAULT_WINDOW_SIZE)
+        driver.implicitly_wait(DEFAULT_IMPLICIT_WAIT)
+
+    @staticmethod
+    def _clear_storage(driver, origins):
+        """Remove cookies and localStorage for every origin the test visited"""
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in origins:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": origin,
+                    "storageTypes": "cookies,local_storage,indexeddb,service_workers,cache_storage",
+                })
+        except Exception:
+            # Non-Chromium driver: only the current page can be cleared
+            driver.delete_all_cookies()
+
+    def close(self):
+        """Quit every browser in the pool"""
+        with self._lock:
+            browsers = [d for d in self._browsers if d is not None]
+            self._browsers = []
+        for driver in browsers:
+            PerformanceLog.forget(driver)
+            DomSnapshot.invalidate(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,167 @@
+"""
+Per-command WebDriver timing
+Times every WebDriver command and time.sleep call of the running test,
+grouped into navigation, lookups, scripts, interaction, screenshots and
+so on, plus a session-wide list of the slowest individual commands
+"""
+import heapq
+import sys
+import threading
+import time
+
+
+CATEGORIES = {
+    "get": "navigation",
+    "goBack": "navigation",
+    "goForward": "navigation",
+    "refresh": "navigation",
+    "findElement": "lookup",
+    "findElements": "lookup",
+    "findChildElement": "lookup",
+    "findChildElements": "lookup",
+    "w3cExecuteScript": "script",
+    "w3cExecuteScriptAsync": "script",
+    "clickElement": "interaction",
+    "sendKeysToElement": "interaction",
+    "clearElement": "interaction",
+    "actions": "interaction",
+    "screenshot": "screenshot",
+    "elementScreenshot": "screenshot",
+    "executeCdpCommand": "cdp",
+    "getLog": "cdp",
+    "newWindow": "window",
+    "switchToWindow": "window",
+    "close": "window",
+    "setWindowRect": "window",
+}
+
+# Sleeps inside these modules are explicit waits polling for a condition
+_WAIT_MODULES = ("selenium.webdriver.support.wait", "locator", "test_helpers")
+
+
+def _detail(command, params):
+    """Short description of a command for the slowest-commands list"""
+    if command == "get":
+        return params.get("url", "")
+    if command.startswith("find"):
+        return f"{params.get('using')}={params.get('value')}"
+    if command.startswith("w3cExecuteScript"):
+        return " ".join(params.get("script", "").split())[:60]
+    if command == "executeCdpCommand":
+        return params.get("cmd", "")
+    return ""
+
+
+class CommandTimings:
+    """
+    Collects timings for one test at a time
+
+    install() wraps a driver's execute method once; time.sleep is patched
+    for the whole session by patch_sleep(). Only the thread that started
+    the current test is measured, so background threads (loaders, load
+    generators) do not leak into a test's breakdown. Recording is a
+    perf_counter call and a dict update per command.
+    """
+
+    def __init__(self, slowest=10):
+        self.slowest = slowest
+        self.top = []            # heap of (ms, sequence, test, command, detail)
+        self._sequence = 0
+        self.test = None
+        self._thread = None
+        self.breakdown = {}
+        self._real_sleep = None
+
+    def install(self, driver):
+        """Time every command sent through this driver (idempotent)"""
+        driver = getattr(driver, "wrapped_driver", driver)
+        if getattr(driver, "_command_timings", None) is self:
+            return driver
+        execute = driver.execute
+
+        def timed_execute(command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                self.record(CATEGORIES.get(command, "other"), command,
+                            (time.perf_counter() - start) * 1000, params)
+
+        driver.execute = timed_execute
+        driver._command_timings = self
+        return driver
+
+    def patch_sleep(self):
+        """Replace time.sleep so sleeps count towards the running test"""
+        self._real_sleep = real_sleep = time.sleep
+
+        def timed_sleep(seconds):
+            start = time.perf_counter()
+            try:
+                real_sleep(seconds)
+            finally:
+                module = _caller_module()
+                category = "wait" if module.startswith(_WAIT_MODULES) else "sleep"
+                self.record(category, "sleep", (time.perf_counter() - start) * 1000,
+                            {"module": module})
+
+        time.sleep = timed_sleep
+
+    def unpatch_sleep(self):
+        if self._real_sleep is not None:
+            time.sleep = self._real_sleep
+            self._real_sleep = None
+
+    def begin(self, test):
+        """Start attributing commands to a test"""
+        self.test = test
+        self._thread = threading.get_ident()
+        self.breakdown = {}
+
+    def add(self, category, ms):
+        """Time measured outside WebDriver, e.g. browser startup"""
+        self.record(category, category, ms)
+
+    def record(self, category, command, ms, params=None):
+        if self.test is None or threading.get_ident() != self._thread:
+            return
+        entry = self.breakdown.setdefault(category, [0, 0.0])
+        entry[0] += 1
+        entry[1] += ms
+        if category == "wait":
+            # Polling intervals of explicit waits, already summed above
+            return
+        if category == "sleep":
+            detail = (params or {}).get("module", "")
+        else:
+            detail = _detail(command, params or {})
+        self._sequence += 1
+        item = (ms, self._sequence, self.test, command, detail)
+        if len(self.top) < self.slowest:
+            heapq.heappush(self.top, item)
+        elif ms > self.top[0][0]:
+            heapq.heapreplace(self.top, item)
+
+    def end(self):
+        """Stop recording; returns {category: {"count", "total_ms"}}"""
+        self.test = None
+        breakdown, self.breakdown = self.breakdown, {}
+        return {
+            category: {"count": count, "total_ms": round(total, 1)}
+            for category, (count, total) in sorted(
+                breakdown.items(), key=lambda kv: kv[1][1], reverse=True
+            )
+        }
+
+    def slowest_commands(self):
+        """Slowest individual commands of the session, slowest first"""
+        return [
+            {"ms": round(ms, 1), "test": test, "command": command, "detail": detail}
+            for ms, _, test, command, detail in sorted(self.top, reverse=True)
+        ]
+
+
+def _caller_module():
+    """Module that called time.sleep (two frames up from timed_sleep)"""
+    frame = sys._getframe(2)
+    return frame.f_globals.get("__name__", "")
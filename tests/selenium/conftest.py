@@ -2,76 +2,664 @@
 Pytest configuration file for Selenium tests
 Provides shared fixtures and setup for all test cases
 """
-import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import functools
+import json
+import os
+import re
 import time
 
+import pytest
+from selenium.webdriver.support.events import EventFiringWebDriver
+
+from api_client import ApiClient
+from artifact_writer import FORMATS, POLICIES, ArtifactWriter
+from auth_session import AuthSessionCache
+from browser_pool import BrowserPool, launch_chrome
+from command_timing import CommandTimings
+from data_factory import ApiLoader, DataFactory, MongoLoader, Scale, run_nonce
+from db_profiler import MongoProfiler
+from dom_snapshot import DomSnapshot
+from impact_index import IMPACT_DIR, EndpointRecorder
+from locator import LookupMonitor
+from network_audit import audit, format_waterfall
+from driver_resolver import ChromeDriverResolver
+from page_benchmark import NETWORK_PROFILES
+from js_coverage import COVERAGE_DIR, CoverageRecorder, JsCoverage, write_reports
+from page_metrics import ListenerChain, PageMetricsCollector, attach_page_metrics
+from perf_baseline import DEFAULT_DB, PerfBaseline
+from performance_log import PerformanceLog
+from standin_server import StandInBackend
+from trace_capture import DEFAULT_CATEGORIES, TraceRecorder, format_summary
+
+
+def pytest_addoption(parser):
+    """Command line options for the Selenium suite"""
+    parser.addoption(
+        "--allow-driver-download", action="store_true",
+        default=os.getenv("CHROMEDRIVER_ALLOW_DOWNLOAD") == "1",
+        help="let the ChromeDriver resolver download a driver when none is cached locally"
+    )
+    parser.addoption(
+        "--perf-baseline", default=os.getenv("PERF_BASELINE_DB", DEFAULT_DB),
+        help="SQLite file with page timings of previous builds ('none' to disable)"
+    )
+    parser.addoption(
+        "--perf-baseline-builds", type=int, default=10,
+        help="number of previous builds the current run is compared against"
+    )
+    parser.addoption(
+        "--perf-flag-threshold", type=float, default=0.1,
+        help="relative slowdown (0.1 = 10%%) at which a route is reported as regressed"
+    )
+    parser.addoption(
+        "--perf-fail-threshold", type=float,
+        default=float(os.environ["PERF_FAIL_THRESHOLD"]) if os.getenv("PERF_FAIL_THRESHOLD") else None,
+        help="relative slowdown at which a regression fails the run (default: never fail)"
+    )
+    parser.addoption(
+        "--benchmark", action="store_true",
+        help="run the multi-sample route benchmark (tests marked 'benchmark')"
+    )
+    parser.addoption(
+        "--benchmark-samples", type=int, default=5,
+        help="cold and warm loads per route in benchmark mode"
+    )
+    parser.addoption(
+        "--benchmark-cpu-throttle", type=float, default=None,
+        help="CPU slowdown factor for benchmark loads, e.g. 4 for a mid-range phone"
+    )
+    parser.addoption(
+        "--benchmark-network", choices=sorted(NETWORK_PROFILES), default=None,
+        help="network profile emulated during benchmark loads"
+    )
+    parser.addoption(
+        "--concurrency-levels", default=os.getenv("CONCURRENCY_LEVELS", "1,5,10"),
+        help="simultaneous customers per run of the multi-user order flow benchmark"
+    )
+    parser.addoption(
+        "--soak", action="store_true",
+        help="run the long-session leak soak (tests marked 'soak')"
+    )
+    parser.addoption(
+        "--soak-cycles", type=int, default=int(os.getenv("SOAK_CYCLES", "20")),
+        help="repetitions of each interaction cycle in soak mode"
+    )
+    parser.addoption(
+        "--strict-lookups", type=float, metavar="MS",
+        default=float(os.environ["STRICT_LOOKUP_MS"]) if os.getenv("STRICT_LOOKUP_MS") else None,
+        help="report every element lookup that waited longer than MS milliseconds"
+    )
+    parser.addoption(
+        "--screenshots", choices=POLICIES, default=os.getenv("SCREENSHOT_POLICY", "failure"),
+        help="which screenshots to keep: failure (default), every step, sampled steps or off"
+    )
+    parser.addoption(
+        "--screenshot-sample-rate", type=float, default=0.1,
+        help="share of steps captured with --screenshots sampled"
+    )
+    parser.addoption(
+        "--screenshot-budget-mb", type=float, default=float(os.getenv("SCREENSHOT_BUDGET_MB", "200")),
+        help="total size of screenshots written per run"
+    )
+    parser.addoption(
+        "--screenshot-format", choices=sorted(FORMATS), default=os.getenv("SCREENSHOT_FORMAT", "png"),
+        help="re-encode screenshots (jpeg/webp need Pillow)"
+    )
+    parser.addoption(
+        "--screenshot-max-width", type=int, default=None,
+        help="downscale screenshots wider than this (needs Pillow)"
+    )
+    parser.addoption(
+        "--js-coverage", action="store_true", default=os.getenv("JS_COVERAGE") == "1",
+        help="collect block-level JS coverage per test through CDP (lcov/HTML in reports/coverage)"
+    )
+    parser.addoption(
+        "--record-impact", action="store_true", default=os.getenv("RECORD_IMPACT") == "1",
+        help="record the backend endpoints each test calls for the impact index (run_tests.py)"
+    )
+    parser.addoption(
+        "--chrome-trace", action="store_true", default=os.getenv("CHROME_TRACE") == "1",
+        help="record a Chrome performance trace of every test (reports/traces); "
+             "tests marked chrome_trace are always traced"
+    )
+    parser.addoption(
+        "--chrome-trace-categories", default=os.getenv("CHROME_TRACE_CATEGORIES", ",".join(DEFAULT_CATEGORIES)),
+        help="comma-separated trace categories"
+    )
+    parser.addoption(
+        "--network-audit", action="store_true", default=os.getenv("NETWORK_AUDIT") == "1",
+        help="report each test's request waterfall and flag duplicate, chained, uncompressed, "
+             "oversized and uncached requests"
+    )
+    parser.addoption(
+        "--db-profile", action="store_true", default=os.getenv("DB_PROFILE") == "1",
+        help="profile MongoDB (MONGODB_URI) and report queries, DB time and collection scans per test "
+             "(single process only, not with run_tests.py --workers)"
+    )
+    parser.addoption(
+        "--db-slow-ms", type=int, default=int(os.getenv("DB_SLOW_MS", "100")),
+        help="queries at least this slow count as slow queries with --db-profile"
+    )
+    parser.addoption(
+        "--standin", action="store_true", default=os.getenv("STANDIN_BACKEND") == "1",
+        help="run against the in-memory stand-in backend instead of BASE_URL/API_URL "
+             "(ports from STANDIN_WEB_PORT/STANDIN_API_PORT, default 3000/8080; "
+             "single process only, not with run_tests.py --workers)"
+    )
+    parser.addoption(
+        "--login-via", choices=["api", "ui"], default=os.getenv("LOGIN_VIA", "api"),
+        help="log each role in once through POST /api/users/login or through the login page"
+    )
+    parser.addoption(
+        "--seed-scale", default=os.getenv("SEED_SCALE"),
+        help="load a seeded catalog for large-data tests, e.g. 'restaurants=10000,orders=20000'"
+    )
+    parser.addoption(
+        "--seed", type=int, default=int(os.getenv("SEED", "0")),
+        help="random seed of the generated catalog (same seed, same data)"
+    )
+    parser.addoption(
+        "--seed-target", choices=["api", "mongo"], default=os.getenv("SEED_TARGET", "api"),
+        help="load the catalog through the API or straight into MongoDB (needs pymongo)"
+    )
+
+
+def pytest_configure(config):
+    """Register custom markers"""
+    config.addinivalue_line(
+        "markers",
+        "fresh_browser: run the test in its own newly launched browser instead of a pooled one"
+    )
+    config.addinivalue_line(
+        "markers",
+        "benchmark: slow multi-sample performance benchmark, only run with --benchmark"
+    )
+    config.addinivalue_line(
+        "markers",
+        "soak: long-session memory leak soak, only run with --soak"
+    )
+    config.addinivalue_line(
+        "markers",
+        "chrome_trace: record a Chrome performance trace of the test, as --chrome-trace does for all tests"
+    )
+
+    ArtifactWriter.active = ArtifactWriter(
+        os.getenv("SCREENSHOT_DIR", "screenshots"),
+        policy=config.getoption("--screenshots"),
+        sample_rate=config.getoption("--screenshot-sample-rate"),
+        budget_bytes=int(config.getoption("--screenshot-budget-mb") * 1024 * 1024),
+        image_format=config.getoption("--screenshot-format"),
+        max_width=config.getoption("--screenshot-max-width"),
+    )
+    config.screenshot_stats = None
+
+    config.js_coverage = None
+    config.js_coverage_percent = None
+    if config.getoption("--js-coverage"):
+        # Parallel workers write next to their own reports; run_tests.py merges them
+        config.js_coverage = CoverageRecorder(
+            os.path.join(os.getenv("REPORT_DIR", "reports"), COVERAGE_DIR)
+        )
+        config.js_coverage.clear()
+
+    EndpointRecorder.active = None
+    if config.getoption("--record-impact"):
+        EndpointRecorder.active = EndpointRecorder(
+            os.path.join(os.getenv("REPORT_DIR", "reports"), IMPACT_DIR)
+        )
+        EndpointRecorder.active.clear()
+
+    # Fixed ports and an in-memory store cannot be shared between processes
+    if config.getoption("--standin") and os.getenv("WORKER_ID"):
+        raise pytest.UsageError("--standin needs a single test process; run without --workers")
+
+    config.network_findings = [] if config.getoption("--network-audit") else None
+    # Origin of the app for the audit; the standin fixture replaces it once started
+    config.app_base_url = os.getenv("BASE_URL", "http://localhost:3000")
+
+    config.db_profiler = None
+    config.db_suspects = None
+    if config.getoption("--db-profile"):
+        # The profiler covers the whole database and start() recreates
+        # system.profile, so a second process would wipe the first one's capture
+        if os.getenv("WORKER_ID"):
+            raise pytest.UsageError("--db-profile needs a single test process; run without --workers")
+        config.db_profiler = MongoProfiler(slowms=config.getoption("--db-slow-ms")).start()
+
+    config.command_timings = CommandTimings()
+    config.command_timings.patch_sleep()
+
+    LookupMonitor.threshold_ms = config.getoption("--strict-lookups")
+    config.slow_lookups = []
+
+    config.perf_baseline = None
+    if config.getoption("--perf-baseline").lower() != "none":
+        config.perf_baseline = PerfBaseline(
+            config.getoption("--perf-baseline"),
+            builds=config.getoption("--perf-baseline-builds"),
+            flag_threshold=config.getoption("--perf-flag-threshold"),
+            fail_threshold=config.getoption("--perf-fail-threshold"),
+        )
+
+
+def pytest_unconfigure(config):
+    """Restore time.sleep"""
+    timings = getattr(config, "command_timings", None)
+    if timings is not None:
+        timings.unpatch_sleep()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmark and soak tests unless --benchmark / --soak is given"""
+    for mode in ("benchmark", "soak"):
+        if config.getoption(f"--{mode}"):
+            continue
+        skip = pytest.mark.skip(reason=f"{mode} mode not enabled (use --{mode})")
+        for item in items:
+            if item.get_closest_marker(mode):
+                item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def benchmark_settings(request):
+    """Sample count and throttling for benchmark tests"""
+    return {
+        "samples": request.config.getoption("--benchmark-samples"),
+        "cpu_throttle": request.config.getoption("--benchmark-cpu-throttle"),
+        "network": request.config.getoption("--benchmark-network"),
+    }
+
+
+@pytest.fixture(scope="session")
+def concurrency_levels(request):
+    """Customer counts the multi-user order flow is run with, in order"""
+    return [int(level) for level in request.config.getoption("--concurrency-levels").split(",")]
+
+
+@pytest.fixture(scope="session")
+def soak_settings(request):
+    """Cycle count and heap snapshot folder for soak tests"""
+    return {
+        "cycles": request.config.getoption("--soak-cycles"),
+        "snapshot_dir": os.path.join(os.getenv("REPORT_DIR", "reports"), "heap"),
+    }
+
+
+@pytest.fixture(scope="session")
+def chromedriver_path(request):
+    """ChromeDriver matching the installed browser, resolved once per session"""
+    resolver = ChromeDriverResolver(
+        allow_download=request.config.getoption("--allow-driver-download")
+    )
+    return resolver.resolve()
+
+
+@pytest.fixture(scope="session")
+def browser_pool(base_url, api_url, chromedriver_path):
+    """
+    Warm browsers shared across the whole session
+    Pool size can be raised with BROWSER_POOL_SIZE
+    """
+    pool = BrowserPool(
+        size=int(os.getenv("BROWSER_POOL_SIZE", "1")),
+        origins=[base_url, api_url],
+        factory=functools.partial(launch_chrome, chromedriver_path)
+    )
+
+    yield pool
+
+    # Cleanup
+    pool.close()
+
 
 @pytest.fixture(scope="function")
-def driver():
+def driver(request, browser_pool, chromedriver_path, base_url):
     """
-    Setup Chrome WebDriver with headless mode for CI/CD compatibility
-    Works with Chrome, Chromium, and Brave browsers
+    Chrome WebDriver for a single test
+    Borrowed from the session pool and reset afterwards; tests marked
+    with @pytest.mark.fresh_browser get a dedicated browser instead.
+    Every page the test visits is measured by PageMetricsCollector,
+    every WebDriver command is timed by CommandTimings, with
+    --js-coverage the JS the test runs is recorded by JsCoverage, and
+    with --chrome-trace (or the chrome_trace marker) it runs under a performance trace.
     """
-    chrome_options = Options()
-    
-    # Headless mode - required for Jenkins/AWS EC2
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    
-    # Additional options for stability
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # Use system Chromium in Docker
-    import os
-    if os.path.exists("/usr/bin/chromium-browser"):
-        chrome_options.binary_location = "/usr/bin/chromium-browser"
-    elif os.path.exists("/usr/bin/chromium"):
-        chrome_options.binary_location = "/usr/bin/chromium"
-    
-    # Initialize WebDriver
-    try:
-        # Try automatic ChromeDriver management
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    except Exception as e:
-        print(f"ChromeDriver Manager failed: {e}")
-        print("Attempting to use system ChromeDriver...")
-        # Fallback to system ChromeDriver
-        driver = webdriver.Chrome(options=chrome_options)
-    
-    # Set implicit wait
-    driver.implicitly_wait(10)
-    
-    yield driver
-    
+    fresh = request.node.get_closest_marker("fresh_browser") is not None
+    timings = request.config.command_timings
+    start = time.perf_counter()
+    browser = launch_chrome(chromedriver_path) if fresh else browser_pool.acquire()
+    timings.add("browser startup", (time.perf_counter() - start) * 1000)
+    timings.install(browser)
+    # Read back by pytest_runtest_makereport once the test body has run
+    request.node.page_metrics = PageMetricsCollector(browser)
+    request.node.js_coverage = None
+    if request.config.js_coverage is not None:
+        request.node.js_coverage = JsCoverage(browser, [base_url]).start()
+    request.node.trace = None
+    if request.config.getoption("--chrome-trace") or request.node.get_closest_marker("chrome_trace"):
+        name = re.sub(r"[^\w.-]+", "_", request.node.name)
+        request.node.trace = TraceRecorder(
+            browser, os.path.join(os.getenv("REPORT_DIR", "reports"), "traces", f"{name}.json.gz"),
+            categories=[c.strip() for c in request.config.getoption("--chrome-trace-categories").split(",") if c.strip()],
+        ).start()
+
+    yield EventFiringWebDriver(
+        browser, ListenerChain(request.node.page_metrics, request.node.js_coverage)
+    )
+
+    if request.node.trace is not None:
+        # Normally stopped by pytest_runtest_makereport already
+        request.node.trace.stop()
+
+    if fresh:
+        PerformanceLog.forget(browser)
+        DomSnapshot.invalidate(browser)
+        browser.quit()
+    else:
+        browser_pool.release(browser)
+
+
+@pytest.fixture(scope="session")
+def standin_backend(pytestconfig):
+    """In-memory backend plus static React build, seeded with TestData"""
+    backend = StandInBackend(
+        # The React build calls http://localhost:8080 (REACT_APP_API_URL), so
+        # the API must sit there for browser tests to reach it
+        api_port=int(os.getenv("STANDIN_API_PORT", "8080")),
+        web_port=int(os.getenv("STANDIN_WEB_PORT", "3000")),
+        static_dir=os.getenv("STANDIN_STATIC_DIR"),
+    )
+    backend.store.seed_test_data()
+    backend.start()
+    pytestconfig.app_base_url = backend.base_url
+
+    yield backend
+
     # Cleanup
-    driver.quit()
+    backend.stop()
 
 
 @pytest.fixture(scope="session")
-def base_url():
+def base_url(request):
     """Base URL for the FoodHub application"""
-    import os
+    if request.config.getoption("--standin"):
+        return request.getfixturevalue("standin_backend").base_url
     # In Docker, use service name; otherwise localhost
     return os.getenv("BASE_URL", "http://localhost:3000")
 
 
 @pytest.fixture(scope="session")
-def api_url():
+def api_url(request):
     """Base URL for the FoodHub API"""
-    import os
+    if request.config.getoption("--standin"):
+        return request.getfixturevalue("standin_backend").api_url
     return os.getenv("API_URL", "http://localhost:8080")
 
 
+@pytest.fixture(scope="session")
+def api_client(api_url):
+    """Keep-alive HTTP client for direct backend checks, shared by all tests"""
+    client = ApiClient(api_url)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def auth_sessions(request, api_client, base_url):
+    """Logged-in state of every role, captured once per session"""
+    via = request.config.getoption("--login-via")
+    pool = request.getfixturevalue("browser_pool") if via == "ui" else None
+    return AuthSessionCache(
+        api_client, base_url, via=via,
+        acquire_browser=pool.acquire if pool else None,
+        release_browser=pool.release if pool else None,
+    )
+
+
+@pytest.fixture(scope="function")
+def login_as(driver, auth_sessions):
+    """
+    Open a page already logged in, skipping the login UI
+    Usage: user = login_as("restaurant", "/orders")
+    """
+    def login(role, path="/"):
+        return auth_sessions.inject(driver, role, path)
+    return login
+
+
+@pytest.fixture(scope="session")
+def seeded_catalog(request, api_client):
+    """
+    Large deterministic catalog loaded once per session and removed afterwards
+    Tests using it are skipped unless --seed-scale is given
+    """
+    scale = request.config.getoption("--seed-scale")
+    if not scale:
+        pytest.skip("no seeded catalog requested (use --seed-scale)")
+
+    if request.config.getoption("--seed-target") == "mongo":
+        loader, run = MongoLoader(), None
+    else:
+        # API teardown leaves restaurants and orders behind; fresh ids each run
+        loader, run = ApiLoader(api_client), run_nonce()
+    factory = DataFactory(Scale.parse(scale), seed=request.config.getoption("--seed"), run=run)
+    catalog = factory.build()
+    loader.load(catalog)
+
+    yield catalog
+
+    # Cleanup
+    loader.unload(catalog)
+    loader.close()
+
+
 def pytest_html_report_title(report):
     """Customize HTML report title"""
     report.title = "FoodHub Selenium Test Report"
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Attribute WebDriver commands and sleeps to this test from setup on"""
+    item.config.command_timings.begin(item.nodeid)
+    if EndpointRecorder.active is not None:
+        EndpointRecorder.active.begin(item.nodeid)
+    if item.config.db_profiler is not None:
+        item.config.db_profiler.begin()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Show the time breakdown, slow lookups and page metrics of each test"""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when != "call":
+        return
+
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    breakdown = item.config.command_timings.end()
+    if breakdown:
+        prop = ("command_time", json.dumps(breakdown))
+        item.user_properties.append(prop)
+        report.user_properties.append(prop)
+        if pytest_html is not None:
+            report.extras = getattr(report, "extras", []) + [
+                pytest_html.extras.json(breakdown, name="Time breakdown")
+            ]
+
+    writer = ArtifactWriter.active
+    driver = item.funcargs.get("driver")
+    if writer is not None and driver is not None:
+        name = re.sub(r"[^\w.-]+", "_", item.name)
+        if writer.policy in ("every", "sampled") and not report.failed:
+            writer.capture(driver, f"{name}_end")
+        writer.test_finished(driver, name, report.failed)
+
+    if EndpointRecorder.active is not None:
+        EndpointRecorder.active.end(item.nodeid, driver)
+
+    if item.config.network_findings is not None and driver is not None:
+        # Tests without the base_url fixture still load the app
+        network = audit(driver, item.config.app_base_url)
+        if network:
+            prop = ("network_audit", json.dumps(network))
+            item.user_properties.append(prop)
+            report.user_properties.append(prop)
+            report.sections.append(("network waterfall", "\n\n".join(format_waterfall(p) for p in network)))
+            item.config.network_findings.extend(
+                dict(finding, test=item.nodeid) for page in network for finding in page["findings"]
+            )
+            if pytest_html is not None:
+                report.extras = getattr(report, "extras", []) + [
+                    pytest_html.extras.json(network, name="Network audit")
+                ]
+
+    coverage = getattr(item, "js_coverage", None)
+    if coverage is not None:
+        item.config.js_coverage.add(item.nodeid, coverage.finish())
+
+    trace = getattr(item, "trace", None)
+    summary = trace.stop() if trace is not None else None
+    if summary:
+        prop = ("trace_summary", json.dumps(summary))
+        item.user_properties.append(prop)
+        report.user_properties.append(prop)
+        report.sections.append(("performance trace", format_summary(summary)))
+        if pytest_html is not None:
+            report.extras = getattr(report, "extras", []) + [
+                pytest_html.extras.json(summary, name="Trace summary")
+            ]
+
+    profiler = item.config.db_profiler
+    queries = profiler.end(item.nodeid) if profiler is not None else None
+    if queries:
+        prop = ("db_queries", json.dumps(queries))
+        item.user_properties.append(prop)
+        report.user_properties.append(prop)
+        if pytest_html is not None:
+            report.extras = getattr(report, "extras", []) + [
+                pytest_html.extras.json(queries, name="Database queries")
+            ]
+
+    slow = LookupMonitor.drain()
+    if slow:
+        item.config.slow_lookups.extend(dict(lookup, test=item.nodeid) for lookup in slow)
+        report.sections.append(("slow lookups", "\n".join(
+            f"{lookup['waited_ms']:.0f} ms {'found' if lookup['found'] else 'not found'}: "
+            f"{lookup['lookup']}" for lookup in slow
+        )))
+
+    collector = getattr(item, "page_metrics", None)
+    if collector is None:
+        return
+
+    pages = collector.finish()
+    if not pages:
+        return
+    attach_page_metrics(item, report, pages)
+    if item.config.perf_baseline is not None:
+        item.config.perf_baseline.add_pages(item.nodeid, pages)
+
+    if pytest_html is not None:
+        report.extras = getattr(report, "extras", []) + [
+            pytest_html.extras.json(pages, name="Page metrics")
+        ]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session, exitstatus):
+    """Finish screenshots, coverage and DB profiling, compare page timings with previous builds"""
+    if ArtifactWriter.active is not None:
+        session.config.screenshot_stats = ArtifactWriter.active.close()
+        ArtifactWriter.active = None
+
+    if EndpointRecorder.active is not None:
+        EndpointRecorder.active.save()
+        EndpointRecorder.active = None
+
+    profiler = session.config.db_profiler
+    if profiler is not None:
+        session.config.db_suspects = profiler.missing_index_suspects()
+        profiler.stop()
+        path = os.path.join(os.getenv("REPORT_DIR", "reports"), "db_suspects.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(session.config.db_suspects, f, indent=2)
+
+    recorder = session.config.js_coverage
+    if recorder is not None and recorder.save() and not os.getenv("WORKER_ID"):
+        session.config.js_coverage_percent = write_reports(recorder.directory, [recorder.directory])
+
+    baseline = session.config.perf_baseline
+    if baseline is None:
+        return
+    if os.getenv("WORKER_ID"):
+        # A worker holds one shard; run_tests.py compares the whole run
+        baseline.save_samples(os.getenv("REPORT_DIR", "reports"))
+        return
+    baseline.evaluate()
+    if baseline.failed and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Print screenshots, the slowest commands, slow lookups, network findings, index suspects and performance regressions"""
+    if config.js_coverage_percent is not None:
+        terminalreporter.write_line(
+            f"JS coverage: {config.js_coverage_percent:.1f}% of src/ lines "
+            f"({config.js_coverage.directory}/index.html)"
+        )
+
+    stats = config.screenshot_stats
+    if stats and any(stats.values()):
+        terminalreporter.write_line(
+            f"screenshots: {stats['written']} written ({stats['bytes'] / 1024 / 1024:.1f} MiB), "
+            f"{stats['duplicates']} duplicates skipped, {stats['over_budget']} over budget"
+        )
+
+    slowest = config.command_timings.slowest_commands()
+    if slowest:
+        terminalreporter.section(f"top {len(slowest)} slowest commands")
+        for command in slowest:
+            terminalreporter.write_line(
+                f"{command['ms']:>8.0f} ms  {command['command']:<20} {command['detail'][:60]:<60}  "
+                f"{command['test']}"
+            )
+
+    if config.slow_lookups:
+        terminalreporter.section(f"lookups slower than {LookupMonitor.threshold_ms:.0f} ms")
+        for lookup in config.slow_lookups:
+            terminalreporter.write_line(
+                f"{lookup['waited_ms']:>8.0f} ms  {lookup['test']}  {lookup['lookup']}"
+            )
+
+    if config.network_findings:
+        terminalreporter.section(f"network audit: {len(config.network_findings)} findings")
+        seen = set()
+        for finding in config.network_findings:
+            detail = finding.get("request") or " -> ".join(finding["requests"])
+            if (finding["kind"], detail) in seen:
+                continue
+            seen.add((finding["kind"], detail))
+            terminalreporter.write_line(f"{finding['kind']:<13} {detail[:100]}  ({finding['test']})")
+
+    if config.db_suspects:
+        terminalreporter.section("missing-index suspects (collection scans)")
+        for suspect in config.db_suspects:
+            terminalreporter.write_line(
+                f"{suspect['count']:>6}x {suspect['docs_examined']:>10} docs {suspect['millis']:>7} ms  "
+                f"{suspect['ns']} {{{', '.join(suspect['fields'])}}}  ({len(suspect['tests'])} tests)"
+            )
+
+    baseline = config.perf_baseline
+    if baseline is None or not baseline.samples or os.getenv("WORKER_ID"):
+        return
+    terminalreporter.section("performance baseline")
+    for line in baseline.summary_lines():
+        terminalreporter.write_line(line)
+
+
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    """Add the per-route trend table to the HTML report"""
+    baseline = session.config.perf_baseline
+    if baseline is not None and baseline.history:
+        postfix.append(baseline.trend_html())
@@ -0,0 +1,270 @@
+"""
+Deterministic test-data factory for FoodHub
+Generates users, restaurants, menu items and orders matching the mongoose
+schemas in backend/models at any scale, bulk-loads them through the API
+or straight into MongoDB, and removes them again afterwards (completely
+with MongoLoader, partially with ApiLoader)
+"""
+import datetime
+import hashlib
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+
+CUISINES = ["Italian", "Japanese", "American", "Mexican", "Chinese",
+            "Indian", "Thai", "French", "Mediterranean", "Korean"]
+CATEGORIES = ["Starters", "Mains", "Sides", "Desserts", "Drinks"]
+DISHES = ["Pizza", "Burger", "Ramen", "Taco", "Curry", "Salad", "Sushi", "Pasta", "Soup", "Wrap"]
+ADJECTIVES = ["Spicy", "Classic", "Golden", "Smoky", "Fresh", "Royal", "Crispy", "Garden"]
+CITIES = ["Springfield", "Riverside", "Fairview", "Greenville", "Madison"]
+ORDER_STATUSES = ["pending", "confirmed", "preparing", "ready", "delivered", "cancelled"]
+
+# mongoose model name -> collection
+COLLECTIONS = {
+    "users": "users",
+    "restaurants": "restaurants",
+    "menu_items": "menuitems",
+    "orders": "orders",
+}
+
+
+def run_nonce():
+    """Short value unique to this run, for DataFactory(run=...)"""
+    return os.urandom(4).hex()
+
+
+class Scale:
+    """How many documents of each kind to generate"""
+
+    def __init__(self, customers=50, owners=10, restaurants=100, menu_items=10, orders=500,
+                 focus_customer_share=0.5):
+        self.customers = customers
+        self.owners = owners
+        self.restaurants = restaurants
+        # per restaurant
+        self.menu_items = menu_items
+        self.orders = orders
+        # Share of orders placed by the first customer, so OrderHistory
+        # can be measured with a very long list
+        self.focus_customer_share = focus_customer_share
+
+    @classmethod
+    def parse(cls, text):
+        """'restaurants=10000,menu_items=5,orders=20000' -> Scale"""
+        values = {}
+        for part in filter(None, text.split(",")):
+            name, _, number = part.partition("=")
+            values[name.strip()] = float(number) if name.strip() == "focus_customer_share" else int(number)
+        return cls(**values)
+
+
+class DataFactory:
+    """
+    Builds a consistent catalog from a seed
+
+    The same seed and scale always give the same documents, including their
+    _id values, so references between collections hold whichever loader is
+    used and teardown knows exactly what to remove. A run nonce goes into
+    the tag, and so into ids and emails, for loaders that cannot remove
+    everything (ApiLoader): the data stays the same, the ids are new.
+    """
+
+    def __init__(self, scale=None, seed=0, tag=None, run=None):
+        self.scale = scale or Scale()
+        self.seed = seed
+        self.tag = tag or f"seed{seed}"
+        if run:
+            self.tag = f"{self.tag}-{run}"
+        self.random = random.Random(seed)
+        self._epoch = datetime.datetime(2024, 1, 1)
+
+    def object_id(self, kind, index):
+        """Deterministic 24-hex-digit ObjectId string"""
+        return hashlib.sha1(f"{self.tag}:{kind}:{index}".encode()).hexdigest()[:24]
+
+    def _address(self):
+        return {
+            "street": f"{self.random.randint(1, 999)} {self.random.choice(ADJECTIVES)} St",
+            "city": self.random.choice(CITIES),
+            "zipCode": f"{self.random.randint(10000, 99999)}",
+        }
+
+    def _phone(self):
+        return f"555-{self.random.randint(1000, 9999)}"
+
+    def _timestamp(self):
+        return self._epoch + datetime.timedelta(minutes=self.random.randint(0, 90 * 24 * 60))
+
+    def build(self):
+        """All documents, keyed like COLLECTIONS"""
+        scale = self.scale
+        users, restaurants, menu_items, orders = [], [], [], []
+
+        for index in range(scale.customers):
+            users.append({
+                "_id": self.object_id("customer", index),
+                "name": f"Customer {index} {self.tag}",
+                "email": f"customer{index}.{self.tag}@foodhub.test",
+                "phone": self._phone(),
+                "address": self._address(),
+                "role": "customer",
+            })
+        for index in range(scale.owners):
+            users.append({
+                "_id": self.object_id("owner", index),
+                "name": f"Owner {index} {self.tag}",
+                "email": f"owner{index}.{self.tag}@foodhub.test",
+                "phone": self._phone(),
+                "address": self._address(),
+                "role": "restaurant",
+            })
+
+        for index in range(scale.restaurants):
+            cuisine = self.random.choice(CUISINES)
+            restaurant_id = self.object_id("restaurant", index)
+            restaurants.append({
+                "_id": restaurant_id,
+                "name": f"{self.random.choice(ADJECTIVES)} {cuisine} Kitchen {index}",
+                "description": f"Seeded {cuisine.lower()} restaurant #{index}",
+                "owner": self.object_id("owner", index % max(scale.owners, 1)),
+                "address": self._address(),
+                "cuisineType": cuisine,
+                "rating": round(self.random.uniform(3.0, 5.0), 1),
+                "deliveryFee": round(self.random.choice([0, 1.99, 2.99, 4.99]), 2),
+                "minOrder": self.random.choice([0, 10, 15, 20]),
+                "isActive": True,
+            })
+            for item in range(scale.menu_items):
+                dish = self.random.choice(DISHES)
+                menu_items.append({
+                    "_id": self.object_id("menu", f"{index}:{item}"),
+                    "name": f"{self.random.choice(ADJECTIVES)} {dish}",
+                    "description": f"House {dish.lower()} from {cuisine.lower()} kitchen {index}",
+                    "price": round(self.random.uniform(4, 30), 2),
+                    "category": self.random.choice(CATEGORIES),
+                    "restaurant": restaurant_id,
+                    "imageUrl": "",
+                    "isAvailable": True,
+                    "prepTime": self.random.choice([10, 15, 20, 30]),
+                })
+
+        menus = {}
+        for item in menu_items:
+            menus.setdefault(item["restaurant"], []).append(item)
+        customers = [u for u in users if u["role"] == "customer"]
+        focused = int(scale.orders * scale.focus_customer_share)
+
+        for index in range(scale.orders if customers and menus else 0):
+            customer = customers[0] if index < focused else self.random.choice(customers)
+            restaurant_id = self.random.choice(list(menus))
+            lines = []
+            for item in self.random.sample(menus[restaurant_id], min(3, len(menus[restaurant_id]))):
+                lines.append({"menuItem": item["_id"], "quantity": self.random.randint(1, 3),
+                              "price": item["price"]})
+            orders.append({
+                "_id": self.object_id("order", index),
+                "customer": customer["_id"],
+                "restaurant": restaurant_id,
+                "items": lines,
+                "totalAmount": round(sum(l["price"] * l["quantity"] for l in lines), 2),
+                "status": self.random.choice(ORDER_STATUSES),
+                "deliveryAddress": customer["address"],
+                "customerPhone": customer["phone"],
+                "notes": "",
+                "createdAt": self._timestamp(),
+            })
+
+        return {"users": users, "restaurants": restaurants,
+                "menu_items": menu_items, "orders": orders}
+
+
+class MongoLoader:
+    """Batched inserts straight into the backend's MongoDB"""
+
+    def __init__(self, uri=None, batch_size=1000):
+        # Only needed for direct loading, so imported lazily
+        import pymongo
+
+        self.uri = uri or os.getenv("MONGODB_URI", "mongodb://127.0.0.1:27017/reactmeals")
+        self.client = pymongo.MongoClient(self.uri)
+        self.db = self.client.get_default_database(default="reactmeals")
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _to_bson(document):
+        """String ids -> ObjectId and mongoose bookkeeping fields"""
+        from bson import ObjectId
+
+        def convert(value):
+            if isinstance(value, str) and len(value) == 24 and all(c in "0123456789abcdef" for c in value):
+                return ObjectId(value)
+            if isinstance(value, dict):
+                return {k: convert(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [convert(v) for v in value]
+            return value
+
+        converted = convert(document)
+        converted.setdefault("createdAt", datetime.datetime.utcnow())
+        converted.setdefault("updatedAt", converted["createdAt"])
+        converted["__v"] = 0
+        return converted
+
+    def load(self, catalog):
+        for kind, documents in catalog.items():
+            collection = self.db[COLLECTIONS[kind]]
+            for start in range(0, len(documents), self.batch_size):
+                batch = [self._to_bson(d) for d in documents[start:start + self.batch_size]]
+                collection.insert_many(batch, ordered=False)
+
+    def unload(self, catalog):
+        from bson import ObjectId
+
+        for kind, documents in catalog.items():
+            ids = [ObjectId(d["_id"]) for d in documents]
+            for start in range(0, len(ids), self.batch_size):
+                self.db[COLLECTIONS[kind]].delete_many({"_id": {"$in": ids[start:start + self.batch_size]}})
+
+    def close(self):
+        self.client.close()
+
+
+class ApiLoader:
+    """
+    Loads through the Express routes, several requests in flight
+
+    The routes accept a client-supplied _id, so references stay intact.
+    Teardown is partial: restaurants and orders have no DELETE route, so
+    the restaurants are deactivated (hidden from GET /api/restaurants) and
+    the orders cancelled, and the users they reference are kept so those
+    orders still populate. Reloading the same ids fails with a duplicate
+    key, so build catalogs for it with a run nonce (see run_nonce), or use
+    MongoLoader for repeatable runs with a fixed tag.
+    """
+
+    def __init__(self, api_client, workers=8):
+        self.api = api_client
+        self.workers = workers
+
+    def _each(self, function, documents):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for response in executor.map(function, documents):
+                response.raise_for_status()
+
+    def load(self, catalog):
+        orders = [dict(o, createdAt=o["createdAt"].isoformat()) for o in catalog["orders"]]
+        self._each(lambda d: self.api.post("/api/users", d), catalog["users"])
+        self._each(lambda d: self.api.post("/api/restaurants", d), catalog["restaurants"])
+        self._each(lambda d: self.api.post("/api/menu", d), catalog["menu_items"])
+        self._each(lambda d: self.api.post("/api/orders", d), orders)
+
+    def unload(self, catalog):
+        self._each(lambda d: self.api.patch(f"/api/orders/{d['_id']}/status", {"status": "cancelled"}),
+                   catalog["orders"])
+        self._each(lambda d: self.api.delete(f"/api/menu/{d['_id']}"), catalog["menu_items"])
+        self._each(lambda d: self.api.patch(f"/api/restaurants/{d['_id']}/toggle-status"),
+                   [r for r in catalog["restaurants"] if r["isActive"]])
+
+    def close(self):
+        pass
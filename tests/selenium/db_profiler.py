@@ -0,0 +1,158 @@
+"""
+MongoDB query capture per test
+Turns on the database profiler of the backend's MongoDB (MONGODB_URI, as
+in backend/server.js) for the session and, after each test, reads the
+system.profile entries written while it ran: query count, total DB time,
+collection scans and the slowest plans. Collection scans are collected
+across the run as missing-index suspects.
+
+Only for a local/disposable database: profiling every operation costs
+the server time, and system.profile is recreated with a larger size.
+Only one test process may profile at a time: entries cannot be told
+apart per process, and each start() drops what the others captured, so
+conftest.py refuses --db-profile in run_tests.py workers.
+"""
+import json
+import os
+
+
+# system.profile is a capped collection (1 MB by default); big enough for a run
+PROFILE_SIZE = 64 * 1024 * 1024
+# Comment on the profiler's own reads, so they can be told apart
+COMMENT = "foodhub-test-profiler"
+SLOWEST = 3
+# Operations that touch documents (not connection handshakes and the like)
+OPERATIONS = ("query", "getmore", "insert", "update", "remove", "command")
+_IGNORED_COMMANDS = ("hello", "isMaster", "ismaster", "ping", "buildInfo", "saslStart",
+                     "saslContinue", "endSessions", "profile")
+
+
+def query_shape(entry):
+    """Sorted filter fields of a profiled operation, e.g. ('customer', 'status')"""
+    command = entry.get("command", {})
+    criteria = command.get("filter") or command.get("query") or command.get("q") or {}
+    if not criteria:
+        for stage in command.get("pipeline", []):
+            if "$match" in stage:
+                criteria = stage["$match"]
+                break
+    if not criteria and command.get("updates"):
+        criteria = command["updates"][0].get("q", {})
+    return tuple(sorted(k for k in criteria if not k.startswith("$")))
+
+
+def _plan(entry):
+    command = entry.get("command", {})
+    return {
+        "ns": entry.get("ns"),
+        "op": entry.get("op"),
+        "millis": entry.get("millis", 0),
+        "plan": entry.get("planSummary", ""),
+        "docs_examined": entry.get("docsExamined", 0),
+        "keys_examined": entry.get("keysExamined", 0),
+        "returned": entry.get("nreturned", 0),
+        # Enough of the command to recognise the route's query
+        "command": json.dumps({k: v for k, v in command.items() if not k.startswith("$") and k != "lsid"},
+                              default=str)[:300],
+    }
+
+
+class MongoProfiler:
+    """
+    Database profiler bracketed around every test
+
+    begin() remembers the newest profile entry; end() returns a summary of
+    everything logged after it. Queries the backend finishes after a test
+    has ended count towards the next one.
+    """
+
+    def __init__(self, uri=None, slowms=100):
+        # Only needed when profiling, so imported lazily
+        import pymongo
+
+        self.uri = uri or os.getenv("MONGODB_URI", "mongodb://127.0.0.1:27017/reactmeals")
+        self.client = pymongo.MongoClient(self.uri)
+        self.db = self.client.get_default_database(default="reactmeals")
+        self.slowms = slowms
+        self.previous = None
+        self.mark = None
+        self.suspects = {}
+
+    def start(self):
+        """Profile every operation with a profile collection sized for a whole run"""
+        self.previous = self.db.command("profile", -1)
+        self.db.command("profile", 0)
+        self.db.drop_collection("system.profile")
+        self.db.create_collection("system.profile", capped=True, size=PROFILE_SIZE)
+        self.db.command("profile", 2, slowms=self.slowms)
+        return self
+
+    def stop(self):
+        """Put the profiler back the way it was"""
+        if self.previous is not None:
+            self.db.command("profile", self.previous.get("was", 0),
+                            slowms=self.previous.get("slowms", 100))
+        self.client.close()
+
+    def _newest(self):
+        entry = next(iter(self.db["system.profile"].find({}, {"ts": 1}, comment=COMMENT)
+                          .sort("$natural", -1).limit(1)), None)
+        return entry["ts"] if entry else None
+
+    def begin(self):
+        self.mark = self._newest()
+
+    def _entries(self):
+        query = {"ts": {"$gt": self.mark}} if self.mark else {}
+        for entry in self.db["system.profile"].find(query, comment=COMMENT).sort("$natural", 1):
+            command = entry.get("command", {})
+            if entry.get("op") not in OPERATIONS or command.get("comment") == COMMENT:
+                continue
+            if entry.get("ns", "").endswith(".system.profile"):
+                continue
+            if entry.get("op") == "command" and next(iter(command), None) in _IGNORED_COMMANDS:
+                continue
+            yield entry
+
+    def end(self, test):
+        """Queries, DB time, collection scans and slowest plans since begin()"""
+        entries = list(self._entries())
+        self.mark = self._newest() or self.mark
+        if not entries:
+            return None
+
+        collscans = [e for e in entries if "COLLSCAN" in e.get("planSummary", "")]
+        for entry in collscans:
+            key = (entry.get("ns"), query_shape(entry))
+            suspect = self.suspects.setdefault(key, {"count": 0, "docs_examined": 0, "millis": 0,
+                                                     "tests": set()})
+            suspect["count"] += 1
+            suspect["docs_examined"] += entry.get("docsExamined", 0)
+            suspect["millis"] += entry.get("millis", 0)
+            suspect["tests"].add(test)
+
+        slowest = sorted(entries, key=lambda e: e.get("millis", 0), reverse=True)[:SLOWEST]
+        return {
+            "queries": len(entries),
+            "db_time_ms": sum(e.get("millis", 0) for e in entries),
+            "slow_queries": sum(1 for e in entries if e.get("millis", 0) >= self.slowms),
+            "collscans": len(collscans),
+            "by_collection": _count_by(entries, "ns"),
+            "slowest": [_plan(e) for e in slowest],
+        }
+
+    def missing_index_suspects(self):
+        """Collection scans of the run grouped by collection and filter fields, worst first"""
+        suspects = [
+            {"ns": ns, "fields": list(fields), "count": s["count"], "docs_examined": s["docs_examined"],
+             "millis": s["millis"], "tests": sorted(s["tests"])}
+            for (ns, fields), s in self.suspects.items()
+        ]
+        return sorted(suspects, key=lambda s: (s["docs_examined"], s["count"]), reverse=True)
+
+
+def _count_by(entries, key):
+    counts = {}
+    for entry in entries:
+        counts[entry.get(key)] = counts.get(entry.get(key), 0) + 1
+    return counts
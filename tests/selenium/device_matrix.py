@@ -0,0 +1,136 @@
+"""
+Responsive device matrix through CDP emulation
+Phone, tablet and desktop profiles (viewport, device pixel ratio, touch
+and user agent) are applied to the running browser with
+Emulation.setDeviceMetricsOverride instead of resizing the window or
+launching a browser per device, and each page load is measured for
+horizontal overflow, cumulative layout shift and first render.
+"""
+import time
+from contextlib import contextmanager
+
+from test_helpers import TestHelpers
+
+
+_IOS_UA = ("Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 "
+           "(KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1")
+_ANDROID_UA = ("Mozilla/5.0 (Linux; Android 14; Pixel 7) AppleWebKit/537.36 "
+               "(KHTML, like Gecko) Chrome/119.0.0.0 Mobile Safari/537.36")
+_IPAD_UA = ("Mozilla/5.0 (iPad; CPU OS 16_6 like Mac OS X) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1")
+
+DEVICES = {
+    "iphone_se": {"width": 375, "height": 667, "dpr": 2, "mobile": True, "touch": True, "user_agent": _IOS_UA},
+    "pixel_7": {"width": 412, "height": 915, "dpr": 2.625, "mobile": True, "touch": True,
+                "user_agent": _ANDROID_UA},
+    "ipad": {"width": 768, "height": 1024, "dpr": 2, "mobile": True, "touch": True, "user_agent": _IPAD_UA},
+    # Desktop keeps the browser's own user agent
+    "desktop_1080p": {"width": 1920, "height": 1080, "dpr": 1, "mobile": False, "touch": False,
+                      "user_agent": None},
+}
+
+# Layout shift (buffered, so it covers the whole load), first render,
+# overflow past the viewport and the elements sticking out
+_MEASURE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var shift = 0, observer = null;
+function add(entry) { if (!entry.hadRecentInput) { shift += entry.value; } }
+try {
+    observer = new PerformanceObserver(function (list) { list.getEntries().forEach(add); });
+    observer.observe({type: 'layout-shift', buffered: true});
+} catch (e) { /* layout-shift not supported */ }
+
+setTimeout(function () {
+    if (observer) { observer.takeRecords().forEach(add); observer.disconnect(); }
+    var paints = {};
+    performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+    var root = document.documentElement;
+    var width = root.clientWidth;
+    var overflow = Math.max(root.scrollWidth, document.body ? document.body.scrollWidth : 0) - width;
+    var offenders = [];
+    if (overflow > 0) {
+        document.querySelectorAll('body *').forEach(function (el) {
+            var rect = el.getBoundingClientRect();
+            if (offenders.length < 5 && rect.width > 0 && rect.right > width + 1
+                    && getComputedStyle(el).position !== 'fixed') {
+                offenders.push(el.tagName.toLowerCase() + (el.className && el.className.baseVal === undefined
+                    ? '.' + el.className.trim().split(/\\s+/).join('.') : '') + ' (right ' + Math.round(rect.right) + ')');
+            }
+        });
+    }
+    done({
+        viewport: [window.innerWidth, window.innerHeight],
+        dpr: window.devicePixelRatio,
+        touch: navigator.maxTouchPoints,
+        overflow: Math.max(0, overflow),
+        offenders: offenders,
+        cls: shift,
+        firstPaint: paints['first-paint'] || null,
+        firstContentfulPaint: paints['first-contentful-paint'] || null
+    });
+}, 0);
+"""
+
+
+class DeviceEmulator:
+    """
+    Emulates devices in one browser tab
+
+    Overrides belong to the tab; BrowserPool.reset opens a fresh tab for
+    the next test, so nothing leaks out of a test that fails midway.
+    """
+
+    def __init__(self, driver):
+        # Measured loads stay out of the per-test page metrics
+        self.driver = getattr(driver, "wrapped_driver", driver)
+
+    def _cdp(self, command, params=None):
+        return self.driver.execute_cdp_cmd(command, params or {})
+
+    def apply(self, device):
+        profile = DEVICES[device]
+        self._cdp("Emulation.setDeviceMetricsOverride", {
+            "width": profile["width"],
+            "height": profile["height"],
+            "deviceScaleFactor": profile["dpr"],
+            "mobile": profile["mobile"],
+            "screenWidth": profile["width"],
+            "screenHeight": profile["height"],
+        })
+        self._cdp("Emulation.setTouchEmulationEnabled", {
+            "enabled": profile["touch"], "maxTouchPoints": 5 if profile["touch"] else 0,
+        })
+        # An empty user agent removes the override
+        self._cdp("Emulation.setUserAgentOverride", {"userAgent": profile["user_agent"] or ""})
+
+    def clear(self):
+        self._cdp("Emulation.clearDeviceMetricsOverride")
+        self._cdp("Emulation.setTouchEmulationEnabled", {"enabled": False})
+        self._cdp("Emulation.setUserAgentOverride", {"userAgent": ""})
+
+    @contextmanager
+    def emulate(self, device):
+        self.apply(device)
+        try:
+            yield self
+        finally:
+            self.clear()
+
+    def measure(self, url, **signals):
+        """Load url under the current emulation; layout metrics of the load"""
+        start = time.perf_counter()
+        TestHelpers.open_page(self.driver, url, **signals)
+        raw = self.driver.execute_async_script(_MEASURE_SCRIPT)
+        return {
+            "url": url,
+            "viewport": raw["viewport"],
+            "device_pixel_ratio": raw["dpr"],
+            "max_touch_points": raw["touch"],
+            "horizontal_overflow_px": raw["overflow"],
+            "overflowing_elements": raw["offenders"],
+            "cumulative_layout_shift": round(raw["cls"], 4),
+            "first_paint_ms": round(raw["firstPaint"], 1) if raw["firstPaint"] else None,
+            "first_contentful_paint_ms": (round(raw["firstContentfulPaint"], 1)
+                                          if raw["firstContentfulPaint"] else None),
+            "load_s": round(time.perf_counter() - start, 2),
+        }
@@ -0,0 +1,135 @@
+"""
+Structured snapshot of the current page, read in one WebDriver round-trip
+Assertions on titles, inputs, buttons, landmarks and visible text run
+against the snapshot locally instead of issuing a find_elements call or
+serializing page_source for each check
+"""
+
+
+_SNAPSHOT_SCRIPT = """
+    function visible(el) {
+        var rect = el.getBoundingClientRect();
+        var style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0
+            && style.visibility !== 'hidden' && style.display !== 'none';
+    }
+    function text(el) {
+        return (el.innerText || el.textContent || '').trim().replace(/\\s+/g, ' ');
+    }
+    function count(selector) {
+        return document.querySelectorAll(selector).length;
+    }
+    var body = document.body;
+    return {
+        url: location.href,
+        title: document.title,
+        readyState: document.readyState,
+        rootChildren: (document.getElementById('root') || {children: []}).children.length,
+        inputs: Array.prototype.map.call(document.querySelectorAll('input, textarea, select'), function (el) {
+            return {
+                tag: el.tagName.toLowerCase(),
+                type: (el.getAttribute('type') || (el.tagName === 'INPUT' ? 'text' : el.tagName)).toLowerCase(),
+                name: el.name || '',
+                id: el.id || '',
+                placeholder: el.getAttribute('placeholder') || '',
+                value: el.value || '',
+                required: !!el.required,
+                enabled: !el.disabled,
+                visible: visible(el)
+            };
+        }),
+        buttons: Array.prototype.map.call(document.querySelectorAll('button, input[type=submit], input[type=button]'), function (el) {
+            return {
+                text: el.tagName === 'INPUT' ? (el.value || '') : text(el),
+                type: (el.getAttribute('type') || 'submit').toLowerCase(),
+                enabled: !el.disabled,
+                visible: visible(el)
+            };
+        }),
+        links: Array.prototype.map.call(document.querySelectorAll('a[href]'), function (el) {
+            return {text: text(el), href: el.getAttribute('href')};
+        }),
+        landmarks: {
+            nav: count('nav, [role=navigation]'),
+            header: count('header, [role=banner]'),
+            main: count('main, [role=main]'),
+            footer: count('footer, [role=contentinfo]'),
+            form: count('form'),
+            // CSS-module class names keep the source name, e.g. Header_nav__x1y2z
+            navClass: count('[class*=nav i], [class*=header i], [class*=menu i]')
+        },
+        text: body ? body.innerText : ''
+    };
+"""
+
+
+class DomSnapshot:
+    """
+    Compact view of one page state
+
+    Snapshots are cached per browser session until the next navigation,
+    click or typed input (see invalidate and PageMetricsCollector), so
+    several assertions on the same page cost a single execute_script.
+    """
+
+    _cache = {}
+
+    def __init__(self, data):
+        self.data = data
+        self.url = data["url"]
+        self.title = data["title"]
+        self.ready_state = data["readyState"]
+        self.root_children = data["rootChildren"]
+        self.inputs = data["inputs"]
+        self.buttons = data["buttons"]
+        self.links = data["links"]
+        self.landmarks = data["landmarks"]
+        self.text = data["text"] or ""
+        self._lower_text = self.text.lower()
+
+    @classmethod
+    def take(cls, driver, refresh=False):
+        """Snapshot of the current page, from the cache unless refresh is set"""
+        driver = getattr(driver, "wrapped_driver", driver)
+        key = driver.session_id
+        if refresh or key not in cls._cache:
+            cls._cache[key] = cls(driver.execute_script(_SNAPSHOT_SCRIPT))
+        return cls._cache[key]
+
+    @classmethod
+    def invalidate(cls, driver):
+        """Drop the cached snapshot; the page has changed"""
+        driver = getattr(driver, "wrapped_driver", driver)
+        cls._cache.pop(driver.session_id, None)
+
+    def contains(self, *phrases):
+        """True if any phrase appears in the visible text (case-insensitive)"""
+        return any(phrase.lower() in self._lower_text for phrase in phrases)
+
+    def inputs_of_type(self, *types):
+        return [i for i in self.inputs if i["type"] in types]
+
+    def inputs_matching(self, word):
+        """Inputs whose type, name, id or placeholder mention a word"""
+        word = word.lower()
+        return [
+            i for i in self.inputs
+            if any(word in i[field].lower() for field in ("type", "name", "id", "placeholder"))
+        ]
+
+    @property
+    def enabled_buttons(self):
+        return [b for b in self.buttons if b["enabled"]]
+
+    def buttons_labelled(self, *labels):
+        """Buttons whose text contains any of the labels (case-insensitive)"""
+        labels = [label.lower() for label in labels]
+        return [b for b in self.buttons if any(label in b["text"].lower() for label in labels)]
+
+    def has_landmark(self, *names):
+        """True if any of the named landmarks (nav, header, ...) is present"""
+        return any(self.landmarks.get(name, 0) > 0 for name in names)
+
+    def __repr__(self):
+        return (f"<DomSnapshot {self.url} title={self.title!r} inputs={len(self.inputs)} "
+                f"buttons={len(self.buttons)} links={len(self.links)}>")
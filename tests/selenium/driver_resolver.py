@@ -0,0 +1,170 @@
+"""
+Offline ChromeDriver resolution for Selenium tests
+Matches the installed Chromium against drivers already on disk so that
+suite startup never depends on webdriver-manager's remote metadata
+"""
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+
+
+# Also the binary browser_pool launches, so the driver matches that browser
+BROWSER_CANDIDATES = [
+    "/usr/bin/chromium",
+    "/usr/bin/chromium-browser",
+    "/usr/bin/google-chrome",
+]
+
+DRIVER_CANDIDATES = [
+    "/usr/bin/chromedriver",
+    "/usr/local/bin/chromedriver",
+    "/usr/lib/chromium/chromedriver",
+    "/usr/lib/chromium-browser/chromedriver",
+]
+
+CACHE_DIR = os.getenv(
+    "CHROMEDRIVER_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "foodhub", "chromedriver")
+)
+
+_VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+
+class DriverResolutionError(RuntimeError):
+    """No ChromeDriver matching the installed browser could be found"""
+
+
+def _version(executable):
+    """Full version string reported by `<executable> --version`, or None"""
+    try:
+        output = subprocess.run(
+            [executable, "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def browser_path():
+    """The Chromium/Chrome binary tests launch: CHROME_BIN, then BROWSER_CANDIDATES"""
+    for path in [os.getenv("CHROME_BIN")] + BROWSER_CANDIDATES:
+        if _is_executable(path):
+            return path
+    return None
+
+
+def find_browser():
+    """Path and version of the browser tests launch, or (None, None)"""
+    path = browser_path()
+    version = _version(path) if path else None
+    return (path, version) if version else (None, None)
+
+
+class ChromeDriverResolver:
+    """
+    Finds a ChromeDriver for the installed browser using only local files
+
+    Looks at explicit environment variables, the local driver cache, system
+    packages and webdriver-manager's own cache, and remembers the result per
+    browser version in <cache>/resolved.json. The network is only used when
+    allow_download is set.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, allow_download=False):
+        self.cache_dir = cache_dir
+        self.allow_download = allow_download
+        self.index_path = os.path.join(cache_dir, "resolved.json")
+
+    def resolve(self):
+        """Path to a matching chromedriver executable"""
+        browser_path, browser_version = find_browser()
+        index = self._load_index()
+
+        if browser_version:
+            cached = index.get(browser_version)
+            # The driver may have been removed or upgraded since it was cached
+            if _is_executable(cached) and _major(_version(cached)) == _major(browser_version):
+                return cached
+
+        driver_path = self._find_local(browser_version)
+        if driver_path is None and self.allow_download:
+            driver_path = self._download(browser_version)
+        if driver_path is None:
+            browser = f"{browser_path} ({browser_version})" if browser_path else "(no browser found)"
+            raise DriverResolutionError(
+                f"No local ChromeDriver matches browser {browser}. "
+                f"Set CHROMEDRIVER_PATH, put a driver in {self.cache_dir}/<version>/, "
+                "or allow a download with --allow-driver-download"
+            )
+
+        if browser_version:
+            index[browser_version] = driver_path
+            self._save_index(index)
+        return driver_path
+
+    def _candidates(self):
+        """Local chromedriver executables, most specific first"""
+        paths = [os.getenv("CHROMEDRIVER_PATH"), os.getenv("CHROMEDRIVER_BIN")]
+        paths += sorted(glob.glob(os.path.join(self.cache_dir, "*", "chromedriver")), reverse=True)
+        paths += DRIVER_CANDIDATES + [shutil.which("chromedriver")]
+        paths += sorted(glob.glob(os.path.join(
+            os.path.expanduser("~"), ".wdm", "drivers", "chromedriver", "**", "chromedriver"
+        ), recursive=True), reverse=True)
+
+        seen = set()
+        for path in paths:
+            if _is_executable(path) and os.path.realpath(path) not in seen:
+                seen.add(os.path.realpath(path))
+                yield path
+
+    def _find_local(self, browser_version):
+        """First local driver whose major version matches the browser"""
+        for path in self._candidates():
+            if browser_version is None:
+                # Unknown browser: trust the first driver we find
+                return path
+            if _major(_version(path)) == _major(browser_version):
+                return path
+        return None
+
+    def _download(self, browser_version):
+        """Fetch a driver through webdriver-manager and keep a copy in the cache"""
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        print(f"Downloading ChromeDriver for browser {browser_version}...")
+        downloaded = ChromeDriverManager().install()
+        target_dir = os.path.join(self.cache_dir, _version(downloaded) or "unknown")
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, "chromedriver")
+        shutil.copy2(downloaded, target)
+        return target
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(index, f, indent=2)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            # Read-only home directory: resolution still works, just not cached
+            print(f"Could not cache ChromeDriver location: {e}")
@@ -0,0 +1,303 @@
+"""
+Test impact index for change-based test selection
+Maps every test to the frontend files (from JS coverage), the API
+endpoints and the backend route files it touches, so a diff can be
+turned into the list of tests worth running.
+
+Paths are relative to the repository root, as git prints them.
+
+Usage:
+    python impact_index.py show reports/impact_index.json
+    python impact_index.py select reports/impact_index.json origin/main
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import re
+import subprocess
+import time
+from urllib.parse import urlsplit
+
+from performance_log import PerformanceLog
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+IMPACT_DIR = "impact"
+RAW_PREFIX = "endpoints-"
+
+# Mounts in backend/server.js
+ROUTE_FILES = {
+    "/api/users": "backend/routes/users.js",
+    "/api/restaurants": "backend/routes/restaurants.js",
+    "/api/menu": "backend/routes/menu.js",
+    "/api/orders": "backend/routes/orders.js",
+}
+
+# Changes that cannot affect a browser test
+IGNORED = ("*.md", ".gitignore", ".gitattributes", ".dockerignore", ".env.template")
+# Run outputs of the suite; test_report.html is tracked and rewritten by every run
+IGNORED_DIRS = ("tests/selenium/reports/", "tests/selenium/screenshots/")
+
+_OBJECT_ID = re.compile(r"^[0-9a-f]{24}$|^\d+$")
+_IMPORT = re.compile(r"""(?:import\s[^'"]*|import\(|require\()\s*['"](\.[^'"]+)['"]""")
+_SOURCE_EXTENSIONS = ("", ".js", ".jsx", "/index.js")
+
+
+def endpoint(method, url):
+    """'PATCH http://api/api/orders/65f0.../status' -> 'PATCH /api/orders/:id/status'"""
+    path = urlsplit(url).path.rstrip("/") or "/"
+    parts = [":id" if _OBJECT_ID.match(part) else part for part in path.split("/")]
+    return f"{method.upper()} {'/'.join(parts)}"
+
+
+def route_file(endpoint_name):
+    """Backend route file serving an endpoint, None for /health and unknown paths"""
+    path = endpoint_name.split(" ", 1)[-1]
+    for mount, file in ROUTE_FILES.items():
+        if path == mount or path.startswith(mount + "/"):
+            return file
+    return None
+
+
+class EndpointRecorder:
+    """
+    Backend endpoints each test calls, from the API client and the browser
+
+    ApiClient and AuthSessionCache report their calls through note(); the
+    browser's requests are read from the CDP performance log when the test
+    ends. Pooled browsers clear that log on release, so it only holds
+    requests of the current test.
+    """
+
+    # Recorder used by ApiClient, set up by conftest with --record-impact
+    active = None
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tests = {}
+        self.current = None
+
+    def clear(self):
+        """Remove raw files left by an earlier run in the same directory"""
+        for path in glob.glob(os.path.join(self.directory, RAW_PREFIX + "*.json")):
+            os.remove(path)
+
+    def begin(self, test):
+        self.current = set()
+
+    def note(self, method, url):
+        if self.current is not None:
+            self.current.add(endpoint(method, url))
+
+    def end(self, test, driver=None):
+        if self.current is None:
+            return
+        if driver is not None:
+            raw = getattr(driver, "wrapped_driver", driver)
+            log = PerformanceLog.for_driver(raw)
+            log.poll()
+            for event in log.events:
+                if event.get("method") != "Network.requestWillBeSent":
+                    continue
+                request = event["params"].get("request", {})
+                if urlsplit(request.get("url", "")).path.startswith("/api/"):
+                    self.note(request.get("method", "GET"), request["url"])
+        self.tests[test] = sorted(self.current)
+        self.current = None
+
+    def save(self):
+        """Write endpoints-<pid>.json; returns its path (None if nothing ran)"""
+        if not self.tests:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{RAW_PREFIX}{os.getpid()}.json")
+        with open(path, "w") as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+        return path
+
+
+def _git(*args):
+    result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def head_commit():
+    try:
+        return _git("rev-parse", "HEAD").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def changed_files(base):
+    """Files changed since base, including uncommitted and untracked ones"""
+    changed = set(_git("diff", "--name-only", base).split())
+    changed.update(_git("ls-files", "--others", "--exclude-standard").split())
+    return sorted(changed)
+
+
+def _resolve_import(importer, target):
+    base = os.path.normpath(os.path.join(os.path.dirname(importer), target))
+    for extension in _SOURCE_EXTENSIONS:
+        if os.path.isfile(os.path.join(REPO_ROOT, base + extension)):
+            return base + extension
+    return None
+
+
+def importers(path):
+    """JS files under src/ importing path (stylesheets, images, JSON)"""
+    found = []
+    for root, _, files in os.walk(os.path.join(REPO_ROOT, "src")):
+        for name in files:
+            if not name.endswith((".js", ".jsx")):
+                continue
+            source = os.path.relpath(os.path.join(root, name), REPO_ROOT)
+            with open(os.path.join(REPO_ROOT, source), errors="replace") as f:
+                targets = _IMPORT.findall(f.read())
+            if any(_resolve_import(source, target) == path for target in targets):
+                found.append(source)
+    return found
+
+
+def routes_using_model(path):
+    """Route files requiring a backend model"""
+    model = os.path.splitext(os.path.basename(path))[0]
+    pattern = re.compile(r"""require\(\s*['"]\.\./models/%s(\.js)?['"]""" % re.escape(model))
+    found = []
+    for route in ROUTE_FILES.values():
+        try:
+            with open(os.path.join(REPO_ROOT, route)) as f:
+                if pattern.search(f.read()):
+                    found.append(route)
+        except OSError:
+            continue
+    return found
+
+
+class ImpactIndex:
+    """
+    Per-test frontend files, endpoints and route files, stored as JSON
+
+    Updates are incremental: tests that ran replace their own entry and
+    keep the files of the previous entry when the run had no coverage;
+    tests that did not run keep theirs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.commit = None
+        self.updated = None
+        self.tests = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.commit = data.get("commit")
+        self.updated = data.get("updated")
+        self.tests = data.get("tests", {})
+
+    def update(self, endpoints_by_test, files_by_test=None, commit=None):
+        """Merge one run; files_by_test is None when the run had no JS coverage"""
+        for test, endpoints in endpoints_by_test.items():
+            previous = self.tests.get(test, {})
+            files = previous.get("files", [])
+            if files_by_test is not None:
+                files = files_by_test.get(test, [])
+            self.tests[test] = {
+                "files": sorted(files),
+                "endpoints": sorted(endpoints),
+                "routes": sorted({r for r in map(route_file, endpoints) if r}),
+            }
+        self.commit = commit or self.commit
+        self.updated = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def prune(self, tests):
+        """Forget tests that no longer exist"""
+        for test in set(self.tests) - set(tests):
+            del self.tests[test]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"commit": self.commit, "updated": self.updated, "tests": self.tests},
+                      f, indent=2, sort_keys=True)
+
+    def _tests_with(self, key, paths):
+        return [test for test, entry in self.tests.items() if set(entry.get(key, [])) & set(paths)]
+
+    def affected(self, path):
+        """Tests affected by a changed file; None means every test"""
+        if any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in IGNORED):
+            return []
+        if path.startswith(IGNORED_DIRS):
+            return []
+        if path.startswith("src/"):
+            if path.endswith((".js", ".jsx")):
+                return self._tests_with("files", [path])
+            users = importers(path)
+            return self._tests_with("files", users) if users else None
+        if path.startswith("backend/routes/"):
+            return self._tests_with("routes", [path])
+        if path.startswith("backend/models/"):
+            return self._tests_with("routes", routes_using_model(path))
+        # Server setup, packages, build files, the suite itself
+        return None
+
+    def select(self, changed, tests, smoke=()):
+        """
+        {test: reason} for the tests to run, in suite order
+        tests is the collected suite; smoke holds substrings of node ids
+        that always run
+        """
+        reasons = {}
+        for test in tests:
+            if any(pattern in test for pattern in smoke):
+                reasons.setdefault(test, "smoke set")
+            elif test not in self.tests:
+                reasons.setdefault(test, "not in impact index")
+        for path in changed:
+            affected = self.affected(path)
+            if affected is None:
+                return {test: f"{path} changed" for test in tests}
+            for test in affected:
+                reasons.setdefault(test, f"touches {path}")
+        return {test: reasons[test] for test in tests if test in reasons}
+
+
+def load_endpoints(directories):
+    """Merged raw endpoint files of one run"""
+    endpoints = {}
+    for directory in directories:
+        for path in sorted(glob.glob(os.path.join(directory, RAW_PREFIX + "*.json"))):
+            with open(path) as f:
+                endpoints.update(json.load(f))
+    return endpoints
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inspect the FoodHub test impact index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print what each test touches")
+    show.add_argument("index")
+    select = sub.add_parser("select", help="print the tests affected by changes since a git ref")
+    select.add_argument("index")
+    select.add_argument("base")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    index = ImpactIndex(args.index)
+    if args.command == "show":
+        print(f"Impact index at {index.commit or 'unknown commit'}, updated {index.updated}")
+        for test, entry in sorted(index.tests.items()):
+            print(test)
+            for key in ("files", "routes", "endpoints"):
+                for value in entry.get(key, []):
+                    print(f"    {key[:-1]}: {value}")
+    else:
+        tests = sorted(index.tests)
+        for test, reason in index.select(changed_files(args.base), tests).items():
+            print(f"{test}  ({reason})")
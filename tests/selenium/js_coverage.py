@@ -0,0 +1,352 @@
+"""
+Frontend JavaScript coverage through the Chrome DevTools Protocol
+Block-level precise coverage (Profiler.startPreciseCoverage) is taken per
+test and stored as covered byte ranges per bundle URL. Bundles and their
+source maps are fetched once at the end of the run; mapping back to the
+files under src/ only happens when reports are merged.
+
+Usage:
+    python js_coverage.py reports/coverage reports/worker-*/coverage
+"""
+import argparse
+import bisect
+import glob
+import hashlib
+import html
+import json
+import os
+import re
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+from selenium.webdriver.support.events import AbstractEventListener
+
+
+COVERAGE_DIR = "coverage"
+RAW_PREFIX = "raw-"
+
+_BASE64 = {c: i for i, c in enumerate(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+)}
+_SOURCE_MAP_URL = re.compile(r"//[#@] sourceMappingURL=(\S+)\s*$")
+
+
+def covered_intervals(functions):
+    """
+    Flatten V8 block coverage into sorted, non-overlapping covered ranges
+
+    Ranges nest (function, then blocks inside it); the innermost range
+    covering an offset decides whether it ran.
+    """
+    ranges = sorted(
+        ((r["startOffset"], r["endOffset"], r["count"]) for f in functions for r in f["ranges"]),
+        key=lambda r: (r[0], -r[1])
+    )
+    points = sorted({p for start, end, _ in ranges for p in (start, end)})
+    covered = []
+    stack = []
+    index = 0
+    for start, end in zip(points, points[1:]):
+        while stack and stack[-1][1] <= start:
+            stack.pop()
+        while index < len(ranges) and ranges[index][0] <= start:
+            if ranges[index][1] > start:
+                stack.append(ranges[index])
+            index += 1
+        if stack and stack[-1][2] > 0:
+            if covered and covered[-1][1] == start:
+                covered[-1][1] = end
+            else:
+                covered.append([start, end])
+    return covered
+
+
+def union(a, b):
+    """Union of two sorted interval lists"""
+    merged = []
+    for start, end in sorted(a + b):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def decode_mappings(mappings):
+    """Source map v3 'mappings' -> (generated line, column, source index, original line)"""
+    source = original_line = 0
+    for generated_line, line in enumerate(mappings.split(";")):
+        column = 0
+        for segment in filter(None, line.split(",")):
+            values = []
+            value = shift = 0
+            for char in segment:
+                digit = _BASE64[char]
+                value += (digit & 31) << shift
+                if digit & 32:
+                    shift += 5
+                else:
+                    values.append(-(value >> 1) if value & 1 else value >> 1)
+                    value = shift = 0
+            column += values[0]
+            if len(values) >= 4:
+                source += values[1]
+                original_line += values[2]
+                yield generated_line, column, source, original_line
+
+
+def normalize_source(path):
+    """webpack://foodhub/./src/App.js -> src/App.js; None for code outside src/"""
+    path = re.sub(r"^webpack://[^/]*/", "", path).lstrip("./")
+    if "node_modules" in path or not path.startswith("src/"):
+        return None
+    return path
+
+
+class JsCoverage(AbstractEventListener):
+    """
+    Precise coverage of one test in one browser tab
+
+    Coverage is taken right before every navigation (scripts of the old
+    document disappear with it) and when the test finishes. Each take
+    resets V8's counters, so nothing leaks between tests.
+    """
+
+    def __init__(self, driver, origins):
+        self.driver = getattr(driver, "wrapped_driver", driver)
+        self.origins = {"{0.scheme}://{0.netloc}".format(urlsplit(o)) for o in origins}
+        self.scripts = {}
+        self.available = True
+
+    def _cdp(self, command, params=None):
+        return self.driver.execute_cdp_cmd(command, params or {})
+
+    def start(self):
+        """Start (or restart, after a tab change) coverage and drop earlier counts"""
+        try:
+            self._cdp("Profiler.enable")
+            self._cdp("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+            self._cdp("Profiler.takePreciseCoverage")
+        except Exception:
+            # Not Chromium, or CDP not reachable: run without coverage
+            self.available = False
+        return self
+
+    def take(self):
+        if not self.available:
+            return
+        try:
+            result = self._cdp("Profiler.takePreciseCoverage")["result"]
+        except Exception:
+            return
+        for script in result:
+            url = script["url"].split("#")[0]
+            if not url.endswith(".js") or "{0.scheme}://{0.netloc}".format(urlsplit(url)) not in self.origins:
+                continue
+            self.scripts[url] = union(self.scripts.get(url, []), covered_intervals(script["functions"]))
+
+    def before_navigate_to(self, url, driver):
+        self.take()
+
+    def before_navigate_back(self, driver):
+        self.take()
+
+    def before_navigate_forward(self, driver):
+        self.take()
+
+    def finish(self):
+        """Covered ranges per bundle URL for the whole test"""
+        self.take()
+        if self.available:
+            try:
+                self._cdp("Profiler.stopPreciseCoverage")
+            except Exception:
+                pass
+        return self.scripts
+
+
+class CoverageRecorder:
+    """Per-test coverage of one pytest process, written as a raw file"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.tests = {}
+
+    def clear(self):
+        """Remove raw files left by an earlier run in the same directory"""
+        for path in glob.glob(os.path.join(self.directory, RAW_PREFIX + "*.json")):
+            os.remove(path)
+
+    def add(self, test, scripts):
+        if scripts:
+            self.tests[test] = scripts
+
+    def _fetch(self, url):
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.read().decode("utf-8", errors="replace")
+
+    def _save_source(self, url):
+        """Bundle and its source map under sources/; None if unavailable"""
+        try:
+            code = self._fetch(url)
+            match = _SOURCE_MAP_URL.search(code[-500:])
+            if not match or match.group(1).startswith("data:"):
+                return None
+            source_map = self._fetch(urljoin(url, match.group(1)))
+        except Exception as e:
+            print(f"Coverage: could not fetch {url} or its source map: {e}")
+            return None
+        name = hashlib.sha1(url.encode()).hexdigest()[:16]
+        sources = os.path.join(self.directory, "sources")
+        os.makedirs(sources, exist_ok=True)
+        # Kept byte for byte: coverage offsets count every character, \r included
+        with open(os.path.join(sources, name + ".js"), "w", encoding="utf-8", newline="") as f:
+            f.write(code)
+        with open(os.path.join(sources, name + ".js.map"), "w", encoding="utf-8") as f:
+            f.write(source_map)
+        return name
+
+    def save(self):
+        """Write raw-<pid>.json; returns its path (None if nothing was recorded)"""
+        if not self.tests:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        urls = sorted({url for scripts in self.tests.values() for url in scripts})
+        sources = {url: self._save_source(url) for url in urls}
+        path = os.path.join(self.directory, f"{RAW_PREFIX}{os.getpid()}.json")
+        with open(path, "w") as f:
+            json.dump({"tests": self.tests, "sources": sources}, f)
+        return path
+
+
+class _Bundle:
+    """Generated-code offsets -> original src/ lines, resolved on first use"""
+
+    def __init__(self, directory, name):
+        with open(os.path.join(directory, "sources", name + ".js"), encoding="utf-8", newline="") as f:
+            code = f.read()
+        with open(os.path.join(directory, "sources", name + ".js.map"), encoding="utf-8") as f:
+            source_map = json.load(f)
+        # V8 offsets and source map columns count UTF-16 code units, so an
+        # emoji outside the BMP takes two
+        line_starts = [0]
+        for line in code.split("\n")[:-1]:
+            line_starts.append(line_starts[-1] + len(line.encode("utf-16-le")) // 2 + 1)
+        files = [normalize_source(s) for s in source_map["sources"]]
+        # (generated offset, file, 1-based original line), sorted by offset
+        self.points = sorted(
+            (line_starts[gen_line] + column, files[source], original_line + 1)
+            for gen_line, column, source, original_line in decode_mappings(source_map["mappings"])
+            if gen_line < len(line_starts) and files[source]
+        )
+        self.offsets = [p[0] for p in self.points]
+
+    def lines(self, intervals):
+        """{(file, line): covered} for every mapped line of the bundle"""
+        result = {}
+        for offset, file, line in self.points:
+            key = (file, line)
+            if result.get(key):
+                continue
+            position = bisect.bisect_right(intervals, [offset, float("inf")]) - 1
+            result[key] = position >= 0 and intervals[position][0] <= offset < intervals[position][1]
+        return result
+
+
+def merge(directories):
+    """
+    Combine raw files of one or more runs/workers
+    Returns ({file: {line: tests_covering}}, {test: [files]})
+    """
+    line_hits = {}
+    per_test = {}
+    bundles = {}
+    for directory in directories:
+        for raw_path in sorted(glob.glob(os.path.join(directory, RAW_PREFIX + "*.json"))):
+            with open(raw_path) as f:
+                raw = json.load(f)
+            for test, scripts in raw["tests"].items():
+                touched = set()
+                for url, intervals in scripts.items():
+                    name = raw["sources"].get(url)
+                    if name is None:
+                        continue
+                    key = (directory, name)
+                    if key not in bundles:
+                        bundles[key] = _Bundle(directory, name)
+                    for (file, line), covered in bundles[key].lines(intervals).items():
+                        hits = line_hits.setdefault(file, {})
+                        hits[line] = hits.get(line, 0) + (1 if covered else 0)
+                        if covered:
+                            touched.add(file)
+                per_test[test] = sorted(touched | set(per_test.get(test, [])))
+    return line_hits, per_test
+
+
+def write_lcov(line_hits, path):
+    with open(path, "w") as f:
+        for file, hits in sorted(line_hits.items()):
+            f.write(f"TN:\nSF:{file}\n")
+            for line, count in sorted(hits.items()):
+                f.write(f"DA:{line},{count}\n")
+            f.write(f"LF:{len(hits)}\nLH:{sum(1 for c in hits.values() if c)}\nend_of_record\n")
+
+
+def write_html(line_hits, per_test, path):
+    """File table with line coverage and the tests that exercised each file"""
+    tests_by_file = {}
+    for test, files in per_test.items():
+        for file in files:
+            tests_by_file.setdefault(file, []).append(test)
+    rows = []
+    total_found = total_hit = 0
+    for file, hits in sorted(line_hits.items()):
+        found = len(hits)
+        hit = sum(1 for c in hits.values() if c)
+        total_found += found
+        total_hit += hit
+        tests = tests_by_file.get(file, [])
+        rows.append(
+            f"<tr><td>{html.escape(file)}</td><td>{hit}/{found}</td>"
+            f"<td>{100 * hit / found if found else 0:.1f}%</td>"
+            f"<td title='{html.escape(chr(10).join(tests))}'>{len(tests)}</td></tr>"
+        )
+    percent = 100 * total_hit / total_found if total_found else 0
+    with open(path, "w") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>FoodHub JS coverage</title>"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{border:1px solid #ccc;padding:4px 8px}</style></head><body>"
+            f"<h1>FoodHub JS coverage: {percent:.1f}% of lines</h1>"
+            "<table><tr><th>file</th><th>lines</th><th>coverage</th><th>tests</th></tr>"
+            + "".join(rows) + "</table></body></html>"
+        )
+    return percent
+
+
+def write_reports(output, directories):
+    """Merge raw coverage into output/lcov.info and output/index.html"""
+    line_hits, per_test = merge(directories)
+    if not line_hits:
+        return None
+    os.makedirs(output, exist_ok=True)
+    write_lcov(line_hits, os.path.join(output, "lcov.info"))
+    with open(os.path.join(output, "tests.json"), "w") as f:
+        json.dump(per_test, f, indent=2)
+    return write_html(line_hits, per_test, os.path.join(output, "index.html"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Merge FoodHub JS coverage into lcov and HTML")
+    parser.add_argument("output", help="directory for lcov.info, tests.json and index.html")
+    parser.add_argument("inputs", nargs="+", help="coverage directories containing raw-*.json files")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    percent = write_reports(args.output, args.inputs)
+    if percent is None:
+        print("No coverage data found")
+    else:
+        print(f"JS line coverage: {percent:.1f}% ({args.output}/lcov.info)")
@@ -0,0 +1,225 @@
+"""
+Soak test for long-lived customer sessions
+Repeats one in-app interaction cycle (cart modal, restaurant menu, order
+history) many times in the same document and samples the JS heap, DOM
+nodes and event listeners after forcing garbage collection. A cycle
+whose numbers keep climbing is reported as a leak, and a heap snapshot
+of the worst one is saved for DevTools' Memory panel.
+"""
+import math
+import os
+
+import trio
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+import locator
+from test_helpers import TestHelpers
+
+
+# Growth per cycle above which a metric counts as leaking
+HEAP_SLOPE_BYTES = 16 * 1024
+DETACHED_SLOPE = 1.0
+LISTENER_SLOPE = 1.0
+# Fits worse than this (r squared) are GC noise, not steady growth
+MIN_FIT = 0.6
+# Cycles run before sampling, so lazy initialisation and caches settle
+WARMUP_CYCLES = 2
+
+_LIST = "a[href*='/restaurant/']"
+_LIST_READY = "[class*='filtersSection']"
+_HOME_LINK = "//header//a[@href='/']"
+_ORDERS_LINK = "//header//a[@href='/orders']"
+
+
+def _back_to_list(driver):
+    driver.find_element(By.XPATH, _HOME_LINK).click()
+    TestHelpers.wait_for_page_ready(driver, markers=(_LIST_READY,))
+
+
+def _cart_modal(driver):
+    driver.find_element(By.XPATH, "//header//button[contains(., 'Cart')]").click()
+    locator.find(driver, By.CSS_SELECTOR, "[data-testid='modal']", timeout=5)
+    driver.find_element(By.CSS_SELECTOR, "[data-testid='modal-backdrop']").click()
+    locator.wait_absent(driver, By.CSS_SELECTOR, "[data-testid='modal']", timeout=5)
+
+
+def _restaurant_menu(driver):
+    locator.find_clickable(driver, By.CSS_SELECTOR, _LIST, timeout=10).click()
+    TestHelpers.wait_for_page_ready(driver, markers=("[class*='menuContainer']",))
+    _back_to_list(driver)
+
+
+def _order_history(driver):
+    driver.find_element(By.XPATH, _ORDERS_LINK).click()
+    TestHelpers.wait_for_page_ready(
+        driver, markers=("[class*='orderCard'], [class*='emptyState']",)
+    )
+    _back_to_list(driver)
+
+
+# name, cycle starting and ending on the restaurant list, selector it needs
+SOAK_CYCLES = [
+    ("cart_modal", _cart_modal, None),
+    ("restaurant_menu", _restaurant_menu, _LIST),
+    ("order_history", _order_history, None),
+]
+
+
+def fit_trend(values):
+    """Least-squares slope per step and r squared of a series"""
+    n = len(values)
+    if n < 2:
+        return 0.0, 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    sxx = sum((x - mean_x) ** 2 for x in range(n))
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    syy = sum((y - mean_y) ** 2 for y in values)
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy else 0.0
+    return slope, r2
+
+
+def _count_nodes(node):
+    """Nodes in a DOM.getDocument tree, including shadow roots and frames"""
+    count = 1
+    for key in ("children", "shadowRoots", "pseudoElements"):
+        for child in node.get(key, []):
+            count += _count_nodes(child)
+    for key in ("contentDocument", "templateContent"):
+        if key in node:
+            count += _count_nodes(node[key])
+    return count
+
+
+class LeakDetector:
+    """
+    Runs the soak cycles on one logged-in customer browser
+
+    Like PageBenchmark it drives the unwrapped driver, so per-test page
+    metrics and coverage listeners stay out of the measurements.
+    """
+
+    def __init__(self, driver, base_url, cycles=20, snapshot_dir=None):
+        self.driver = getattr(driver, "wrapped_driver", driver)
+        self.base_url = base_url.rstrip("/")
+        self.cycles = cycles
+        self.snapshot_dir = snapshot_dir
+        self.worst = None
+
+    def _cdp(self, command, params=None):
+        return self.driver.execute_cdp_cmd(command, params or {})
+
+    def sample(self):
+        """Heap, DOM and listener counts after a full garbage collection"""
+        # A second pass frees what finalizers of the first released
+        self._cdp("HeapProfiler.collectGarbage")
+        self._cdp("HeapProfiler.collectGarbage")
+        metrics = {m["name"]: m["value"] for m in self._cdp("Performance.getMetrics")["metrics"]}
+        attached = _count_nodes(self._cdp("DOM.getDocument", {"depth": -1, "pierce": True})["root"])
+        memory = self.driver.execute_script(
+            "return performance.memory ? performance.memory.usedJSHeapSize : null;"
+        )
+        return {
+            "heap_bytes": metrics.get("JSHeapUsedSize", memory or 0),
+            "performance_memory_bytes": memory,
+            "nodes": metrics.get("Nodes", 0),
+            # Live nodes not reachable from the document
+            "detached_nodes": max(0, metrics.get("Nodes", 0) - attached),
+            "listeners": metrics.get("JSEventListeners", 0),
+        }
+
+    def _run_cycle(self, name, action):
+        for _ in range(WARMUP_CYCLES):
+            action(self.driver)
+        samples = [self.sample()]
+        for _ in range(self.cycles):
+            action(self.driver)
+            samples.append(self.sample())
+
+        result = {"cycles": self.cycles, "samples": samples, "leaking": []}
+        for metric, limit in (("heap_bytes", HEAP_SLOPE_BYTES),
+                              ("detached_nodes", DETACHED_SLOPE),
+                              ("listeners", LISTENER_SLOPE)):
+            slope, r2 = fit_trend([s[metric] for s in samples])
+            result[f"{metric}_per_cycle"] = round(slope, 1)
+            result[f"{metric}_r2"] = round(r2, 2)
+            if slope > limit and r2 >= MIN_FIT:
+                result["leaking"].append(metric)
+
+        severity = result["heap_bytes_per_cycle"] / HEAP_SLOPE_BYTES
+        if result["leaking"] and (self.worst is None or severity > self.worst[1]):
+            # Snapshot now, while the leaked objects are still alive
+            path = self.save_heap_snapshot(name)
+            if path:
+                self.worst = (name, severity, path)
+        return result
+
+    def run(self):
+        """Soak every cycle; returns {cycle: result} (plus the snapshot of the worst)"""
+        self._cdp("Performance.enable", {"timeDomain": "timeTicks"})
+        self._cdp("HeapProfiler.enable")
+        results = {}
+        try:
+            for name, action, needs in SOAK_CYCLES:
+                # Each cycle starts from a fresh document
+                TestHelpers.open_page(self.driver, self.base_url + "/", markers=(_LIST_READY,))
+                if needs and not locator.find_all(self.driver, By.CSS_SELECTOR, needs, timeout=5):
+                    results[name] = {"skipped": f"nothing matches {needs}"}
+                    continue
+                results[name] = self._run_cycle(name, action)
+        finally:
+            self._cdp("Performance.disable")
+            self._cdp("HeapProfiler.disable")
+        if self.worst:
+            results[self.worst[0]]["heap_snapshot"] = self.worst[2]
+        return results
+
+    def save_heap_snapshot(self, name):
+        """Write a .heapsnapshot of the current page; returns its path or None"""
+        if not self.snapshot_dir:
+            return None
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, f"{name}.heapsnapshot")
+        try:
+            trio.run(self._stream_snapshot, path)
+        except (WebDriverException, OSError, trio.TooSlowError) as e:
+            print(f"Heap snapshot of {name} failed: {e}")
+            return None
+        # Only the worst offender's snapshot is kept
+        if self.worst and self.worst[2] != path and os.path.exists(self.worst[2]):
+            os.remove(self.worst[2])
+        return path
+
+    async def _stream_snapshot(self, path):
+        # Snapshot chunks arrive as CDP events, which execute_cdp_cmd cannot
+        # receive, so this goes through Selenium's DevTools websocket
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            chunks = session.listen(devtools.heap_profiler.AddHeapSnapshotChunk, buffer_size=math.inf)
+            with trio.fail_after(120):
+                await session.execute(devtools.heap_profiler.enable())
+                await session.execute(devtools.heap_profiler.take_heap_snapshot(report_progress=False))
+            with open(path, "w") as f:
+                while True:
+                    try:
+                        f.write(chunks.receive_nowait().chunk)
+                    except trio.WouldBlock:
+                        break
+
+
+def format_results(results):
+    """Text table of soak results"""
+    lines = [f"{'cycle':<18}{'heap/cycle':>12}{'r2':>6}{'detached/cycle':>16}"
+             f"{'listeners/cycle':>17}  verdict"]
+    for name, result in results.items():
+        if "skipped" in result:
+            lines.append(f"{name:<18}skipped: {result['skipped']}")
+            continue
+        verdict = "LEAK: " + ", ".join(result["leaking"]) if result["leaking"] else "ok"
+        lines.append(
+            f"{name:<18}{result['heap_bytes_per_cycle'] / 1024:>10.1f}KB{result['heap_bytes_r2']:>6.2f}"
+            f"{result['detached_nodes_per_cycle']:>16.1f}{result['listeners_per_cycle']:>17.1f}  {verdict}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,362 @@
+"""
+Backend API load generator for FoodHub
+Drives a weighted mix of Express endpoints at a target request rate or
+concurrency and records HDR-style latency histograms per endpoint
+
+Meant for a disposable local stack (docker-compose up): it creates orders
+and changes their status.
+
+Usage:
+    python load_generator.py --duration 30 --rps 50
+    python load_generator.py --concurrency 20 --mix list_restaurants=70,create_order=30
+"""
+import argparse
+import asyncio
+import html
+import json
+import math
+import os
+import random
+import sys
+import time
+
+import aiohttp
+
+from test_helpers import TestData
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram in the style of HdrHistogram
+
+    Values are bucketed with a fixed number of significant digits (plus
+    one), so percentiles are accurate to 10**-digits relative error whatever
+    the range, and memory stays constant however many values are recorded.
+    """
+
+    def __init__(self, significant_digits=2):
+        self.sub_buckets = 10 ** significant_digits
+        self.counts = {}
+        self.total = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket(self, value):
+        """(decade, mantissa step) of a value, e.g. 123.4 -> (2, 123)"""
+        if value <= 0:
+            return (-99, 0)
+        exponent = math.floor(math.log10(value))
+        return (exponent, int(value / 10 ** exponent * self.sub_buckets))
+
+    def _bucket_value(self, bucket):
+        exponent, sub = bucket
+        return sub / self.sub_buckets * 10 ** exponent if sub else 0.0
+
+    def record(self, value):
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, pct):
+        if not self.total:
+            return None
+        target = max(1, math.ceil(self.total * pct / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.total:
+            return {"count": 0}
+        return {
+            "count": self.total,
+            "min_ms": round(self.min, 2),
+            "mean_ms": round(self.sum / self.total, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p90_ms": round(self.percentile(90), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "p999_ms": round(self.percentile(99.9), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+
+class EndpointStats:
+    """Latency, errors and throughput for one endpoint"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = {}
+
+    def record(self, latency_ms, error=None):
+        self.latency.record(latency_ms)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, duration):
+        result = self.latency.summary()
+        failed = sum(self.errors.values())
+        result["errors"] = dict(self.errors)
+        result["error_rate"] = round(failed / result["count"], 4) if result["count"] else 0.0
+        result["throughput_rps"] = round(result["count"] / duration, 2) if duration else 0.0
+        return result
+
+
+ORDER_STATUSES = ["confirmed", "preparing", "ready", "delivered"]
+
+DEFAULT_MIX = {
+    "list_restaurants": 40,
+    "restaurant_menu": 30,
+    "create_order": 10,
+    "update_order_status": 10,
+    "order_stats": 10,
+}
+
+
+class LoadGenerator:
+    """Runs the endpoint mix against the backend with aiohttp"""
+
+    def __init__(self, api_url, mix=None, seed=0):
+        self.api_url = api_url.rstrip("/")
+        self.mix = mix or DEFAULT_MIX
+        self.random = random.Random(seed)
+        self.stats = {name: EndpointStats() for name in self.mix}
+        self.restaurants = []
+        self.menu = {}
+        self.customer = None
+        self.orders = []
+        self.session = None
+
+    async def setup(self):
+        """Look up the ids the mix needs: restaurants, their menus and a customer"""
+        async with self.session.get(f"{self.api_url}/api/restaurants") as response:
+            response.raise_for_status()
+            self.restaurants = [r["_id"] for r in await response.json()]
+        async with self.session.get(f"{self.api_url}/api/menu") as response:
+            response.raise_for_status()
+            for item in await response.json():
+                restaurant = item.get("restaurant") or {}
+                restaurant_id = restaurant.get("_id") if isinstance(restaurant, dict) else restaurant
+                self.menu.setdefault(restaurant_id, []).append(item)
+
+        user = TestData.CUSTOMER_USER
+        async with self.session.post(f"{self.api_url}/api/users/login",
+                                     json={"email": user["email"]}) as response:
+            if response.status == 200:
+                self.customer = await response.json()
+        if self.customer is None:
+            payload = {"name": user["username"], "email": user["email"],
+                       "phone": "555-0100", "role": "customer"}
+            async with self.session.post(f"{self.api_url}/api/users", json=payload) as response:
+                response.raise_for_status()
+                self.customer = await response.json()
+
+        if not self.restaurants:
+            raise RuntimeError("No restaurants in the backend; seed some data first")
+
+    def _order_payload(self):
+        with_menu = [r for r in self.restaurants if self.menu.get(r)]
+        if not with_menu:
+            return None
+        restaurant_id = self.random.choice(with_menu)
+        item = self.random.choice(self.menu[restaurant_id])
+        quantity = self.random.randint(1, 3)
+        return {
+            "customer": self.customer["_id"],
+            "restaurant": restaurant_id,
+            "items": [{"menuItem": item["_id"], "quantity": quantity, "price": item["price"]}],
+            "totalAmount": round(item["price"] * quantity, 2),
+            "customerPhone": self.customer.get("phone", "555-0100"),
+            "deliveryAddress": {"street": "1 Load Test Way", "city": "Testville", "zipCode": "00000"},
+        }
+
+    def _next_request(self, name):
+        """(method, path, json body) for one request of an endpoint, or None"""
+        if name == "list_restaurants":
+            return "GET", "/api/restaurants", None
+        if name == "restaurant_menu":
+            return "GET", f"/api/menu/restaurant/{self.random.choice(self.restaurants)}", None
+        if name == "create_order":
+            payload = self._order_payload()
+            return ("POST", "/api/orders", payload) if payload else None
+        if name == "update_order_status":
+            if not self.orders:
+                return None
+            status = self.random.choice(ORDER_STATUSES)
+            return "PATCH", f"/api/orders/{self.random.choice(self.orders)}/status", {"status": status}
+        if name == "order_stats":
+            return "GET", "/api/orders/stats/overview", None
+        raise ValueError(f"Unknown endpoint in mix: {name}")
+
+    def _pick_endpoint(self):
+        names = list(self.mix)
+        name = self.random.choices(names, weights=[self.mix[n] for n in names])[0]
+        request = self._next_request(name)
+        if request is None:
+            # Nothing to patch yet, or no menu to order from
+            for name in ("create_order", "list_restaurants"):
+                request = self._next_request(name)
+                if request is not None:
+                    break
+        return name, request
+
+    async def _send(self, name, request, started):
+        """Issue one request; latency counts from `started` (the scheduled time)"""
+        method, path, body = request
+        error = None
+        try:
+            async with self.session.request(method, self.api_url + path, json=body) as response:
+                data = await response.read()
+                if response.status >= 400:
+                    error = f"HTTP {response.status}"
+                elif name == "create_order":
+                    self.orders.append(json.loads(data)["_id"])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = type(e).__name__
+        stats = self.stats.setdefault(name, EndpointStats())
+        stats.record((time.perf_counter() - started) * 1000, error)
+
+    async def _open_loop(self, rps, duration, max_inflight):
+        """
+        Fixed arrival rate: requests start on schedule whether or not earlier
+        ones finished, so a slow server cannot hide its latency
+        """
+        interval = 1.0 / rps
+        start = time.perf_counter()
+        limiter = asyncio.Semaphore(max_inflight)
+        tasks = []
+
+        async def fire(name, request, scheduled):
+            async with limiter:
+                await self._send(name, request, scheduled)
+
+        sent = 0
+        while True:
+            scheduled = start + sent * interval
+            if scheduled - start >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name, request = self._pick_endpoint()
+            tasks.append(asyncio.create_task(fire(name, request, scheduled)))
+            sent += 1
+        await asyncio.gather(*tasks)
+
+    async def _closed_loop(self, concurrency, duration):
+        """Fixed number of virtual users, each sending back-to-back"""
+        deadline = time.perf_counter() + duration
+
+        async def user():
+            while time.perf_counter() < deadline:
+                name, request = self._pick_endpoint()
+                await self._send(name, request, time.perf_counter())
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+
+    async def run(self, duration, rps=None, concurrency=10, timeout=10):
+        """Run the mix for `duration` seconds; returns the report dict"""
+        connector = aiohttp.TCPConnector(limit=max(concurrency, 100))
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+            self.session = session
+            await self.setup()
+            started = time.perf_counter()
+            if rps:
+                await self._open_loop(rps, duration, max_inflight=max(concurrency, 100))
+            else:
+                await self._closed_loop(concurrency, duration)
+            elapsed = time.perf_counter() - started
+
+        return {
+            "api_url": self.api_url,
+            "mode": f"{rps} rps" if rps else f"{concurrency} concurrent users",
+            "duration_s": round(elapsed, 2),
+            "mix": self.mix,
+            "endpoints": {name: s.summary(elapsed) for name, s in self.stats.items()},
+        }
+
+
+def write_report(report, report_dir):
+    """JSON and HTML report next to the Selenium test report"""
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, "load_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    columns = ["count", "throughput_rps", "error_rate", "p50_ms", "p90_ms", "p99_ms", "p999_ms", "max_ms"]
+    rows = "\n".join(
+        f"<tr><td>{html.escape(name)}</td>"
+        + "".join(f"<td>{stats.get(c, '')}</td>" for c in columns)
+        + f"<td>{html.escape(json.dumps(stats.get('errors', {})))}</td></tr>"
+        for name, stats in report["endpoints"].items()
+    )
+    path = os.path.join(report_dir, "load_report.html")
+    with open(path, "w") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>FoodHub API Load Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+td:first-child, td:last-child {{ text-align: left; }}
+</style></head><body>
+<h1>FoodHub API Load Report</h1>
+<p>{html.escape(report['api_url'])}, {report['mode']}, {report['duration_s']} s</p>
+<table><tr><th>endpoint</th>{''.join(f'<th>{c}</th>' for c in columns)}<th>errors</th></tr>
+{rows}
+</table></body></html>
+""")
+    return path
+
+
+def parse_mix(text):
+    """'list_restaurants=70,create_order=30' -> weights dict"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}', choose from {sorted(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the FoodHub backend API")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8080"))
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--rps", type=float, default=None,
+                        help="target request rate (open loop); default is closed loop")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="virtual users in closed loop, in-flight cap in open loop")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help="endpoint weights, e.g. list_restaurants=70,create_order=30")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-dir", default=os.getenv("REPORT_DIR", "reports"))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    generator = LoadGenerator(args.api_url, mix=args.mix, seed=args.seed)
+    print(f"Load testing {args.api_url} for {args.duration:.0f} s...")
+    report = asyncio.run(generator.run(args.duration, rps=args.rps, concurrency=args.concurrency))
+
+    print(f"{'endpoint':<22}{'count':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p99':>9}{'max':>9}")
+    for name, s in report["endpoints"].items():
+        if not s["count"]:
+            continue
+        print(f"{name:<22}{s['count']:>8}{s['throughput_rps']:>9.1f}{s['error_rate'] * 100:>7.1f}"
+              f"{s['p50_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+    print(f"Load report generated: {write_report(report, args.report_dir)}")
+    failed = any(s.get("error_rate", 0) > 0 for s in report["endpoints"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
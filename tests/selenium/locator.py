@@ -0,0 +1,108 @@
+"""
+Explicit-wait element lookups
+Browsers run with implicit waits off, so a find_elements that matches
+nothing returns at once. Waiting is opt-in and bounded per call, and
+strict mode reports every lookup that spent too long waiting.
+"""
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+DEFAULT_TIMEOUT = 10
+POLL_INTERVAL = 0.1
+
+
+class LookupMonitor:
+    """
+    Records lookups that waited longer than threshold_ms (strict mode)
+
+    Disabled while threshold_ms is None. Lookups are collected until
+    drained, which conftest does once per test.
+    """
+
+    threshold_ms = None
+    slow = []
+
+    @classmethod
+    def record(cls, description, waited_ms, found):
+        if cls.threshold_ms is not None and waited_ms > cls.threshold_ms:
+            cls.slow.append({
+                "lookup": description,
+                "waited_ms": round(waited_ms, 1),
+                "found": found,
+            })
+
+    @classmethod
+    def drain(cls):
+        slow, cls.slow = cls.slow, []
+        return slow
+
+
+def _describe(by, value):
+    return f"{by}={value}"
+
+
+def _poll(driver, timeout, condition):
+    """Run condition until it returns something truthy; None on timeout"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        return None
+
+
+def find_all(driver, by, value, timeout=0):
+    """
+    Matching elements; with a timeout, waits for at least one to appear
+    Returns an empty list when nothing matches in time
+    """
+    start = time.monotonic()
+    if timeout:
+        elements = _poll(driver, timeout, lambda d: d.find_elements(by, value)) or []
+    else:
+        elements = driver.find_elements(by, value)
+    LookupMonitor.record(_describe(by, value), (time.monotonic() - start) * 1000, bool(elements))
+    return elements
+
+
+def find(driver, by, value, timeout=DEFAULT_TIMEOUT):
+    """First matching element; raises TimeoutException if none appears in time"""
+    elements = find_all(driver, by, value, timeout=timeout)
+    if not elements:
+        raise TimeoutException(f"No element {_describe(by, value)} within {timeout}s")
+    return elements[0]
+
+
+def find_clickable(driver, by, value, timeout=DEFAULT_TIMEOUT):
+    """First matching element that is displayed and enabled, or None"""
+    start = time.monotonic()
+
+    def clickable(d):
+        for element in d.find_elements(by, value):
+            if element.is_displayed() and element.is_enabled():
+                return element
+        return None
+
+    element = _poll(driver, timeout, clickable)
+    LookupMonitor.record(f"clickable {_describe(by, value)}",
+                         (time.monotonic() - start) * 1000, element is not None)
+    return element
+
+
+def is_present(driver, by, value):
+    """True if the element exists right now (no waiting)"""
+    return bool(find_all(driver, by, value))
+
+
+def expect_absent(driver, by, value):
+    """True if no element matches right now (no waiting)"""
+    return not find_all(driver, by, value)
+
+
+def wait_absent(driver, by, value, timeout=DEFAULT_TIMEOUT):
+    """Wait until nothing matches, e.g. a closed modal; False on timeout"""
+    start = time.monotonic()
+    gone = _poll(driver, timeout, lambda d: not d.find_elements(by, value)) is not None
+    LookupMonitor.record(f"absent {_describe(by, value)}", (time.monotonic() - start) * 1000, not gone)
+    return gone
@@ -0,0 +1,284 @@
+"""
+Concurrent multi-user order flow in one Chrome
+Every simulated user gets its own isolated browser context (separate
+cookies, localStorage and cache) created through CDP
+Target.createBrowserContext in the test's browser, which is far cheaper
+than a browser per user. Pages are driven concurrently over CDP sessions
+(WebDriver can only talk to one window at a time).
+
+Customers go RestaurantList -> RestaurantMenu -> Cart -> checkout while a
+restaurant context works OrderManagement and the orders they place are
+confirmed. The run is repeated at increasing concurrency.
+"""
+import json
+import time
+import urllib.request
+from contextlib import AsyncExitStack
+
+import trio
+from selenium.webdriver.common.bidi import cdp
+
+from api_client import ApiError
+from auth_session import USER_STORAGE_KEY
+from page_benchmark import summarize
+
+
+CUSTOMER_STEPS = ["restaurant_list", "restaurant_menu", "add_to_cart", "open_cart", "checkout"]
+RESTAURANT_STEPS = ["order_management", "accept_orders"]
+STEP_TIMEOUT = 20
+POLL_INTERVAL = 0.05
+
+# Sets the context's user before the app boots, see contexts/UserContext.js
+# (about:blank has no localStorage, hence the try)
+_LOGIN_SCRIPT = "try { localStorage.setItem(%s, %s); } catch (e) {}"
+
+_CLICK = """
+(function () {
+    var matches = Array.prototype.filter.call(document.querySelectorAll(%(selector)s), function (el) {
+        return !%(text)s || el.textContent.indexOf(%(text)s) !== -1;
+    });
+    var el = matches[%(index)s === -1 ? Math.floor(Math.random() * matches.length) : %(index)s];
+    if (!el) { return false; }
+    el.click();
+    return true;
+})()
+"""
+
+class StepError(Exception):
+    """A step that failed or timed out in one user's context"""
+
+
+def browser_websocket(driver):
+    """Browser-level DevTools websocket URL and protocol version of a Chrome session"""
+    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        info = json.load(response)
+    version = driver.capabilities["browserVersion"].split(".")[0]
+    return info["webSocketDebuggerUrl"], version
+
+
+class ContextPage:
+    """One page in its own browser context, driven over a CDP session"""
+
+    def __init__(self, session, devtools):
+        self.session = session
+        self.devtools = devtools
+
+    async def evaluate(self, expression):
+        result, exception = await self.session.execute(self.devtools.runtime.evaluate(
+            expression, await_promise=True, return_by_value=True
+        ))
+        if exception is not None:
+            raise StepError(exception.text + (f": {exception.exception.description}"
+                                              if exception.exception else ""))
+        return result.value
+
+    async def wait_for(self, expression, timeout=STEP_TIMEOUT):
+        """Poll a JS expression until it is truthy; returns its value"""
+        with trio.move_on_after(timeout):
+            while True:
+                try:
+                    value = await self.evaluate(expression)
+                except StepError:
+                    # The document may be mid-navigation
+                    value = None
+                if value:
+                    return value
+                await trio.sleep(POLL_INTERVAL)
+        raise StepError(f"timed out waiting for {expression}")
+
+    async def navigate(self, url, ready):
+        await self.session.execute(self.devtools.page.navigate(url))
+        await self.wait_for(ready)
+
+    async def click(self, selector, text="", index=0):
+        """Click the index-th element matching selector (and text); -1 picks one at random"""
+        clicked = await self.evaluate(_CLICK % {
+            "selector": json.dumps(selector), "text": json.dumps(text), "index": index,
+        })
+        if not clicked:
+            raise StepError(f"nothing to click for {selector} {text!r}".strip())
+
+
+def _present(selector, text=""):
+    return ("Array.prototype.some.call(document.querySelectorAll(%s), function (el) {"
+            " return el.textContent.indexOf(%s) !== -1; })" % (json.dumps(selector), json.dumps(text)))
+
+
+class MultiUserScenario:
+    """
+    Runs the order flow for N customers and one restaurant per level
+
+    Customers are distinct users (sim-customer-<i>@foodhub.test),
+    registered on first use. Orders they place are cancelled afterwards.
+    """
+
+    def __init__(self, driver, base_url, api_url, api_client, restaurant_user, rounds=1):
+        self.driver = getattr(driver, "wrapped_driver", driver)
+        self.base_url = base_url.rstrip("/")
+        self.api_url = api_url.rstrip("/")
+        self.api = api_client
+        self.restaurant_user = restaurant_user
+        self.rounds = rounds
+
+    def _customer(self, index):
+        email = f"sim-customer-{index}@foodhub.test"
+        try:
+            return self.api.login(email)
+        except ApiError as e:
+            if e.response.status != 404:
+                raise
+            return self.api.register({"name": f"Sim Customer {index}", "email": email,
+                                      "phone": "555-0100", "role": "customer"})
+
+    async def _open_context(self, stack, connection, devtools, user):
+        context = await connection.execute(devtools.target.create_browser_context(dispose_on_detach=True))
+        target = await connection.execute(devtools.target.create_target("about:blank", browser_context_id=context))
+        # dispose_on_detach: contexts go away when the connection closes
+        session = await stack.enter_async_context(connection.open_session(target))
+        await session.execute(devtools.page.enable())
+        await session.execute(devtools.page.add_script_to_evaluate_on_new_document(
+            _LOGIN_SCRIPT % (json.dumps(USER_STORAGE_KEY), json.dumps(json.dumps(user)))
+        ))
+        return ContextPage(session, devtools)
+
+    async def _timed(self, results, step, action):
+        start = time.perf_counter()
+        try:
+            await action()
+        except StepError as e:
+            results["errors"].setdefault(step, []).append(str(e)[:200])
+            return False
+        results["steps"].setdefault(step, []).append((time.perf_counter() - start) * 1000)
+        return True
+
+    async def _customer_flow(self, page, results):
+        async def restaurant_list():
+            await page.navigate(self.base_url + "/", _present("a[href*='/restaurant/']"))
+
+        async def restaurant_menu():
+            await page.click("a[href*='/restaurant/']", index=-1)
+            await page.wait_for(_present("[class*='addToCartBtn']"))
+
+        async def add_to_cart():
+            await page.click("[class*='addToCartBtn']", index=-1)
+            await page.wait_for(
+                "Number((document.querySelector(\"header button [class*='count']\") || {}).textContent) > 0"
+            )
+
+        async def open_cart():
+            await page.click("header button", text="Cart")
+            await page.wait_for(_present("button", "Proceed to Order"))
+
+        async def checkout():
+            await page.click("button", text="Proceed to Order")
+            await page.wait_for(_present("button", "Confirm Order"))
+            await page.click("button", text="Confirm Order")
+            outcome = await page.wait_for(
+                "document.body.textContent.indexOf('Order Placed Successfully') !== -1 ? 'placed'"
+                " : document.body.textContent.indexOf('Order Failed') !== -1 ? 'failed' : ''"
+            )
+            if outcome == "failed":
+                raise StepError("app showed 'Order Failed'")
+
+        for _ in range(self.rounds):
+            for step, action in zip(CUSTOMER_STEPS,
+                                    (restaurant_list, restaurant_menu, add_to_cart, open_cart, checkout)):
+                if not await self._timed(results, step, action):
+                    break
+
+    async def _restaurant_flow(self, page, results, customer_ids, customers_done):
+        async def order_management():
+            await page.navigate(self.base_url + "/orders", _present("button", "Confirm Order"))
+            # OrderManagement lists demo orders; confirm the first pending one
+            await page.click("button", text="Confirm Order")
+            await page.wait_for(_present("button", "Start Preparing"))
+
+        async def accept_orders():
+            # OrderManagement does not call the API yet, and the backend's CORS
+            # setup does not allow PATCH from the browser, so this is sent from here
+            accepted, errors = await trio.to_thread.run_sync(self._accept_pending, customer_ids)
+            results["accepted"] = results.get("accepted", 0) + accepted
+            if errors:
+                raise StepError(", ".join(errors))
+
+        # Keep working until every customer has finished, then sweep once more
+        while True:
+            finished = customers_done.is_set()
+            await self._timed(results, "order_management", order_management)
+            await self._timed(results, "accept_orders", accept_orders)
+            if finished:
+                break
+
+    async def _level(self, customers):
+        """One run with `customers` concurrent customers and one restaurant"""
+        results = {"steps": {}, "errors": {}}
+        users = [self._customer(i) for i in range(customers)]
+        url, version = browser_websocket(self.driver)
+        devtools = cdp.import_devtools(version)
+        start = time.perf_counter()
+        async with cdp.open_cdp(url) as connection, AsyncExitStack() as stack:
+            restaurant = await self._open_context(stack, connection, devtools, self.restaurant_user)
+            pages = [await self._open_context(stack, connection, devtools, user) for user in users]
+            customers_done = trio.Event()
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(self._restaurant_flow, restaurant, results,
+                                   [u["_id"] for u in users], customers_done)
+                async with trio.open_nursery() as customer_nursery:
+                    for page in pages:
+                        customer_nursery.start_soon(self._customer_flow, page, results)
+                customers_done.set()
+        elapsed = time.perf_counter() - start
+
+        placed = len(results["steps"].get("checkout", []))
+        self._cancel_orders(users)
+        return {
+            "customers": customers,
+            "duration_s": round(elapsed, 2),
+            "orders_placed": placed,
+            "orders_accepted": results.get("accepted", 0),
+            "steps": {step: summarize(samples) for step, samples in results["steps"].items()},
+            "errors": {step: {"count": len(errors), "first": errors[0]}
+                       for step, errors in results["errors"].items()},
+        }
+
+    def _accept_pending(self, customer_ids):
+        """Confirm pending orders of the simulated customers; (accepted, errors)"""
+        accepted, errors = 0, []
+        for customer_id in customer_ids:
+            for order in self.api.get_orders_by_customer(customer_id):
+                if order["status"] != "pending":
+                    continue
+                response = self.api.patch(f"/api/orders/{order['_id']}/status", {"status": "confirmed"})
+                if response.status < 400:
+                    accepted += 1
+                else:
+                    errors.append(f"HTTP {response.status}")
+        return accepted, errors
+
+    def _cancel_orders(self, users):
+        for user in users:
+            for order in self.api.get_orders_by_customer(user["_id"]):
+                if order["status"] not in ("delivered", "cancelled"):
+                    self.api.update_order_status(order["_id"], "cancelled")
+
+    def run(self, levels=(1, 5, 10)):
+        """{customers: result} for every concurrency level"""
+        return {customers: trio.run(self._level, customers) for customers in levels}
+
+
+def format_results(results):
+    """Text table of step latencies and errors per concurrency level"""
+    lines = [f"{'users':>5}  {'step':<18}{'n':>5}{'median':>9}{'p95':>9}{'p99':>9}{'errors':>8}"]
+    for customers, level in results.items():
+        for step in CUSTOMER_STEPS + RESTAURANT_STEPS:
+            stats = level["steps"].get(step)
+            errors = level["errors"].get(step, {}).get("count", 0)
+            if not stats and not errors:
+                continue
+            stats = stats or {"samples": 0, "median_ms": 0, "p95_ms": 0, "p99_ms": 0}
+            lines.append(f"{customers:>5}  {step:<18}{stats['samples']:>5}{stats['median_ms']:>9.0f}"
+                         f"{stats['p95_ms']:>9.0f}{stats['p99_ms']:>9.0f}{errors:>8}")
+        lines.append(f"{customers:>5}  {level['orders_placed']} orders placed, "
+                     f"{level['orders_accepted']} accepted in {level['duration_s']} s")
+    return "\n".join(lines)
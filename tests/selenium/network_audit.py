@@ -0,0 +1,220 @@
+"""
+Network request audit per page
+Rebuilds every request of a test from the CDP Network events in the
+performance log and checks each page load for requests the app could do
+without: the same /api/ call fired twice, requests that only start once
+the previous one has answered (a chain deeper than MAX_CHAIN_DEPTH),
+uncompressed or oversized responses, and static assets served without
+the cache headers nginx.conf sets for them.
+"""
+import re
+from urllib.parse import urlsplit
+
+from performance_log import PerformanceLog
+
+
+# Decoded response size above which a request counts as oversized
+API_BUDGET_BYTES = 100 * 1024
+ASSET_BUDGET_BYTES = 1024 * 1024
+# Document -> bundle -> API call is the normal depth; one more is a waterfall
+MAX_CHAIN_DEPTH = 3
+# A request starting this soon after another finished is taken to depend on it
+CHAIN_GAP_S = 0.05
+# Same threshold as gzip_min_length in nginx.conf
+COMPRESS_MIN_BYTES = 1024
+COMPRESSIBLE = re.compile(r"json|javascript|css|html|xml|svg|text/")
+# Assets nginx.conf serves with "expires 1y" and Cache-Control immutable
+STATIC_ASSET = re.compile(r"\.(js|css|png|jpg|jpeg|gif|ico|svg)$", re.IGNORECASE)
+# Long-polling keeps re-requesting the same URL by design
+_IGNORED = ("/socket.io/", "/sockjs-node", "/ws")
+
+
+def collect_requests(events):
+    """One record per request (redirect hops included) from CDP Network events"""
+    requests, order = {}, []
+    for event in events:
+        method, params = event.get("method", ""), event.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if request_id in requests and params.get("redirectResponse"):
+                # The redirect reuses the id; keep the hop as its own record
+                hop = requests.pop(request_id)
+                hop["status"] = params["redirectResponse"].get("status")
+                hop["end"] = params["timestamp"]
+                requests[f"{request_id}:{len(order)}"] = hop
+            record = {
+                "id": request_id,
+                "url": params["request"]["url"],
+                "method": params["request"].get("method", "GET"),
+                "type": params.get("type", "Other"),
+                "frame": params.get("frameId"),
+                "start": params["timestamp"],
+                "end": None,
+                "status": None,
+                "mime": "",
+                "headers": {},
+                "cached": False,
+                "transfer_bytes": 0,
+                "body_bytes": 0,
+                "failed": None,
+            }
+            requests[request_id] = record
+            order.append(record)
+            continue
+
+        record = requests.get(request_id)
+        if record is None:
+            continue
+        if method == "Network.responseReceived":
+            response = params.get("response", {})
+            record["status"] = response.get("status")
+            record["mime"] = response.get("mimeType", "")
+            record["headers"] = {k.lower(): v for k, v in response.get("headers", {}).items()}
+            record["cached"] = bool(response.get("fromDiskCache") or response.get("fromServiceWorker")
+                                    or response.get("fromPrefetchCache"))
+        elif method == "Network.dataReceived":
+            record["body_bytes"] += params.get("dataLength", 0)
+        elif method == "Network.loadingFinished":
+            record["end"] = params["timestamp"]
+            record["transfer_bytes"] = params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFailed":
+            record["end"] = params["timestamp"]
+            record["failed"] = params.get("errorText", "failed")
+        elif method == "Network.requestServedFromCache":
+            record["cached"] = True
+    return [r for r in order if not any(part in r["url"] for part in _IGNORED)]
+
+
+def split_pages(requests):
+    """Group requests by the top-level document load they follow"""
+    pages = []
+    main_frame = None
+    for request in requests:
+        if not pages or (request["type"] == "Document" and request["frame"] in (main_frame, None)):
+            if request["type"] == "Document":
+                main_frame = request["frame"]
+            pages.append([])
+        pages[-1].append(request)
+    return pages
+
+
+def _is_api(request):
+    return urlsplit(request["url"]).path.startswith("/api/")
+
+
+def _label(request):
+    parts = urlsplit(request["url"])
+    return f"{request['method']} {parts.path}{'?' + parts.query if parts.query else ''}"
+
+
+def duplicates(requests):
+    """API requests sent more than once with the same method and URL"""
+    seen = {}
+    for request in requests:
+        if _is_api(request):
+            seen.setdefault(_label(request), []).append(request)
+    return [{"request": label, "count": len(same)} for label, same in seen.items() if len(same) > 1]
+
+
+def longest_chain(requests):
+    """Longest sequence of requests each starting right after the previous one finished"""
+    finished = sorted((r for r in requests if r["end"] is not None), key=lambda r: r["start"])
+    chains = {}
+    for request in finished:
+        parents = [chains[id(p)] for p in finished
+                   if p is not request and p["end"] <= request["start"] <= p["end"] + CHAIN_GAP_S
+                   and id(p) in chains]
+        best = max(parents, key=len, default=[])
+        chains[id(request)] = best + [request]
+    chain = max(chains.values(), key=len, default=[])
+    return [_label(r) for r in chain]
+
+
+def _is_compressed(request):
+    return request["headers"].get("content-encoding", "identity") != "identity"
+
+
+def _has_cache_headers(request):
+    cache_control = request["headers"].get("cache-control", "")
+    return "max-age" in cache_control or "immutable" in cache_control or "expires" in request["headers"]
+
+
+def audit_page(requests, static_origin=None):
+    """Findings for one page load: duplicates, chain, uncompressed, oversized, uncached"""
+    findings = []
+    for duplicate in duplicates(requests):
+        findings.append({"kind": "duplicate", **duplicate})
+
+    chain = longest_chain(requests)
+    if len(chain) > MAX_CHAIN_DEPTH:
+        findings.append({"kind": "chain", "depth": len(chain), "requests": chain})
+
+    for request in requests:
+        # 304s and cache hits carry no body worth checking
+        if request["failed"] or request["cached"] or request["status"] in (None, 204, 304):
+            continue
+        size = request["body_bytes"] or request["transfer_bytes"]
+        label = _label(request)
+        if (COMPRESSIBLE.search(request["mime"]) and size >= COMPRESS_MIN_BYTES
+                and not _is_compressed(request)):
+            findings.append({"kind": "uncompressed", "request": label, "bytes": size})
+        budget = API_BUDGET_BYTES if _is_api(request) else ASSET_BUDGET_BYTES
+        if size > budget:
+            findings.append({"kind": "oversized", "request": label, "bytes": size, "budget": budget})
+        parts = urlsplit(request["url"])
+        if (static_origin and f"{parts.scheme}://{parts.netloc}" == static_origin
+                and STATIC_ASSET.search(parts.path) and not _has_cache_headers(request)):
+            findings.append({"kind": "uncached", "request": label})
+    return findings
+
+
+def waterfall(requests):
+    """Request timings relative to the first request of the page"""
+    if not requests:
+        return []
+    origin = requests[0]["start"]
+    return [{
+        "request": _label(request),
+        "type": request["type"],
+        "status": request["status"] or request["failed"],
+        "start_ms": round((request["start"] - origin) * 1000, 1),
+        "duration_ms": round((request["end"] - request["start"]) * 1000, 1) if request["end"] else None,
+        "transfer_bytes": request["transfer_bytes"],
+        "body_bytes": request["body_bytes"],
+    } for request in requests]
+
+
+def audit(driver, base_url=None):
+    """Waterfall and findings of every page the driver's log holds"""
+    log = PerformanceLog.for_driver(getattr(driver, "wrapped_driver", driver))
+    log.poll()
+    static_origin = None
+    if base_url:
+        parts = urlsplit(base_url)
+        static_origin = f"{parts.scheme}://{parts.netloc}"
+    pages = []
+    for requests in split_pages(collect_requests(log.events)):
+        pages.append({
+            "url": requests[0]["url"] if requests[0]["type"] == "Document" else None,
+            "requests": len(requests),
+            "findings": audit_page(requests, static_origin),
+            "waterfall": waterfall(requests),
+        })
+    return pages
+
+
+def format_waterfall(page, width=40):
+    """Text waterfall of one audited page"""
+    rows = page["waterfall"]
+    end = max((r["start_ms"] + (r["duration_ms"] or 0) for r in rows), default=0) or 1
+    lines = [page["url"] or "(no document load)"]
+    for row in rows:
+        offset = int(row["start_ms"] / end * width)
+        length = max(1, int((row["duration_ms"] or 0) / end * width))
+        duration = f"{row['duration_ms']:.0f}" if row["duration_ms"] is not None else "-"
+        lines.append(f"  {' ' * offset}{'#' * length:<{width - offset}} {duration:>6} ms "
+                     f"{str(row['status']):>4} {row['request'][:80]}")
+    for finding in page["findings"]:
+        detail = finding.get("request") or " -> ".join(finding.get("requests", []))
+        lines.append(f"  ! {finding['kind']}: {detail}")
+    return "\n".join(lines)
@@ -0,0 +1,320 @@
+"""
+Socket.io notification latency benchmark for FoodHub
+Connects many concurrent socket.io clients as customers and restaurants
+(the 'authenticate' handshake of contexts/NotificationContext.js),
+changes order status through PATCH /api/orders/:id/status at a fixed rate
+and measures how long each 'orderUpdate' takes to reach its rooms
+
+Latency is end to end: from sending the PATCH to the event arriving at
+the client, so it includes the MongoDB update and populate in the route.
+
+Meant for a disposable local stack (docker-compose up): it seeds its own
+users, restaurants and orders through the API. The API cannot delete
+restaurants or orders, so afterwards they are only deactivated and
+cancelled; every run seeds under new ids (see DataFactory's run nonce).
+Needs python-socketio.
+
+Usage:
+    python notification_benchmark.py --customers 1000 --restaurants 50 --rate 50
+"""
+import argparse
+import asyncio
+import html
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import aiohttp
+
+from api_client import ApiClient
+from data_factory import ApiLoader, DataFactory, Scale, run_nonce
+from load_generator import LatencyHistogram
+
+
+# Statuses cycled through by the benchmark (valid in backend/models/Order.js)
+UPDATE_STATUSES = ["confirmed", "preparing", "ready", "delivered"]
+
+
+def next_status(status):
+    """Status after `status` in UPDATE_STATUSES, wrapping around"""
+    if status not in UPDATE_STATUSES:
+        return UPDATE_STATUSES[0]
+    return UPDATE_STATUSES[(UPDATE_STATUSES.index(status) + 1) % len(UPDATE_STATUSES)]
+
+
+def _socketio():
+    # Optional dependency, only needed by this benchmark
+    import socketio
+    return socketio
+
+
+class NotificationBenchmark:
+    """
+    Fan-out benchmark: N customer and M restaurant clients, one PATCH at a time per order
+
+    Restaurant clients authenticate with the restaurant's _id, because the
+    route emits to restaurant_<order.restaurant._id>.
+    """
+
+    def __init__(self, api_url, customers=200, restaurants=20, seed=0, connect_concurrency=100):
+        self.api_url = api_url.rstrip("/")
+        self.scale = Scale(customers=customers, owners=restaurants, restaurants=restaurants,
+                           menu_items=1, orders=customers, focus_customer_share=0)
+        # Fresh ids per run: the previous run's restaurants and orders are still there
+        self.factory = DataFactory(self.scale, seed=seed, tag=f"notify{seed}", run=run_nonce())
+        self.random = random.Random(seed)
+        self.connect_concurrency = connect_concurrency
+        self.clients = []
+        self.pending = {}
+        self.in_flight = set()
+        self.latency = {"customer": LatencyHistogram(), "restaurant": LatencyHistogram()}
+        self.patch_latency = LatencyHistogram()
+        self.connect_latency = LatencyHistogram()
+        self.counts = {"updates": 0, "expected": 0, "delivered": 0, "unexpected": 0,
+                       "connect_errors": 0, "patch_errors": 0}
+
+    def _on_update(self, role, data):
+        key = (data.get("_id"), data.get("status"))
+        entry = self.pending.get(key)
+        if entry is None or role not in entry["waiting"]:
+            self.counts["unexpected"] += 1
+            return
+        self.latency[role].record((time.perf_counter() - entry["sent"]) * 1000)
+        self.counts["delivered"] += 1
+        entry["waiting"].discard(role)
+        if not entry["waiting"]:
+            entry["done"].set()
+
+    async def _connect(self, limiter, user_id, role):
+        socketio = _socketio()
+        client = socketio.AsyncClient(reconnection=False)
+        client.on("orderUpdate", lambda data: self._on_update(role, data))
+        async with limiter:
+            start = time.perf_counter()
+            try:
+                # Browsers start with long-polling and upgrade; go straight to websocket
+                await client.connect(self.api_url, transports=["websocket"])
+                await client.emit("authenticate", {"userId": user_id, "userRole": role})
+            except (socketio.exceptions.ConnectionError, OSError):
+                self.counts["connect_errors"] += 1
+                return
+            self.connect_latency.record((time.perf_counter() - start) * 1000)
+        self.clients.append(client)
+
+    async def _update(self, session, order, timeout):
+        """PATCH one order and wait for both rooms to receive it"""
+        status = next_status(order["status"])
+        key = (order["_id"], status)
+        entry = {"sent": time.perf_counter(), "waiting": {"customer", "restaurant"},
+                 "done": asyncio.Event()}
+        self.pending[key] = entry
+        self.counts["updates"] += 1
+        self.counts["expected"] += 2
+        try:
+            async with session.patch(f"{self.api_url}/api/orders/{order['_id']}/status",
+                                     json={"status": status}) as response:
+                await response.read()
+                if response.status >= 400:
+                    self.counts["patch_errors"] += 1
+                    self.counts["expected"] -= 2
+                    return
+            self.patch_latency.record((time.perf_counter() - entry["sent"]) * 1000)
+            order["status"] = status
+            try:
+                await asyncio.wait_for(entry["done"].wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            self.pending.pop(key, None)
+            self.in_flight.discard(order["_id"])
+
+    async def _fire(self, orders, rate, duration, timeout):
+        """Open loop: updates start on schedule; an order is never patched twice at once"""
+        interval = 1.0 / rate
+        tasks = []
+        async with aiohttp.ClientSession() as session:
+            start = time.perf_counter()
+            sent = 0
+            while True:
+                scheduled = start + sent * interval
+                if scheduled - start >= duration:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                idle = [o for o in orders if o["_id"] not in self.in_flight]
+                if idle:
+                    order = self.random.choice(idle)
+                    self.in_flight.add(order["_id"])
+                    tasks.append(asyncio.create_task(self._update(session, order, timeout)))
+                sent += 1
+            await asyncio.gather(*tasks)
+            return time.perf_counter() - start
+
+    async def _run(self, catalog, rate, duration, timeout):
+        limiter = asyncio.Semaphore(self.connect_concurrency)
+        users = [(u["_id"], "customer") for u in catalog["users"] if u["role"] == "customer"]
+        users += [(r["_id"], "restaurant") for r in catalog["restaurants"]]
+        await asyncio.gather(*(self._connect(limiter, user_id, role) for user_id, role in users))
+        # Give the server a moment to process the last 'authenticate' events
+        await asyncio.sleep(1)
+        orders = [{"_id": o["_id"], "status": o["status"]} for o in catalog["orders"]]
+        try:
+            elapsed = await self._fire(orders, rate, duration, timeout)
+        finally:
+            await asyncio.gather(*(client.disconnect() for client in self.clients),
+                                 return_exceptions=True)
+        return elapsed
+
+    def run(self, rate=20, duration=30, timeout=5.0):
+        """Seed, connect, fire updates for `duration` seconds, tear down; returns the report"""
+        catalog = self.factory.build()
+        api = ApiClient(self.api_url)
+        loader = ApiLoader(api)
+        loader.load(catalog)
+        try:
+            elapsed = asyncio.run(self._run(catalog, rate, duration, timeout))
+        finally:
+            loader.unload(catalog)
+            api.close()
+
+        missing = self.counts["expected"] - self.counts["delivered"]
+        return {
+            "api_url": self.api_url,
+            "clients": {"customers": self.scale.customers, "restaurants": self.scale.restaurants,
+                        "connected": len(self.clients)},
+            "rate": rate,
+            "duration_s": round(elapsed, 2),
+            "counts": dict(self.counts, missing=missing),
+            "delivery_ratio": round(self.counts["delivered"] / self.counts["expected"], 4)
+            if self.counts["expected"] else None,
+            "fanout_events_per_s": round(self.counts["delivered"] / elapsed, 1) if elapsed else 0.0,
+            "latency": {role: h.summary() for role, h in self.latency.items()},
+            "patch": self.patch_latency.summary(),
+            "connect": self.connect_latency.summary(),
+        }
+
+
+class SocketProbe:
+    """
+    One socket.io client in a background thread, for browser comparisons
+
+    wait_for() returns the wall-clock time (time.time()) an orderUpdate
+    arrived, so it can be compared with Date.now() in the browser.
+    """
+
+    def __init__(self, api_url):
+        self.api_url = api_url.rstrip("/")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.arrivals = {}
+        self.client = None
+
+    def _on_update(self, data):
+        self.arrivals.setdefault((data.get("_id"), data.get("status")), time.time())
+
+    def start(self, user_id, role):
+        self.thread.start()
+        self.client = _socketio().AsyncClient(reconnection=False)
+        self.client.on("orderUpdate", self._on_update)
+
+        async def connect():
+            await self.client.connect(self.api_url, transports=["websocket"])
+            await self.client.emit("authenticate", {"userId": user_id, "userRole": role})
+
+        asyncio.run_coroutine_threadsafe(connect(), self.loop).result(timeout=10)
+        return self
+
+    def wait_for(self, order_id, status, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            arrived = self.arrivals.get((order_id, status))
+            if arrived is not None:
+                return arrived
+            time.sleep(0.01)
+        return None
+
+    def stop(self):
+        if self.client is not None:
+            asyncio.run_coroutine_threadsafe(self.client.disconnect(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+def write_report(report, report_dir):
+    """JSON and HTML report next to the Selenium test report"""
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, "notification_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    columns = ["count", "p50_ms", "p90_ms", "p99_ms", "p999_ms", "max_ms"]
+    rows = "\n".join(
+        f"<tr><td>{html.escape(name)}</td>"
+        + "".join(f"<td>{stats.get(c, '')}</td>" for c in columns) + "</tr>"
+        for name, stats in [("customer delivery", report["latency"]["customer"]),
+                            ("restaurant delivery", report["latency"]["restaurant"]),
+                            ("PATCH response", report["patch"]),
+                            ("connect", report["connect"])]
+    )
+    counts = ", ".join(f"{name}: {value}" for name, value in report["counts"].items())
+    path = os.path.join(report_dir, "notification_report.html")
+    with open(path, "w") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>FoodHub Notification Latency Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+td:first-child {{ text-align: left; }}
+</style></head><body>
+<h1>FoodHub Notification Latency Report</h1>
+<p>{html.escape(report['api_url'])}, {report['clients']['connected']} clients,
+{report['rate']} updates/s for {report['duration_s']} s,
+fan-out {report['fanout_events_per_s']} events/s, delivery ratio {report['delivery_ratio']}</p>
+<p>{html.escape(counts)}</p>
+<table><tr><th>measure</th>{''.join(f'<th>{c}</th>' for c in columns)}</tr>
+{rows}
+</table></body></html>
+""")
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FoodHub socket.io order notifications")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8080"))
+    parser.add_argument("--customers", type=int, default=200, help="customer clients (one user each)")
+    parser.add_argument("--restaurants", type=int, default=20, help="restaurant clients")
+    parser.add_argument("--rate", type=float, default=20, help="order status updates per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send updates")
+    parser.add_argument("--timeout", type=float, default=5.0,
+                        help="seconds after which an undelivered update counts as missing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-dir", default=os.getenv("REPORT_DIR", "reports"))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    benchmark = NotificationBenchmark(args.api_url, customers=args.customers,
+                                      restaurants=args.restaurants, seed=args.seed)
+    print(f"Benchmarking notifications on {args.api_url} with "
+          f"{args.customers + args.restaurants} clients at {args.rate:.0f} updates/s...")
+    report = benchmark.run(rate=args.rate, duration=args.duration, timeout=args.timeout)
+
+    print(f"connected {report['clients']['connected']}, "
+          f"delivered {report['counts']['delivered']}/{report['counts']['expected']}, "
+          f"fan-out {report['fanout_events_per_s']} events/s")
+    print(f"{'recipient':<12}{'count':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for role, s in report["latency"].items():
+        if s["count"]:
+            print(f"{role:<12}{s['count']:>8}{s['p50_ms']:>9.1f}{s['p90_ms']:>9.1f}"
+                  f"{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+    print(f"Notification report generated: {write_report(report, args.report_dir)}")
+    return 0 if report["counts"]["missing"] == 0 and not report["counts"]["connect_errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
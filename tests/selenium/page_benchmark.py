@@ -0,0 +1,175 @@
+"""
+Multi-sample page-load benchmark for the key FoodHub routes
+Loads each route K times cold (HTTP cache and service workers cleared)
+and K times warm, optionally under CDP CPU and network throttling
+"""
+import json
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+
+from page_metrics import PageMetricsCollector
+from perf_baseline import percentile
+from test_helpers import TestHelpers, TestData
+
+
+# Chrome DevTools presets, throughput in bytes/s and latency in ms
+NETWORK_PROFILES = {
+    "slow-3g": {"latency": 400, "downloadThroughput": 50000, "uploadThroughput": 50000},
+    "fast-3g": {"latency": 150, "downloadThroughput": 200000, "uploadThroughput": 94000},
+    "4g": {"latency": 40, "downloadThroughput": 1500000, "uploadThroughput": 750000},
+}
+
+BENCHMARK_USER = dict(TestData.CUSTOMER_USER, _id="benchmark-customer", name="Benchmark Customer")
+
+
+def _open_cart(driver):
+    """Open the cart modal from the customer header"""
+    driver.find_element(By.XPATH, "//header//button[contains(., 'Cart')]").click()
+    TestHelpers.wait_for_element(driver, By.CSS_SELECTOR, "[data-testid='modal']", timeout=5)
+
+
+# name, path, logged-in role, readiness markers, interaction after load
+BENCHMARK_ROUTES = [
+    ("homepage", "/", None, (), None),
+    ("login", "/", None, ("input[type='email']", "button[type='submit']"), None),
+    ("restaurant_list", "/", "customer", ("header",), None),
+    ("menu", "/restaurant/{restaurant_id}", "customer", ("header",), None),
+    ("cart", "/", "customer", ("header",), _open_cart),
+]
+
+
+def summarize(samples):
+    """min/median/p95/p99/stdev of a list of milliseconds"""
+    return {
+        "samples": len(samples),
+        "min_ms": round(min(samples), 1),
+        "median_ms": round(statistics.median(samples), 1),
+        "p95_ms": round(percentile(samples, 95), 1),
+        "p99_ms": round(percentile(samples, 99), 1),
+        "stdev_ms": round(statistics.stdev(samples), 1) if len(samples) > 1 else 0.0,
+    }
+
+
+class PageBenchmark:
+    """
+    Runs the route benchmark on one browser
+
+    Navigation goes to the unwrapped driver so the per-test page metrics
+    listener does not measure every benchmark sample.
+    """
+
+    def __init__(self, driver, base_url, samples=5, cpu_throttle=None, network=None):
+        self.driver = getattr(driver, "wrapped_driver", driver)
+        self.base_url = base_url.rstrip("/")
+        self.samples = samples
+        self.cpu_throttle = cpu_throttle
+        self.network = network
+
+    def _cdp(self, command, params=None):
+        return self.driver.execute_cdp_cmd(command, params or {})
+
+    def _apply_throttling(self):
+        if self.cpu_throttle:
+            self._cdp("Emulation.setCPUThrottlingRate", {"rate": self.cpu_throttle})
+        if self.network:
+            self._cdp("Network.enable")
+            self._cdp("Network.emulateNetworkConditions",
+                      dict(NETWORK_PROFILES[self.network], offline=False))
+
+    def _remove_throttling(self):
+        # The browser goes back to the pool afterwards
+        self._cdp("Emulation.setCPUThrottlingRate", {"rate": 1})
+        self._cdp("Network.emulateNetworkConditions", {
+            "offline": False, "latency": 0, "downloadThroughput": -1, "uploadThroughput": -1
+        })
+
+    def _clear_caches(self):
+        """Cold start: no HTTP cache, service workers or Cache Storage"""
+        self._cdp("Network.clearBrowserCache")
+        self._cdp("Storage.clearDataForOrigin", {
+            "origin": self.base_url, "storageTypes": "service_workers,cache_storage"
+        })
+
+    def _login(self, role):
+        """Put the app's saved user into localStorage (see contexts/UserContext.js)"""
+        if role is None:
+            self.driver.execute_script("localStorage.removeItem('currentUser');")
+        else:
+            user = dict(BENCHMARK_USER, role=role)
+            self.driver.execute_script(
+                "localStorage.setItem('currentUser', arguments[0]);", json.dumps(user)
+            )
+
+    def _first_restaurant_id(self):
+        """Id of a restaurant linked from the restaurant list, or None"""
+        self._login("customer")
+        TestHelpers.open_page(self.driver, self.base_url + "/", markers=("header",))
+        links = self.driver.find_elements(By.CSS_SELECTOR, "a[href*='/restaurant/']")
+        if not links:
+            return None
+        return links[0].get_attribute("href").rstrip("/").rsplit("/", 1)[-1]
+
+    def _load(self, url, markers, action):
+        """One timed load: navigation until ready (and the interaction, if any)"""
+        start = time.monotonic()
+        self.driver.get(url)
+        TestHelpers.wait_for_page_ready(self.driver, timeout=30, markers=markers)
+        if action:
+            action(self.driver)
+        elapsed = (time.monotonic() - start) * 1000
+        browser = PageMetricsCollector.collect(self.driver) or {}
+        return elapsed, browser.get("ttfb_ms"), browser.get("render_ms")
+
+    def run(self):
+        """Benchmark every route; returns {route: {"cold": stats, "warm": stats}}"""
+        # Origin must be open before localStorage can be written
+        TestHelpers.open_page(self.driver, self.base_url + "/")
+        restaurant_id = self._first_restaurant_id()
+        self._apply_throttling()
+        results = {}
+        try:
+            for name, path, role, markers, action in BENCHMARK_ROUTES:
+                if "{restaurant_id}" in path and restaurant_id is None:
+                    results[name] = {"skipped": "no restaurants available"}
+                    continue
+                url = self.base_url + path.format(restaurant_id=restaurant_id)
+                self._login(role)
+
+                runs = {"cold": [], "warm": []}
+                for _ in range(self.samples):
+                    self._clear_caches()
+                    runs["cold"].append(self._load(url, markers, action))
+                # Prime once, then every warm load hits the cache
+                self._load(url, markers, action)
+                for _ in range(self.samples):
+                    runs["warm"].append(self._load(url, markers, action))
+
+                results[name] = {}
+                for mode, loads in runs.items():
+                    stats = summarize([load[0] for load in loads])
+                    ttfb = [load[1] for load in loads if load[1] is not None]
+                    render = [load[2] for load in loads if load[2] is not None]
+                    stats["ttfb_median_ms"] = round(statistics.median(ttfb), 1) if ttfb else None
+                    stats["render_median_ms"] = round(statistics.median(render), 1) if render else None
+                    results[name][mode] = stats
+        finally:
+            self._remove_throttling()
+            self._login(None)
+        return results
+
+
+def format_results(results):
+    """Text table of benchmark results"""
+    lines = [f"{'route':<16}{'mode':<6}{'min':>9}{'median':>9}{'p95':>9}{'p99':>9}{'stdev':>9}"]
+    for route, modes in results.items():
+        if "skipped" in modes:
+            lines.append(f"{route:<16}skipped: {modes['skipped']}")
+            continue
+        for mode, s in modes.items():
+            lines.append(
+                f"{route:<16}{mode:<6}{s['min_ms']:>9.0f}{s['median_ms']:>9.0f}"
+                f"{s['p95_ms']:>9.0f}{s['p99_ms']:>9.0f}{s['stdev_ms']:>9.0f}"
+            )
+    return "\n".join(lines)
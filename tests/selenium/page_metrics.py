@@ -0,0 +1,198 @@
+"""
+Page-load performance metrics for Selenium tests
+Reads Navigation, Resource and Paint Timing, LCP, long tasks and JS heap
+size from the browser so load times can be broken down per route
+"""
+import json
+from urllib.parse import urlsplit
+
+from selenium.webdriver.support.events import AbstractEventListener
+
+from dom_snapshot import DomSnapshot
+
+
+_COLLECT_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { done(null); return; }
+
+var lcp = 0, longTasks = [], observers = [];
+function observe(type, callback) {
+    try {
+        var observer = new PerformanceObserver(function (list) { list.getEntries().forEach(callback); });
+        observer.observe({type: type, buffered: true});
+        observers.push([observer, callback]);
+    } catch (e) { /* entry type not supported */ }
+}
+observe('largest-contentful-paint', function (e) { lcp = Math.max(lcp, e.renderTime || e.loadTime || e.startTime); });
+observe('longtask', function (e) { longTasks.push(e.duration); });
+
+setTimeout(function () {
+    observers.forEach(function (o) { o[0].takeRecords().forEach(o[1]); o[0].disconnect(); });
+    var paints = {};
+    performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+    var resources = performance.getEntriesByType('resource').map(function (r) {
+        return {name: r.name, type: r.initiatorType, transfer: r.transferSize,
+                encoded: r.encodedBodySize, duration: r.duration};
+    });
+    var memory = performance.memory || {};
+    done({
+        url: location.href,
+        timeOrigin: performance.timeOrigin,
+        nav: {
+            responseStart: nav.responseStart, domInteractive: nav.domInteractive,
+            domContentLoaded: nav.domContentLoadedEventEnd, loadEventEnd: nav.loadEventEnd,
+            transferSize: nav.transferSize
+        },
+        paints: paints,
+        lcp: lcp,
+        longTasks: longTasks,
+        resources: resources,
+        heapUsed: memory.usedJSHeapSize || null,
+        heapTotal: memory.totalJSHeapSize || null
+    });
+}, 0);
+"""
+
+
+def _ms(value):
+    return round(value, 1) if value else None
+
+
+def summarize(raw):
+    """Turn the raw browser timings into one flat record per page"""
+    resources = raw["resources"]
+    scripts = [r for r in resources if r["type"] == "script"]
+    first_contentful_paint = raw["paints"].get("first-contentful-paint")
+
+    return {
+        "url": raw["url"],
+        "time_origin": raw["timeOrigin"],
+        "route": urlsplit(raw["url"]).path or "/",
+        "ttfb_ms": _ms(raw["nav"]["responseStart"]),
+        "dom_interactive_ms": _ms(raw["nav"]["domInteractive"]),
+        "dom_content_loaded_ms": _ms(raw["nav"]["domContentLoaded"]),
+        "load_ms": _ms(raw["nav"]["loadEventEnd"]),
+        "first_paint_ms": _ms(raw["paints"].get("first-paint")),
+        "first_contentful_paint_ms": _ms(first_contentful_paint),
+        "largest_contentful_paint_ms": _ms(raw["lcp"]),
+        # Time until the main content was on screen
+        "render_ms": _ms(raw["lcp"] or first_contentful_paint),
+        "document_transfer_bytes": raw["nav"]["transferSize"],
+        "resource_count": len(resources),
+        "resource_transfer_bytes": sum(r["transfer"] for r in resources),
+        "bundle_transfer_bytes": sum(r["transfer"] for r in scripts),
+        "largest_scripts": [
+            {"name": r["name"], "transfer_bytes": r["transfer"], "encoded_bytes": r["encoded"]}
+            for r in sorted(scripts, key=lambda r: r["encoded"], reverse=True)[:3]
+        ],
+        "long_task_count": len(raw["longTasks"]),
+        "long_task_total_ms": _ms(sum(raw["longTasks"])),
+        "js_heap_used_bytes": raw["heapUsed"],
+        "js_heap_total_bytes": raw["heapTotal"],
+    }
+
+
+class PageMetricsCollector(AbstractEventListener):
+    """
+    Records metrics for every page a test visits
+
+    Used as the listener of an EventFiringWebDriver: the page that is
+    currently shown is measured right before the next navigation, and the
+    last one when the test body finishes (finish), so each record
+    reflects the page after the test finished interacting with it.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = []
+        self._seen = set()
+
+    @staticmethod
+    def collect(driver):
+        """Metrics of the page currently loaded in the driver, or None"""
+        driver = getattr(driver, "wrapped_driver", driver)
+        try:
+            raw = driver.execute_async_script(_COLLECT_SCRIPT)
+        except Exception:
+            # Alert open, page crashed, browser gone...
+            return None
+        return summarize(raw) if raw else None
+
+    def collect_current(self, driver):
+        """Add the current page to self.pages unless it was already measured"""
+        driver = getattr(driver, "wrapped_driver", driver)
+        try:
+            if not urlsplit(driver.current_url).scheme.startswith("http"):
+                return
+        except Exception:
+            return
+        metrics = self.collect(driver)
+        if metrics is None:
+            return
+        key = (metrics["url"], metrics["time_origin"])
+        if key not in self._seen:
+            self._seen.add(key)
+            self.pages.append(metrics)
+
+    def before_navigate_to(self, url, driver):
+        self.collect_current(driver)
+        DomSnapshot.invalidate(driver)
+
+    def before_navigate_back(self, driver):
+        self.collect_current(driver)
+        DomSnapshot.invalidate(driver)
+
+    def before_navigate_forward(self, driver):
+        self.collect_current(driver)
+        DomSnapshot.invalidate(driver)
+
+    # Interactions change the DOM, so cached snapshots go stale
+    def after_click(self, element, driver):
+        DomSnapshot.invalidate(driver)
+
+    def after_change_value_of(self, element, driver):
+        DomSnapshot.invalidate(driver)
+
+    def after_execute_script(self, script, driver):
+        DomSnapshot.invalidate(driver)
+
+    def finish(self):
+        """Measure the last page and return the records of the whole test"""
+        self.collect_current(self.driver)
+        return self.pages
+
+
+class ListenerChain(AbstractEventListener):
+    """Forwards WebDriver events to several listeners, in order"""
+
+    def __init__(self, *listeners):
+        self.listeners = [listener for listener in listeners if listener is not None]
+
+
+def _forward(name):
+    def forward(self, *args):
+        for listener in self.listeners:
+            getattr(listener, name)(*args)
+    forward.__name__ = name
+    return forward
+
+
+for _name in dir(AbstractEventListener):
+    if _name.startswith(("before_", "after_", "on_")):
+        setattr(ListenerChain, _name, _forward(_name))
+
+
+def attach_page_metrics(item, report, pages):
+    """Store records on the test item and its report (visible to junitxml too)"""
+    prop = ("page_metrics", json.dumps(pages))
+    item.user_properties.append(prop)
+    report.user_properties.append(prop)
+
+
+def page_metrics_from_report(report):
+    """Page metric records attached to a pytest report"""
+    for name, value in report.user_properties:
+        if name == "page_metrics":
+            return json.loads(value)
+    return []
@@ -0,0 +1,275 @@
+"""
+Performance regression baseline for Selenium tests
+Stores the page timings of every run in a SQLite file next to the reports
+and compares the current run against the last builds with a noise-aware
+(bootstrap confidence interval) test on the median
+"""
+import html
+import json
+import os
+import random
+import sqlite3
+import statistics
+import time
+
+
+# Relative to the working directory, like the HTML report (--html=reports/...)
+DEFAULT_DB = os.path.join("reports", "perf_baseline.db")
+# Samples a parallel worker leaves in its REPORT_DIR for run_tests.py
+SAMPLES_FILE = "perf_samples.json"
+
+# Timings compared between builds (keys of the page_metrics records)
+TRACKED_METRICS = ["ttfb_ms", "dom_content_loaded_ms", "load_ms", "render_ms"]
+
+MIN_BASELINE_SAMPLES = 3
+MIN_DELTA_MS = 50          # ignore slowdowns smaller than this, whatever the ratio
+BOOTSTRAP_ROUNDS = 1000
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def median_delta_interval(baseline, current, confidence=0.95, rounds=BOOTSTRAP_ROUNDS):
+    """
+    Bootstrap confidence interval for median(current) - median(baseline)
+    Seeded so the same data always gives the same verdict
+    """
+    rng = random.Random(0)
+    deltas = sorted(
+        statistics.median(rng.choices(current, k=len(current)))
+        - statistics.median(rng.choices(baseline, k=len(baseline)))
+        for _ in range(rounds)
+    )
+    tail = (1 - confidence) / 2 * 100
+    return percentile(deltas, tail), percentile(deltas, 100 - tail)
+
+
+def compare(baseline, current, flag_threshold, fail_threshold=None):
+    """
+    Compare two samples of one route/metric
+
+    A route is flagged when even the optimistic end of the confidence
+    interval is slower than the baseline median by flag_threshold (a
+    ratio, 0.1 = 10%) and by at least MIN_DELTA_MS.
+    """
+    base_median = statistics.median(baseline)
+    low, high = median_delta_interval(baseline, current)
+    # Relative slowdown we are confident about
+    confident_ratio = low / base_median if base_median else 0.0
+    regressed = low >= MIN_DELTA_MS and confident_ratio > flag_threshold
+
+    return {
+        "baseline_median": base_median,
+        "current_median": statistics.median(current),
+        "median_delta": statistics.median(current) - base_median,
+        "delta_low": low,
+        "delta_high": high,
+        "p90_delta": percentile(current, 90) - percentile(baseline, 90),
+        "confident_ratio": confident_ratio,
+        "regressed": regressed,
+        "failed": regressed and fail_threshold is not None and confident_ratio > fail_threshold,
+    }
+
+
+class BaselineStore:
+    """SQLite file holding page timings of past builds"""
+
+    def __init__(self, path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                build TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                test TEXT NOT NULL,
+                route TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                value REAL NOT NULL
+            )
+        """)
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS samples_route ON samples (route, metric, build)"
+        )
+
+    def record(self, build, samples):
+        """Store (test, route, metric, value) tuples for a build"""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)",
+                [(build, now, *sample) for sample in samples]
+            )
+
+    def recent_builds(self, limit, exclude=None):
+        """Most recent build ids, newest first"""
+        rows = self.connection.execute(
+            "SELECT build FROM samples WHERE build != ? GROUP BY build "
+            "ORDER BY MAX(recorded_at) DESC LIMIT ?",
+            (exclude or "", limit)
+        )
+        return [row[0] for row in rows]
+
+    def values(self, route, metric, builds):
+        """Samples of one route/metric, grouped by build"""
+        if not builds:
+            return {}
+        placeholders = ",".join("?" * len(builds))
+        rows = self.connection.execute(
+            f"SELECT build, value FROM samples WHERE route = ? AND metric = ? "
+            f"AND build IN ({placeholders})",
+            (route, metric, *builds)
+        )
+        grouped = {}
+        for build, value in rows:
+            grouped.setdefault(build, []).append(value)
+        return grouped
+
+    def close(self):
+        self.connection.close()
+
+
+class PerfBaseline:
+    """
+    Collects page metrics during a session and evaluates them at the end
+
+    The current run is compared against the last `builds` builds already in
+    the store and then recorded itself, so it becomes part of the baseline
+    for the next run. The store is only opened when there is something to
+    compare, so runs without browser tests leave no file behind.
+
+    Parallel workers do not evaluate: each saves its samples (save_samples)
+    and run_tests.py compares the merged samples of the whole run once,
+    under the build id it hands every worker in PERF_BUILD.
+    """
+
+    def __init__(self, path=DEFAULT_DB, build=None, builds=10, flag_threshold=0.1,
+                 fail_threshold=None):
+        self.path = path
+        self.build = (build or os.getenv("PERF_BUILD") or os.getenv("BUILD_NUMBER")
+                      or time.strftime("local-%Y%m%d-%H%M%S"))
+        self.builds = builds
+        self.flag_threshold = flag_threshold
+        self.fail_threshold = fail_threshold
+        self.samples = []
+        self.results = []
+        self.history = []
+
+    def add_pages(self, test, pages):
+        """Remember the tracked timings of a test's page_metrics records"""
+        for page in pages:
+            for metric in TRACKED_METRICS:
+                if page.get(metric) is not None:
+                    self.samples.append((test, page["route"], metric, page[metric]))
+
+    def save_samples(self, directory):
+        """Write this worker's samples to directory/SAMPLES_FILE"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, SAMPLES_FILE), "w") as f:
+            json.dump({"build": self.build, "samples": self.samples}, f)
+
+    def load_samples(self, directories):
+        """Add the samples workers saved in their report directories"""
+        for directory in directories:
+            try:
+                with open(os.path.join(directory, SAMPLES_FILE)) as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                continue
+            self.samples.extend(tuple(sample) for sample in saved["samples"])
+
+    def evaluate(self):
+        """Compare against the baseline, then store this run"""
+        if not self.samples:
+            return self.results
+        store = BaselineStore(self.path)
+        try:
+            self._evaluate(store)
+        finally:
+            store.close()
+        return self.results
+
+    def _evaluate(self, store):
+        previous = store.recent_builds(self.builds, exclude=self.build)
+        current = {}
+        for _, route, metric, value in self.samples:
+            current.setdefault((route, metric), []).append(value)
+
+        for (route, metric), values in sorted(current.items()):
+            per_build = store.values(route, metric, previous)
+            baseline = [v for build_values in per_build.values() for v in build_values]
+            # Oldest first, for the trend table
+            trend = [(build, statistics.median(per_build[build]))
+                     for build in reversed(previous) if build in per_build]
+            trend.append((self.build, statistics.median(values)))
+            self.history.append({"route": route, "metric": metric, "trend": trend})
+
+            if len(baseline) < MIN_BASELINE_SAMPLES:
+                continue
+            result = compare(baseline, values, self.flag_threshold, self.fail_threshold)
+            result.update({"route": route, "metric": metric})
+            self.results.append(result)
+
+        store.record(self.build, self.samples)
+
+    @property
+    def regressions(self):
+        return [r for r in self.results if r["regressed"]]
+
+    @property
+    def failed(self):
+        return any(r["failed"] for r in self.results)
+
+    def summary_lines(self):
+        """Plain text summary for the terminal"""
+        lines = []
+        for r in self.regressions:
+            lines.append(
+                f"{'✗' if r['failed'] else '⚠'} {r['route']} {r['metric']}: "
+                f"{r['baseline_median']:.0f} ms -> {r['current_median']:.0f} ms "
+                f"(+{r['delta_low']:.0f}..{r['delta_high']:.0f} ms, p90 {r['p90_delta']:+.0f} ms)"
+            )
+        if not lines:
+            lines.append(f"✓ No performance regressions against the last {self.builds} builds")
+        return lines
+
+    def trend_html(self):
+        """One table per route: median of each tracked metric per build"""
+        routes = {}
+        for entry in self.history:
+            routes.setdefault(entry["route"], []).append(entry)
+        verdicts = {(r["route"], r["metric"]): r for r in self.results}
+
+        sections = []
+        for route, entries in sorted(routes.items()):
+            builds = []
+            for entry in entries:
+                for build, _ in entry["trend"]:
+                    if build not in builds:
+                        builds.append(build)
+            header = "".join(f"<th>{html.escape(str(b))}</th>" for b in builds)
+            rows = []
+            for entry in entries:
+                medians = dict(entry["trend"])
+                cells = "".join(
+                    f"<td>{medians[b]:.0f}</td>" if b in medians else "<td></td>" for b in builds
+                )
+                verdict = verdicts.get((route, entry["metric"]))
+                if verdict is None:
+                    status = "no baseline"
+                elif verdict["regressed"]:
+                    status = f"<b style='color:red'>slower (+{verdict['median_delta']:.0f} ms)</b>"
+                else:
+                    status = f"ok ({verdict['median_delta']:+.0f} ms)"
+                rows.append(f"<tr><td>{entry['metric']}</td>{cells}<td>{status}</td></tr>")
+            sections.append(
+                f"<h3>{html.escape(route)}</h3><table>"
+                f"<tr><th>metric (median ms)</th>{header}<th>vs baseline</th></tr>"
+                + "".join(rows) + "</table>"
+            )
+        return "<h2>Performance trend</h2>" + "".join(sections)
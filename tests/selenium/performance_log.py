@@ -0,0 +1,87 @@
+"""
+Buffered reader for Chrome's CDP performance log
+The browser hands each log entry out only once, so every consumer
+(network idle detection, metrics, audits) reads through this buffer
+"""
+import json
+import time
+
+
+class PerformanceLog:
+    """CDP events captured from one browser session"""
+
+    _logs = {}
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Shared log buffer for a driver, created on first use"""
+        key = driver.session_id
+        if key not in cls._logs:
+            cls._logs[key] = cls(driver)
+        return cls._logs[key]
+
+    @classmethod
+    def forget(cls, driver):
+        """Drop the buffer of a driver that was quit"""
+        cls._logs.pop(driver.session_id, None)
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.available = True
+        self.events = []
+        self.inflight = {}
+        self.last_network_activity = time.monotonic()
+
+    def poll(self):
+        """Drain new entries from the browser and return them"""
+        if not self.available:
+            return []
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            # Browser started without goog:loggingPrefs or not Chromium
+            self.available = False
+            return []
+
+        new_events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            message["timestamp"] = entry.get("timestamp")
+            new_events.append(message)
+            self._track_network(message)
+
+        self.events.extend(new_events)
+        return new_events
+
+    def _track_network(self, message):
+        """Keep the set of in-flight requests up to date"""
+        method = message.get("method", "")
+        if not method.startswith("Network."):
+            return
+        self.last_network_activity = time.monotonic()
+        request_id = message.get("params", {}).get("requestId")
+        if method == "Network.requestWillBeSent":
+            self.inflight[request_id] = message["params"].get("request", {}).get("url")
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.inflight.pop(request_id, None)
+
+    def network_idle(self, quiet_period=0.5, max_inflight=2):
+        """
+        True when at most max_inflight requests are pending and no network
+        event arrived for quiet_period seconds
+        Allowing a couple of open requests tolerates socket.io long-polling
+        """
+        self.poll()
+        if not self.available:
+            return True
+        quiet_for = time.monotonic() - self.last_network_activity
+        return len(self.inflight) <= max_inflight and quiet_for >= quiet_period
+
+    def clear(self):
+        """Discard everything captured so far"""
+        self.poll()
+        self.events = []
+        self.inflight = {}
@@ -1,44 +1,77 @@
 """
 Test Runner Script for FoodHub Selenium Tests
 Run all tests and generate HTML report
+
+Usage:
+    python run_tests.py               # single pytest process
+    python run_tests.py --workers 4   # shard tests across 4 worker processes
+    python run_tests.py --js-coverage # also collect frontend JS coverage
+    python run_tests.py --update-impact-index        # record what each test touches
+    python run_tests.py --changed-since origin/main  # run only tests affected by the diff
 """
+import argparse
+import heapq
+import html
+import json
+import os
+import statistics
 import subprocess
 import sys
-import os
+import time
+import xml.etree.ElementTree as ET
+
+from impact_index import IMPACT_DIR, ImpactIndex, changed_files, head_commit, load_endpoints
+from js_coverage import COVERAGE_DIR, write_reports
+from perf_baseline import DEFAULT_DB, PerfBaseline
+
 
+REPORT_DIR = "reports"
+SCREENSHOT_DIR = "screenshots"
+DURATIONS_FILE = os.path.join(REPORT_DIR, "test_durations.json")
+DURATION_HISTORY = 5          # runs kept per test for load balancing
+DEFAULT_DURATION = 5.0        # seconds assumed for tests never seen before
+INDEX_FILE = os.path.join(REPORT_DIR, "impact_index.json")
+# Always run by --changed-since; substrings of node ids
+DEFAULT_SMOKE = "test_01_homepage_loads_successfully,test_03_backend_api_is_accessible"
+
+
+def run_tests(js_coverage=False, nodeids=None, record_impact=False):
+    """Execute all Selenium tests (or the given node ids) with pytest"""
 
-def run_tests():
-    """Execute all Selenium tests with pytest"""
-    
     print("=" * 70)
     print("FoodHub Selenium Test Suite")
     print("=" * 70)
     print()
-    
+
     # Ensure we're in the correct directory
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
+
     # Create screenshots directory if it doesn't exist
-    os.makedirs("screenshots", exist_ok=True)
-    os.makedirs("reports", exist_ok=True)
-    
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+
     # Run pytest with options
     pytest_args = [
         "pytest",
-        "test_foodhub.py",
+        *(nodeids or ["test_foodhub.py"]),
         "-v",                                    # Verbose output
         "--html=reports/test_report.html",       # HTML report
         "--self-contained-html",                 # Embedded CSS/JS in report
         "-s",                                    # Show print statements
         "--tb=short"                             # Short traceback format
     ]
-    
+    if js_coverage:
+        pytest_args.append("--js-coverage")
+    if record_impact:
+        pytest_args.append("--record-impact")
+
     print(f"Running command: {' '.join(pytest_args)}")
     print()
-    
+    started = time.time()
+
     try:
         result = subprocess.run(pytest_args, check=False)
-        
+
         print()
         print("=" * 70)
         if result.returncode == 0:
@@ -48,10 +81,12 @@ def run_tests():
         print("=" * 70)
         print()
         print("Test report generated: reports/test_report.html")
+        if record_impact:
+            update_impact_index([REPORT_DIR], started)
         print()
-        
+
         return result.returncode
-        
+
     except FileNotFoundError:
         print("Error: pytest not found. Please install requirements:")
         print("  pip install -r requirements.txt")
@@ -61,5 +96,339 @@ def run_tests():
         return 1
 
 
+def collect_tests():
+    """List the node ids of all tests in the suite"""
+    result = subprocess.run(
+        ["pytest", "test_foodhub.py", "--collect-only", "-q"],
+        capture_output=True, text=True, check=False
+    )
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+
+def load_durations():
+    """Recent durations per test from previous runs"""
+    try:
+        with open(DURATIONS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(history, results):
+    """Append this run's durations, keeping the last DURATION_HISTORY runs"""
+    for result in results:
+        if result["outcome"] in ("skipped", "error"):
+            continue
+        runs = history.setdefault(result["nodeid"], [])
+        runs.append(round(result["duration"], 3))
+        del runs[:-DURATION_HISTORY]
+    with open(DURATIONS_FILE, "w") as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+
+
+def shard_tests(tests, history, workers):
+    """
+    Split tests into balanced shards by expected duration
+    Longest tests are placed first, each on the least loaded worker
+    """
+    known = [statistics.median(runs) for runs in history.values() if runs]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+
+    def expected(nodeid):
+        runs = history.get(nodeid)
+        return statistics.median(runs) if runs else fallback
+
+    shards = [[] for _ in range(workers)]
+    load = [(0.0, index) for index in range(workers)]
+    for nodeid in sorted(tests, key=expected, reverse=True):
+        total, index = heapq.heappop(load)
+        shards[index].append(nodeid)
+        heapq.heappush(load, (total + expected(nodeid), index))
+
+    # Keep suite order inside each shard
+    return [sorted(shard, key=tests.index) for shard in shards if shard]
+
+
+def start_worker(index, nodeids, js_coverage=False, record_impact=False, build=None):
+    """Launch one pytest process with its own output folders"""
+    report_dir = os.path.join(REPORT_DIR, f"worker-{index}")
+    screenshot_dir = os.path.join(SCREENSHOT_DIR, f"worker-{index}")
+    os.makedirs(report_dir, exist_ok=True)
+    os.makedirs(screenshot_dir, exist_ok=True)
+
+    env = dict(os.environ)
+    env.update({
+        "WORKER_ID": str(index),
+        "REPORT_DIR": report_dir,
+        "SCREENSHOT_DIR": screenshot_dir,
+        "JS_COVERAGE": "1" if js_coverage else "0",
+        "RECORD_IMPACT": "1" if record_impact else "0",
+        # One build id for the whole run; workers only save their page timings
+        "PERF_BUILD": build or "",
+    })
+
+    pytest_args = [
+        "pytest", *nodeids,
+        "-v",
+        f"--html={report_dir}/test_report.html",
+        "--self-contained-html",
+        f"--junitxml={report_dir}/junit.xml",
+        "-s",
+        "--tb=short",
+    ]
+    log = open(os.path.join(report_dir, "output.log"), "w")
+    process = subprocess.Popen(pytest_args, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return {"index": index, "process": process, "log": log,
+            "report_dir": report_dir, "tests": nodeids}
+
+
+def read_junit(worker):
+    """Per-test results of a finished worker"""
+    path = os.path.join(worker["report_dir"], "junit.xml")
+    try:
+        tree = ET.parse(path)
+    except (OSError, ET.ParseError):
+        return [{"nodeid": nodeid, "worker": worker["index"], "outcome": "error",
+                 "duration": 0.0, "message": "Worker produced no results"}
+                for nodeid in worker["tests"]]
+
+    results = []
+    for case in tree.iter("testcase"):
+        module = case.get("classname", "").split(".")
+        nodeid = f"{module[0]}.py::{'::'.join(module[1:])}::{case.get('name')}"
+        outcome, message = "passed", ""
+        for tag in ("failure", "error", "skipped"):
+            element = case.find(tag)
+            if element is not None:
+                outcome = {"failure": "failed"}.get(tag, tag)
+                message = element.get("message", "")
+                break
+        results.append({"nodeid": nodeid, "worker": worker["index"], "outcome": outcome,
+                        "duration": float(case.get("time", 0)), "message": message})
+    return results
+
+
+def write_merged_report(results, workers, path, extra=""):
+    """Single HTML report combining all worker results"""
+    counts = {}
+    for result in results:
+        counts[result["outcome"]] = counts.get(result["outcome"], 0) + 1
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+
+    rows = "\n".join(
+        f"<tr class='{r['outcome']}'><td>{html.escape(r['nodeid'])}</td>"
+        f"<td>{r['worker']}</td><td>{r['outcome']}</td><td>{r['duration']:.2f}s</td>"
+        f"<td>{html.escape(r['message'])}</td></tr>"
+        for r in results
+    )
+    links = " | ".join(
+        f"<a href='{os.path.relpath(w['report_dir'], os.path.dirname(path))}/test_report.html'>"
+        f"worker {w['index']}</a>"
+        for w in workers
+    )
+
+    with open(path, "w") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>FoodHub Selenium Test Report</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+tr.passed td:nth-child(3) {{ color: green; }}
+tr.failed td:nth-child(3), tr.error td:nth-child(3) {{ color: red; }}
+tr.skipped td:nth-child(3) {{ color: orange; }}
+</style></head><body>
+<h1>FoodHub Selenium Test Report</h1>
+<p>{len(results)} tests on {len(workers)} workers: {summary}</p>
+<p>Worker reports: {links}</p>
+<table><tr><th>Test</th><th>Worker</th><th>Result</th><th>Duration</th><th>Message</th></tr>
+{rows}
+</table>
+{extra}</body></html>
+""")
+
+
+def run_tests_parallel(workers, js_coverage=False, nodeids=None, record_impact=False):
+    """Execute the suite (or the given node ids) sharded across several pytest processes"""
+
+    print("=" * 70)
+    print(f"FoodHub Selenium Test Suite ({workers} workers)")
+    print("=" * 70)
+    print()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+    os.makedirs(REPORT_DIR, exist_ok=True)
+
+    tests = nodeids or collect_tests()
+    if not tests:
+        print("Error: no tests collected. Is pytest installed?")
+        return 1
+
+    history = load_durations()
+    shards = shard_tests(tests, history, workers)
+
+    started = time.time()
+    baseline = None
+    if os.getenv("PERF_BASELINE_DB", DEFAULT_DB).lower() != "none":
+        baseline = PerfBaseline(
+            os.getenv("PERF_BASELINE_DB", DEFAULT_DB),
+            fail_threshold=float(os.environ["PERF_FAIL_THRESHOLD"]) if os.getenv("PERF_FAIL_THRESHOLD") else None,
+        )
+    running = []
+    for index, shard in enumerate(shards):
+        print(f"Worker {index}: {len(shard)} tests")
+        running.append(start_worker(index, shard, js_coverage, record_impact,
+                                    baseline.build if baseline else None))
+    print()
+
+    results = []
+    returncode = 0
+    for worker in running:
+        code = worker["process"].wait()
+        worker["log"].close()
+        returncode = returncode or code
+        results.extend(read_junit(worker))
+        print(f"Worker {worker['index']} finished (exit code: {code}), "
+              f"log: {worker['report_dir']}/output.log")
+
+    # Report in suite order regardless of which worker ran a test
+    order = {nodeid: position for position, nodeid in enumerate(tests)}
+    results.sort(key=lambda r: order.get(r["nodeid"], len(order)))
+
+    save_durations(history, results)
+
+    # Compare the page timings of all shards against previous builds at once
+    if baseline is not None:
+        baseline.load_samples([worker["report_dir"] for worker in running])
+        baseline.evaluate()
+        if baseline.failed:
+            returncode = returncode or 1
+
+    report_path = os.path.join(REPORT_DIR, "test_report.html")
+    write_merged_report(results, running, report_path,
+                        baseline.trend_html() if baseline is not None and baseline.history else "")
+
+    coverage = None
+    if js_coverage:
+        coverage = write_reports(
+            os.path.join(REPORT_DIR, COVERAGE_DIR),
+            [os.path.join(worker["report_dir"], COVERAGE_DIR) for worker in running]
+        )
+
+    print()
+    print("=" * 70)
+    if returncode == 0:
+        print("✓ All tests passed successfully!")
+    else:
+        print(f"⚠ Some tests failed (exit code: {returncode})")
+    print("=" * 70)
+    print()
+    print(f"Test report generated: {report_path}")
+    if coverage is not None:
+        print(f"JS coverage: {coverage:.1f}% of src/ lines ({REPORT_DIR}/{COVERAGE_DIR}/index.html)")
+    if baseline is not None and baseline.samples:
+        print()
+        for line in baseline.summary_lines():
+            print(line)
+    if record_impact:
+        update_impact_index([worker["report_dir"] for worker in running], started)
+    print()
+
+    return returncode
+
+
+def update_impact_index(report_dirs, started):
+    """Merge the endpoints and coverage of a run started at `started` into INDEX_FILE"""
+    endpoints = load_endpoints([os.path.join(d, IMPACT_DIR) for d in report_dirs])
+    if not endpoints:
+        print("Impact index not updated: no endpoints were recorded")
+        return
+    files = None
+    coverage_path = os.path.join(REPORT_DIR, COVERAGE_DIR, "tests.json")
+    try:
+        # A tests.json older than the run belongs to an earlier one
+        if os.path.getmtime(coverage_path) >= started:
+            with open(coverage_path) as f:
+                files = json.load(f)
+    except (OSError, ValueError):
+        pass
+    if files is None:
+        print("No JS coverage for this run, keeping the frontend files already in the index")
+
+    index = ImpactIndex(INDEX_FILE)
+    index.update(endpoints, files, commit=head_commit())
+    index.prune(collect_tests())
+    index.save()
+    print(f"Impact index updated for {len(endpoints)} tests: {INDEX_FILE}")
+
+
+def select_tests(base, smoke):
+    """Node ids affected by changes since base; None to run the whole suite"""
+    index = ImpactIndex(INDEX_FILE)
+    if not index.tests:
+        print(f"No impact index at {INDEX_FILE}, running all tests "
+              "(build one with --update-impact-index)")
+        return None
+    try:
+        changed = changed_files(base)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not diff against {base} ({e}), running all tests")
+        return None
+
+    tests = collect_tests()
+    selected = index.select(changed, tests, [s for s in smoke.split(",") if s])
+    print(f"{len(changed)} files changed since {base}; "
+          f"running {len(selected)} of {len(tests)} tests "
+          f"(index built at {(index.commit or 'unknown commit')[:10]})")
+    for nodeid, reason in selected.items():
+        print(f"  {nodeid}  ({reason})")
+    print()
+    return list(selected)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the FoodHub Selenium test suite")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of parallel pytest processes, each with its own browser"
+    )
+    parser.add_argument(
+        "--js-coverage", action="store_true",
+        help="collect frontend JS coverage through CDP and write lcov/HTML reports"
+    )
+    parser.add_argument(
+        "--update-impact-index", action="store_true",
+        help=f"record the files and endpoints each test touches into {INDEX_FILE} "
+             "(implies --js-coverage)"
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="run only tests affected by changes since a git ref, plus the smoke set"
+    )
+    parser.add_argument(
+        "--smoke", default=os.getenv("SMOKE_TESTS", DEFAULT_SMOKE),
+        help="comma-separated node id substrings always run with --changed-since"
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    sys.exit(run_tests())
+    args = parse_args()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    js_coverage = args.js_coverage or args.update_impact_index
+    nodeids = None
+    if args.changed_since:
+        nodeids = select_tests(args.changed_since, args.smoke)
+        if nodeids == []:
+            print("No tests affected by the changes")
+            sys.exit(0)
+    if args.workers > 1:
+        if os.getenv("DB_PROFILE") == "1":
+            print("Error: DB_PROFILE needs a single test process; run without --workers")
+            sys.exit(2)
+        if os.getenv("STANDIN_BACKEND") == "1":
+            print("Error: STANDIN_BACKEND needs a single test process; run without --workers")
+            sys.exit(2)
+        sys.exit(run_tests_parallel(args.workers, js_coverage, nodeids, args.update_impact_index))
+    sys.exit(run_tests(js_coverage, nodeids, args.update_impact_index))
@@ -0,0 +1,521 @@
+"""
+In-process stand-in for the FoodHub backend
+Implements /health and the /api/users, /api/restaurants, /api/menu and
+/api/orders contracts of backend/routes on an in-memory store, and serves
+the built React app, so the suite can run without Docker, MongoDB or Node.
+
+Not covered: socket.io notifications (/socket.io requests get a 404).
+
+Usage:
+    python standin_server.py --api-port 8080 --web-port 3000 --static ../../build
+"""
+import argparse
+import copy
+import datetime
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+from test_helpers import TestData
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ORDER_STATUSES = ["pending", "confirmed", "preparing", "ready", "delivered", "cancelled"]
+
+# Required fields and defaults of the mongoose models in backend/models
+SCHEMAS = {
+    "users": {
+        "required": ["name", "email", "phone"],
+        "defaults": {"role": "customer"},
+        "enums": {"role": ["customer", "restaurant", "admin"]},
+    },
+    "restaurants": {
+        "required": ["name", "description", "owner", "cuisineType"],
+        "defaults": {"rating": 0, "deliveryFee": 0, "minOrder": 0, "isActive": True},
+        "enums": {},
+    },
+    "menuitems": {
+        "required": ["name", "description", "price", "category", "restaurant"],
+        "defaults": {"imageUrl": "", "isAvailable": True, "prepTime": 15},
+        "enums": {},
+    },
+    "orders": {
+        "required": ["customer", "restaurant", "totalAmount", "customerPhone"],
+        "defaults": {"status": "pending", "notes": "", "items": []},
+        "enums": {"status": ORDER_STATUSES},
+    },
+}
+
+MODEL_NAMES = {"users": "User", "restaurants": "Restaurant", "menuitems": "MenuItem", "orders": "Order"}
+
+_OBJECT_ID = re.compile(r"^[0-9a-fA-F]{24}$")
+
+
+class ApiFailure(Exception):
+    """Error response with the {"message": ...} body Express sends"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _new_id():
+    # Timestamp prefix like a real ObjectId, so ids sort by creation
+    return f"{int(time.time()):08x}{uuid.uuid4().hex[:16]}"
+
+
+def _check_id(value, model):
+    if not isinstance(value, str) or not _OBJECT_ID.match(value):
+        raise ApiFailure(500, f'Cast to ObjectId failed for value "{value}" (type string) '
+                              f'at path "_id" for model "{model}"')
+
+
+class InMemoryStore:
+    """Collections of JSON documents keyed by _id, safe across request threads"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.collections = {name: {} for name in SCHEMAS}
+
+    def insert(self, collection, document):
+        """Validate like mongoose, apply defaults and timestamps, store"""
+        schema = SCHEMAS[collection]
+        document = dict(document)
+        missing = [f for f in schema["required"] if document.get(f) in (None, "")]
+        if missing:
+            raise ApiFailure(400, f"{MODEL_NAMES[collection]} validation failed: " + ", ".join(
+                f"{f}: Path `{f}` is required." for f in missing
+            ))
+        for field, allowed in schema["enums"].items():
+            if field in document and document[field] not in allowed:
+                raise ApiFailure(400, f"{MODEL_NAMES[collection]} validation failed: {field}: "
+                                      f"`{document[field]}` is not a valid enum value for path `{field}`.")
+        with self.lock:
+            if collection == "users" and any(
+                u["email"] == document["email"] for u in self.collections["users"].values()
+            ):
+                raise ApiFailure(400, f'E11000 duplicate key error collection: reactmeals.users '
+                                      f'index: email_1 dup key: {{ email: "{document["email"]}" }}')
+            document.setdefault("_id", _new_id())
+            _check_id(document["_id"], MODEL_NAMES[collection])
+            if document["_id"] in self.collections[collection]:
+                raise ApiFailure(400, f"E11000 duplicate key error collection: reactmeals.{collection} "
+                                      f"index: _id_")
+            for field, default in schema["defaults"].items():
+                document.setdefault(field, copy.deepcopy(default))
+            document.setdefault("createdAt", _now())
+            document["updatedAt"] = document["createdAt"]
+            document["__v"] = 0
+            self.collections[collection][document["_id"]] = document
+            return copy.deepcopy(document)
+
+    def get(self, collection, document_id):
+        _check_id(document_id, MODEL_NAMES[collection])
+        with self.lock:
+            document = self.collections[collection].get(document_id)
+            return copy.deepcopy(document) if document else None
+
+    def find(self, collection, **match):
+        with self.lock:
+            return [
+                copy.deepcopy(d) for d in self.collections[collection].values()
+                if all(d.get(k) == v for k, v in match.items())
+            ]
+
+    def update(self, collection, document_id, changes):
+        _check_id(document_id, MODEL_NAMES[collection])
+        with self.lock:
+            document = self.collections[collection].get(document_id)
+            if document is None:
+                return None
+            document.update({k: v for k, v in changes.items() if k != "_id"})
+            document["updatedAt"] = _now()
+            return copy.deepcopy(document)
+
+    def delete(self, collection, document_id):
+        _check_id(document_id, MODEL_NAMES[collection])
+        with self.lock:
+            return self.collections[collection].pop(document_id, None)
+
+    def clear(self):
+        with self.lock:
+            for documents in self.collections.values():
+                documents.clear()
+
+    def populate(self, document, field, collection, fields):
+        """Replace a reference by the selected fields of the referenced document"""
+        reference = document.get(field)
+        target = self.collections[collection].get(reference) if isinstance(reference, str) else None
+        if target is not None:
+            document[field] = {"_id": target["_id"], **{f: target[f] for f in fields if f in target}}
+        elif reference is not None:
+            document[field] = None
+        return document
+
+    def populate_order(self, order, customer_fields=("name", "email", "phone"), restaurant=True):
+        if customer_fields:
+            self.populate(order, "customer", "users", customer_fields)
+        if restaurant:
+            self.populate(order, "restaurant", "restaurants", ("name",))
+        for line in order.get("items", []):
+            self.populate(line, "menuItem", "menuitems", ("name", "price"))
+        return order
+
+    def seed_test_data(self):
+        """Users of TestData plus one restaurant with a menu item; returns the documents"""
+        users = {}
+        for role, user in (("customer", TestData.CUSTOMER_USER),
+                           ("restaurant", TestData.RESTAURANT_USER),
+                           ("admin", TestData.ADMIN_USER)):
+            users[role] = self.insert("users", {
+                "name": user["username"], "email": user["email"], "phone": "555-0100", "role": role,
+            })
+        restaurant = self.insert("restaurants", {
+            "name": TestData.SAMPLE_RESTAURANT["name"],
+            "description": TestData.SAMPLE_RESTAURANT["description"],
+            "cuisineType": TestData.SAMPLE_RESTAURANT["cuisine"],
+            "owner": users["restaurant"]["_id"],
+        })
+        menu_item = self.insert("menuitems", {
+            "name": TestData.SAMPLE_MENU_ITEM["name"],
+            "description": TestData.SAMPLE_MENU_ITEM["description"],
+            "price": float(TestData.SAMPLE_MENU_ITEM["price"]),
+            "category": "Mains",
+            "restaurant": restaurant["_id"],
+        })
+        return {"users": users, "restaurant": restaurant, "menu_item": menu_item}
+
+
+class StandInApi:
+    """Route table mirroring backend/server.js and backend/routes"""
+
+    def __init__(self, store):
+        self.store = store
+        self.started = time.monotonic()
+        self.routes = []
+        route = self.routes.append
+        route(("GET", r"/health", self.health))
+        route(("GET", r"/", self.root))
+        # Users
+        route(("GET", r"/api/users", self.list_users))
+        route(("POST", r"/api/users", self.create("users")))
+        route(("POST", r"/api/users/login", self.login))
+        route(("GET", r"/api/users/(?P<id>[^/]+)", self.get_one("users", "User")))
+        route(("PUT", r"/api/users/(?P<id>[^/]+)", self.update_one("users", "User")))
+        route(("DELETE", r"/api/users/(?P<id>[^/]+)", self.delete_one("users", "User")))
+        # Restaurants
+        route(("GET", r"/api/restaurants", self.list_restaurants))
+        route(("POST", r"/api/restaurants", self.create("restaurants")))
+        route(("GET", r"/api/restaurants/owner/(?P<owner>[^/]+)", self.restaurants_by_owner))
+        route(("GET", r"/api/restaurants/(?P<id>[^/]+)", self.get_restaurant))
+        route(("PUT", r"/api/restaurants/(?P<id>[^/]+)", self.update_one("restaurants", "Restaurant")))
+        route(("PATCH", r"/api/restaurants/(?P<id>[^/]+)/toggle-status",
+               self.toggle("restaurants", "Restaurant", "isActive")))
+        # Menu
+        route(("GET", r"/api/menu", self.list_menu))
+        route(("GET", r"/api/menu/restaurant/(?P<restaurant>[^/]+)", self.menu_by_restaurant))
+        route(("POST", r"/api/menu", self.create("menuitems")))
+        route(("GET", r"/api/menu/(?P<id>[^/]+)", self.get_menu_item))
+        route(("PUT", r"/api/menu/(?P<id>[^/]+)", self.update_one("menuitems", "Menu item")))
+        route(("DELETE", r"/api/menu/(?P<id>[^/]+)", self.delete_one("menuitems", "Menu item")))
+        route(("PATCH", r"/api/menu/(?P<id>[^/]+)/toggle-availability",
+               self.toggle("menuitems", "Menu item", "isAvailable")))
+        # Orders
+        route(("GET", r"/api/orders", self.list_orders))
+        route(("POST", r"/api/orders", self.create("orders")))
+        route(("GET", r"/api/orders/stats/overview", self.order_stats))
+        route(("GET", r"/api/orders/customer/(?P<customer>[^/]+)", self.orders_by_customer))
+        route(("GET", r"/api/orders/restaurant/(?P<restaurant>[^/]+)", self.orders_by_restaurant))
+        route(("GET", r"/api/orders/(?P<id>[^/]+)", self.get_order))
+        route(("PATCH", r"/api/orders/(?P<id>[^/]+)/status", self.update_order_status))
+        self.routes = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in self.routes]
+
+    def dispatch(self, method, path, body):
+        """(status, payload) for a request; None if no route matches"""
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                try:
+                    return handler(body, **match.groupdict())
+                except ApiFailure as e:
+                    return e.status, {"message": str(e)}
+        return None
+
+    # Generic handlers
+    def create(self, collection):
+        def handler(body):
+            return 201, self.store.insert(collection, body or {})
+        return handler
+
+    def get_one(self, collection, label):
+        def handler(body, id):
+            document = self.store.get(collection, id)
+            return (200, document) if document else (404, {"message": f"{label} not found"})
+        return handler
+
+    def update_one(self, collection, label):
+        def handler(body, id):
+            document = self.store.update(collection, id, body or {})
+            return (200, document) if document else (404, {"message": f"{label} not found"})
+        return handler
+
+    def delete_one(self, collection, label):
+        def handler(body, id):
+            if self.store.delete(collection, id) is None:
+                return 404, {"message": f"{label} not found"}
+            return 200, {"message": f"{label} deleted successfully"}
+        return handler
+
+    def toggle(self, collection, label, field):
+        def handler(body, id):
+            document = self.store.get(collection, id)
+            if document is None:
+                return 404, {"message": f"{label} not found"}
+            return 200, self.store.update(collection, id, {field: not document[field]})
+        return handler
+
+    # Server
+    def health(self, body):
+        return 200, {
+            "status": "OK",
+            "timestamp": _now(),
+            "uptime": time.monotonic() - self.started,
+            "database": "Connected",
+        }
+
+    def root(self, body):
+        return 200, {"message": "ReactMeals API is running!"}
+
+    # Users
+    def list_users(self, body):
+        return 200, self.store.find("users")
+
+    def login(self, body):
+        users = self.store.find("users", email=(body or {}).get("email"))
+        return (200, users[0]) if users else (404, {"message": "User not found"})
+
+    # Restaurants
+    def list_restaurants(self, body):
+        restaurants = self.store.find("restaurants", isActive=True)
+        return 200, [self.store.populate(r, "owner", "users", ("name", "email")) for r in restaurants]
+
+    def restaurants_by_owner(self, body, owner):
+        return 200, self.store.find("restaurants", owner=owner)
+
+    def get_restaurant(self, body, id):
+        restaurant = self.store.get("restaurants", id)
+        if restaurant is None:
+            return 404, {"message": "Restaurant not found"}
+        return 200, self.store.populate(restaurant, "owner", "users", ("name", "email"))
+
+    # Menu
+    def list_menu(self, body):
+        items = self.store.find("menuitems", isAvailable=True)
+        return 200, [self.store.populate(i, "restaurant", "restaurants", ("name",)) for i in items]
+
+    def menu_by_restaurant(self, body, restaurant):
+        return 200, self.store.find("menuitems", restaurant=restaurant, isAvailable=True)
+
+    def get_menu_item(self, body, id):
+        item = self.store.get("menuitems", id)
+        if item is None:
+            return 404, {"message": "Menu item not found"}
+        return 200, self.store.populate(item, "restaurant", "restaurants", ("name",))
+
+    # Orders
+    @staticmethod
+    def _newest_first(orders):
+        return sorted(orders, key=lambda o: o["createdAt"], reverse=True)
+
+    def list_orders(self, body):
+        return 200, [self.store.populate_order(o) for o in self._newest_first(self.store.find("orders"))]
+
+    def get_order(self, body, id):
+        order = self.store.get("orders", id)
+        if order is None:
+            return 404, {"message": "Order not found"}
+        return 200, self.store.populate_order(order)
+
+    def orders_by_customer(self, body, customer):
+        orders = self._newest_first(self.store.find("orders", customer=customer))
+        return 200, [self.store.populate_order(o, customer_fields=()) for o in orders]
+
+    def orders_by_restaurant(self, body, restaurant):
+        orders = self._newest_first(self.store.find("orders", restaurant=restaurant))
+        return 200, [self.store.populate_order(o, customer_fields=("name", "phone"), restaurant=False)
+                     for o in orders]
+
+    def update_order_status(self, body, id):
+        status = (body or {}).get("status")
+        if status not in ORDER_STATUSES:
+            raise ApiFailure(400, f"Validation failed: status: `{status}` is not a valid enum value "
+                                  f"for path `status`.")
+        order = self.store.update("orders", id, {"status": status})
+        if order is None:
+            return 404, {"message": "Order not found"}
+        return 200, self.store.populate_order(order)
+
+    def order_stats(self, body):
+        orders = self.store.find("orders")
+        return 200, {
+            "totalOrders": len(orders),
+            "pendingOrders": sum(1 for o in orders if o["status"] == "pending"),
+            "completedOrders": sum(1 for o in orders if o["status"] == "delivered"),
+            "totalRevenue": sum(o["totalAmount"] for o in orders if o["status"] == "delivered"),
+        }
+
+
+def _make_handler(api, static_dir):
+    """Request handler serving the API, or the React build when static_dir is set"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; with Nagle on, keep-alive
+        # responses would wait ~40 ms for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body, content_type="application/json; charset=utf-8"):
+            self.send_response(status)
+            origin = self.headers.get("Origin")
+            if origin:
+                self.send_header("Access-Control-Allow-Origin", origin)
+                self.send_header("Access-Control-Allow-Credentials", "true")
+                self.send_header("Vary", "Origin")
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _json(self, status, payload):
+            self._send(status, json.dumps(payload).encode())
+
+        def do_OPTIONS(self):
+            self.send_response(204)
+            self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin", "*"))
+            self.send_header("Access-Control-Allow-Credentials", "true")
+            self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, PATCH, DELETE")
+            self.send_header("Access-Control-Allow-Headers",
+                             self.headers.get("Access-Control-Request-Headers", "Content-Type"))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _handle(self):
+            path = unquote(urlsplit(self.path).path).rstrip("/") or "/"
+            length = int(self.headers.get("Content-Length") or 0)
+            body = None
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    return self._json(400, {"message": "Unexpected token in JSON"})
+
+            if static_dir and not path.startswith(("/api/", "/health")):
+                return self._static(path)
+            result = api.dispatch(self.command, path, body)
+            if result is None:
+                return self._send(404, f"Cannot {self.command} {path}".encode(), "text/html; charset=utf-8")
+            self._json(*result)
+
+        def _static(self, path):
+            """Files of the build; any other path gets index.html (client-side routing)"""
+            candidate = os.path.normpath(os.path.join(static_dir, path.lstrip("/")))
+            if not candidate.startswith(os.path.abspath(static_dir)) or not os.path.isfile(candidate):
+                candidate = os.path.join(static_dir, "index.html")
+            with open(candidate, "rb") as f:
+                content = f.read()
+            content_type = mimetypes.guess_type(candidate)[0] or "application/octet-stream"
+            self._send(200, content, content_type)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+    return Handler
+
+
+def find_static_dir():
+    """The React production build if there is one, else public/"""
+    for name in ("build", "public"):
+        path = os.path.join(REPO_ROOT, name)
+        if os.path.isfile(os.path.join(path, "index.html")):
+            return path
+    return None
+
+
+class StandInBackend:
+    """
+    API server and static web server on two local ports
+
+    The React build bakes REACT_APP_API_URL in at build time, so build it
+    against the api_port you start the stand-in with. Port 0 picks a free
+    port (only useful for API-only runs).
+    """
+
+    def __init__(self, api_port=0, web_port=0, static_dir=None, host="127.0.0.1"):
+        self.store = InMemoryStore()
+        self.api = StandInApi(self.store)
+        self.static_dir = os.path.abspath(static_dir or find_static_dir() or ".")
+        self.host = host
+        self.api_server = ThreadingHTTPServer((host, api_port), _make_handler(self.api, None))
+        self.web_server = ThreadingHTTPServer((host, web_port), _make_handler(self.api, self.static_dir))
+        self.api_server.daemon_threads = self.web_server.daemon_threads = True
+        self._threads = []
+
+    @property
+    def api_url(self):
+        return f"http://{self.host}:{self.api_server.server_address[1]}"
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.web_server.server_address[1]}"
+
+    def start(self):
+        for server in (self.api_server, self.web_server):
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.api_server, self.web_server):
+            server.shutdown()
+            server.server_close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the in-memory FoodHub backend stand-in")
+    parser.add_argument("--api-port", type=int, default=8080)
+    parser.add_argument("--web-port", type=int, default=3000)
+    parser.add_argument("--static", default=None, help="directory with the React build (default: build/ or public/)")
+    parser.add_argument("--no-seed", action="store_true", help="start with an empty store")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    backend = StandInBackend(args.api_port, args.web_port, args.static)
+    if not args.no_seed:
+        backend.store.seed_test_data()
+    backend.start()
+    print(f"API: {backend.api_url}  Web: {backend.base_url}  Static: {backend.static_dir}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
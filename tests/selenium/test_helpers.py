@@ -5,35 +5,142 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
+import os
 import time
 
+import locator
+from artifact_writer import ArtifactWriter
+from dom_snapshot import DomSnapshot
+from performance_log import PerformanceLog
+
+
+class PageReadiness:
+    """
+    Waits until a page signals it is ready instead of sleeping a fixed time
+
+    Signals: document.readyState, children under the React #root, network
+    idle (from the CDP performance log) and optional app-defined markers
+    (CSS selectors that must be present). Polling starts fast and backs
+    off, so a page that renders in 200 ms costs about 200 ms.
+    """
+
+    _STATE_SCRIPT = """
+        var root = document.getElementById('root');
+        var markers = arguments[0];
+        return {
+            readyState: document.readyState,
+            rootChildren: root ? root.children.length : -1,
+            missingMarkers: markers.filter(function (m) { return !document.querySelector(m); })
+        };
+    """
+
+    def __init__(self, driver, timeout=10, require_root=True, network_idle=True,
+                 markers=(), quiet_period=0.5, max_inflight=2,
+                 min_poll=0.05, max_poll=0.5):
+        self.driver = driver
+        self.timeout = timeout
+        self.require_root = require_root
+        self.network_idle = network_idle
+        self.markers = list(markers)
+        self.quiet_period = quiet_period
+        self.max_inflight = max_inflight
+        self.min_poll = min_poll
+        self.max_poll = max_poll
+
+    def pending(self):
+        """Human readable list of signals that are not satisfied yet"""
+        state = self.driver.execute_script(self._STATE_SCRIPT, self.markers)
+        waiting = []
+        if state["readyState"] != "complete":
+            waiting.append(f"document.readyState is '{state['readyState']}'")
+        if self.require_root and state["rootChildren"] <= 0:
+            waiting.append("#root has not rendered any children")
+        for marker in state["missingMarkers"]:
+            waiting.append(f"readiness marker '{marker}' not present")
+        if self.network_idle and not waiting:
+            log = PerformanceLog.for_driver(self.driver)
+            if not log.network_idle(self.quiet_period, self.max_inflight):
+                waiting.append(f"network busy ({len(log.inflight)} requests in flight)")
+        return waiting
+
+    def wait(self):
+        """Block until the page is ready; returns seconds waited"""
+        start = time.monotonic()
+        interval = self.min_poll
+        while True:
+            waiting = self.pending()
+            elapsed = time.monotonic() - start
+            if not waiting:
+                return elapsed
+            if elapsed >= self.timeout:
+                raise TimeoutException(
+                    f"Page {self.driver.current_url} not ready after {elapsed:.1f}s: "
+                    + "; ".join(waiting)
+                )
+            time.sleep(min(interval, self.timeout - elapsed))
+            interval = min(interval * 1.5, self.max_poll)
+
 
 class TestHelpers:
     """Helper class with utility methods for testing"""
     
+    @staticmethod
+    def wait_for_page_ready(driver, timeout=10, **signals):
+        """
+        Wait until the page is ready (see PageReadiness for the signals)
+        Raises TimeoutException naming the signals that never arrived
+        """
+        return PageReadiness(driver, timeout=timeout, **signals).wait()
+    
+    @staticmethod
+    def open_page(driver, url, timeout=10, **signals):
+        """Navigate to a URL and wait until it is ready"""
+        driver.get(url)
+        DomSnapshot.invalidate(driver)
+        return TestHelpers.wait_for_page_ready(driver, timeout=timeout, **signals)
+    
+    @staticmethod
+    def wait_for_json(driver, timeout=10):
+        """Wait for a raw JSON response (e.g. an API endpoint) to be displayed"""
+        return TestHelpers.wait_for_page_ready(
+            driver, timeout=timeout, require_root=False, network_idle=False
+        )
+    
+    @staticmethod
+    def snapshot(driver, refresh=False):
+        """
+        Title, inputs, buttons, links, landmarks and visible text of the
+        current page in one round-trip (see DomSnapshot)
+        Cached until the next navigation or interaction; refresh=True re-reads
+        """
+        return DomSnapshot.take(driver, refresh=refresh)
+    
     @staticmethod
     def wait_for_element(driver, by, value, timeout=10):
         """Wait for element to be present"""
-        try:
-            element = WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
-            return element
-        except TimeoutException:
+        element = locator.find_all(driver, by, value, timeout=timeout)
+        if not element:
             print(f"Element not found: {by}={value}")
             return None
+        return element[0]
     
     @staticmethod
     def wait_for_clickable(driver, by, value, timeout=10):
         """Wait for element to be clickable"""
-        try:
-            element = WebDriverWait(driver, timeout).until(
-                EC.element_to_be_clickable((by, value))
-            )
-            return element
-        except TimeoutException:
+        element = locator.find_clickable(driver, by, value, timeout=timeout)
+        if element is None:
             print(f"Element not clickable: {by}={value}")
-            return None
+        return element
+    
+    @staticmethod
+    def wait_for_absent(driver, by, value, timeout=10):
+        """Wait for element to disappear (e.g. a closed modal)"""
+        return locator.wait_absent(driver, by, value, timeout=timeout)
+    
+    @staticmethod
+    def expect_absent(driver, by, value):
+        """True if no element matches right now; never waits"""
+        return locator.expect_absent(driver, by, value)
     
     @staticmethod
     def wait_for_url_contains(driver, url_fragment, timeout=10):
@@ -51,17 +158,24 @@ class TestHelpers:
         """Safely click an element with scroll into view"""
         try:
             driver.execute_script("arguments[0].scrollIntoView(true);", element)
-            time.sleep(0.5)
+            WebDriverWait(driver, 2).until(lambda d: element.is_displayed())
             element.click()
         except Exception as e:
             print(f"Click failed: {e}")
             driver.execute_script("arguments[0].click();", element)
+        DomSnapshot.invalidate(driver)
     
     @staticmethod
     def take_screenshot(driver, filename):
         """Take screenshot for debugging"""
+        if ArtifactWriter.active is not None:
+            # Written in the background according to the run's screenshot policy
+            ArtifactWriter.active.capture(driver, filename)
+            return
         try:
-            driver.save_screenshot(f"screenshots/{filename}.png")
+            # Parallel workers write to their own folder
+            screenshot_dir = os.getenv("SCREENSHOT_DIR", "screenshots")
+            driver.save_screenshot(os.path.join(screenshot_dir, f"{filename}.png"))
             print(f"Screenshot saved: {filename}.png")
         except Exception as e:
             print(f"Screenshot failed: {e}")
@@ -69,13 +183,8 @@ class TestHelpers:
     @staticmethod
     def get_element_text(driver, by, value, timeout=5):
         """Get text from element safely"""
-        try:
-            element = WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
-            return element.text
-        except TimeoutException:
-            return ""
+        element = locator.find_all(driver, by, value, timeout=timeout)
+        return element[0].text if element else ""
 
 
 class TestData:
@@ -0,0 +1,304 @@
+"""
+Chrome performance traces per test
+Wraps a test in CDP Tracing.start/Tracing.end with the categories the
+DevTools Performance panel records, streams the trace to a gzipped file
+(load it in the Performance panel or ui.perfetto.dev) and summarises the
+main thread: scripting, layout and paint costs, long tasks and React
+commits (timed only on development or profiling builds of react-dom).
+"""
+import base64
+import gzip
+import json
+import os
+import threading
+
+import trio
+from selenium.common.exceptions import WebDriverException
+
+
+# What the DevTools Performance panel records, plus V8 samples for flamegraphs
+DEFAULT_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "disabled-by-default-devtools.timeline.stack",
+    "disabled-by-default-v8.cpu_profiler",
+    "v8.execute",
+    "blink.user_timing",
+    "loading",
+    "toplevel",
+]
+CHUNK_BYTES = 1024 * 1024
+LONG_TASK_MS = 50
+TOP = 5
+
+_TASKS = {"RunTask", "ThreadControllerImpl::RunTask"}
+COSTS = {
+    "scripting": {"EvaluateScript", "v8.compile", "v8.compileModule", "v8.evaluateModule", "FunctionCall",
+                  "TimerFire", "EventDispatch", "FireAnimationFrame", "FireIdleCallback", "RunMicrotasks",
+                  "XHRReadyStateChange", "XHRLoad", "MajorGC", "MinorGC", "V8.GCFinalizeMC"},
+    "layout": {"Layout", "UpdateLayoutTree", "UpdateLayerTree", "RecalculateStyles",
+               "ParseAuthorStyleSheet", "PrePaint", "HitTest"},
+    "paint": {"Paint", "PaintImage", "RasterTask", "CompositeLayers", "Layerize", "Commit", "DecodeImage"},
+}
+
+# Stand-in for the React DevTools hook: react-dom reports every commit to
+# it. With a hook present, development and profiling builds time each
+# render (actualDuration), which ends up in the trace as a user timing
+# measure; production builds only report that a commit happened (a mark).
+# react-refresh (react-scripts start) patches an existing hook and expects
+# its renderers Map; a real DevTools hook is chained, not replaced.
+_REACT_HOOK = """
+(function () {
+    function record(root) {
+        var duration = root && root.current && root.current.actualDuration;
+        var end = performance.now();
+        if (typeof duration === 'number') {
+            performance.measure('react commit', {start: end - duration, end: end});
+        } else {
+            performance.mark('react commit');
+        }
+    }
+    var hook = window.__REACT_DEVTOOLS_GLOBAL_HOOK__;
+    if (hook) {
+        var previous = hook.onCommitFiberRoot;
+        hook.onCommitFiberRoot = function (id, root) {
+            record(root);
+            if (previous) { return previous.apply(this, arguments); }
+        };
+        return;
+    }
+    var renderers = new Map(), nextId = 0;
+    window.__REACT_DEVTOOLS_GLOBAL_HOOK__ = {
+        supportsFiber: true,
+        renderers: renderers,
+        inject: function (renderer) { var id = ++nextId; renderers.set(id, renderer); return id; },
+        onCommitFiberRoot: function (id, root) { record(root); },
+        onCommitFiberUnmount: function () {},
+        onPostCommitFiberRoot: function () {}
+    };
+})();
+"""
+
+
+class TraceRecorder:
+    """
+    Traces one browser from start() to stop()
+
+    Tracing hands its data out through CDP events, which execute_cdp_cmd
+    cannot receive, so the trace runs over Selenium's DevTools websocket
+    in a background thread while the test drives the browser.
+    """
+
+    def __init__(self, driver, path, categories=None):
+        self.driver = getattr(driver, "wrapped_driver", driver)
+        self.path = path
+        self.categories = categories or DEFAULT_CATEGORIES
+        self.error = None
+        self.thread = None
+        self._script = None
+        self._started = threading.Event()
+        self._stop = threading.Event()
+
+    def start(self, timeout=30):
+        """Begin tracing (React commit timing applies from the next page load)"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        try:
+            self._script = self.driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": _REACT_HOOK}
+            )["identifier"]
+        except WebDriverException as e:
+            print(f"React commit timing unavailable: {e}")
+        self.thread = threading.Thread(target=trio.run, args=(self._trace,), daemon=True)
+        self.thread.start()
+        if not self._started.wait(timeout) and self.error is None:
+            self.error = TimeoutError("Tracing.start did not return")
+        return self
+
+    def stop(self, timeout=120):
+        """End tracing; returns the trace summary, None if tracing failed"""
+        if self.thread is None:
+            return None
+        self._stop.set()
+        self.thread.join(timeout)
+        finished = not self.thread.is_alive()
+        self.thread = None
+        if self._script is not None:
+            try:
+                # Pooled browsers are reused by tests that are not traced
+                self.driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                                            {"identifier": self._script})
+            except WebDriverException:
+                pass
+            self._script = None
+        if not finished:
+            # Still streaming: the file is incomplete
+            print(f"Trace {self.path} not finished after {timeout}s")
+            return None
+        if self.error is not None:
+            print(f"Trace {self.path} failed: {self.error}")
+            return None
+        try:
+            return summarize(self.path)
+        except (OSError, EOFError, ValueError, KeyError) as e:
+            print(f"Trace {self.path} could not be read: {e}")
+            return None
+
+    async def _trace(self):
+        try:
+            async with self.driver.bidi_connection() as connection:
+                session, devtools = connection.session, connection.devtools
+                complete = session.listen(devtools.tracing.TracingComplete)
+                await session.execute(devtools.tracing.start(
+                    transfer_mode="ReturnAsStream",
+                    stream_format=devtools.tracing.StreamFormat.JSON,
+                    stream_compression=devtools.tracing.StreamCompression.GZIP,
+                    trace_config=devtools.tracing.TraceConfig(
+                        record_mode="recordAsMuchAsPossible",
+                        included_categories=self.categories,
+                        excluded_categories=["*"],
+                    ),
+                ))
+                self._started.set()
+                await trio.to_thread.run_sync(self._stop.wait)
+                with trio.fail_after(120):
+                    await session.execute(devtools.tracing.end())
+                    done = await complete.receive()
+                    compressed = done.stream_compression == devtools.tracing.StreamCompression.GZIP
+                    await self._save(session, devtools, done.stream, compressed)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._started.set()
+
+    async def _save(self, session, devtools, stream, compressed):
+        """Copy the trace stream to disk chunk by chunk"""
+        with (open(self.path, "wb") if compressed else gzip.open(self.path, "wb")) as f:
+            while True:
+                base64_encoded, data, eof = await session.execute(devtools.io.read(stream, size=CHUNK_BYTES))
+                f.write(base64.b64decode(data) if base64_encoded else data.encode())
+                if eof:
+                    break
+        await session.execute(devtools.io.close(stream))
+
+
+def _renderer_threads(events):
+    """(pid, tid) of every renderer main thread, and all threads of those renderers"""
+    names = {(e["pid"], e["tid"]): e.get("args", {}).get("name")
+             for e in events if e.get("ph") == "M" and e.get("name") == "thread_name"}
+    main = {thread for thread, name in names.items() if name == "CrRendererMain"}
+    renderers = {pid for pid, _ in main}
+    return main, {thread for thread in names if thread[0] in renderers}
+
+
+def _self_times(events):
+    """Complete events with their time minus that of nested events, per thread"""
+    by_thread = {}
+    for event in events:
+        if event.get("ph") == "X" and "dur" in event:
+            by_thread.setdefault((event["pid"], event["tid"]), []).append(event)
+    for thread, thread_events in by_thread.items():
+        thread_events.sort(key=lambda e: (e["ts"], -e["dur"]))
+        stack = []
+        for event in thread_events:
+            event["self"] = event["dur"]
+            while stack and stack[-1]["ts"] + stack[-1]["dur"] <= event["ts"]:
+                stack.pop()
+            if stack:
+                stack[-1]["self"] -= event["dur"]
+            stack.append(event)
+    return by_thread
+
+
+def _detail(event):
+    data = event.get("args", {}).get("data") or event.get("args", {}).get("beginData") or {}
+    return data.get("url") or data.get("functionName") or data.get("type") or ""
+
+
+def _react_commits(events):
+    """Durations (ms) of the 'react commit' measures; None for untimed marks"""
+    begins, commits = {}, []
+    for event in events:
+        if event.get("name") != "react commit":
+            continue
+        key = (event.get("pid"), event.get("id") or json.dumps(event.get("id2")))
+        if event.get("ph") == "b":
+            begins[key] = event["ts"]
+        elif event.get("ph") == "e" and key in begins:
+            commits.append((event["ts"] - begins.pop(key)) / 1000)
+        elif event.get("ph") in ("R", "I", "i"):
+            commits.append(None)
+    return commits
+
+
+def summarize(path):
+    """Main-thread costs, long tasks and React commits of a saved trace"""
+    with gzip.open(path, "rt") as f:
+        trace = json.load(f)
+    events = trace["traceEvents"] if isinstance(trace, dict) else trace
+    timed = [e for e in events if e.get("ts")]
+    if not timed:
+        return {"trace": path, "events": 0}
+    origin = min(e["ts"] for e in timed)
+
+    main, renderer = _renderer_threads(events)
+    threads = _self_times(events)
+    summary = {
+        "trace": path,
+        "events": len(events),
+        "duration_ms": round((max(e["ts"] + e.get("dur", 0) for e in timed) - origin) / 1000, 1),
+        "top": {},
+    }
+    for cost, names in COSTS.items():
+        # Paint and raster also run on the compositor and raster threads
+        scope = renderer if cost == "paint" else main
+        matching = [e for thread in scope for e in threads.get(thread, []) if e["name"] in names]
+        summary[f"{cost}_ms"] = round(sum(e["self"] for e in matching) / 1000, 1)
+        summary["top"][cost] = [
+            {"name": e["name"], "detail": _detail(e), "at_ms": round((e["ts"] - origin) / 1000, 1),
+             "self_ms": round(e["self"] / 1000, 1)}
+            for e in sorted(matching, key=lambda e: e["self"], reverse=True)[:TOP]
+        ]
+
+    tasks = [e for thread in main for e in threads.get(thread, [])
+             if e["name"] in _TASKS and e["dur"] >= LONG_TASK_MS * 1000]
+    summary["long_tasks"] = {
+        "count": len(tasks),
+        "total_ms": round(sum(e["dur"] for e in tasks) / 1000, 1),
+        "longest": [{"at_ms": round((e["ts"] - origin) / 1000, 1), "duration_ms": round(e["dur"] / 1000, 1)}
+                    for e in sorted(tasks, key=lambda e: e["dur"], reverse=True)[:TOP]],
+    }
+
+    commits = _react_commits(events)
+    timed = [c for c in commits if c is not None]
+    summary["react_commits"] = {
+        "count": len(commits),
+        # Production builds of react-dom do not time their commits
+        "timed": len(timed),
+        "total_ms": round(sum(timed), 1),
+        "slowest_ms": round(max(timed, default=0), 1),
+        # Commits that alone miss a 60 fps frame
+        "over_16ms": sum(1 for c in timed if c > 16),
+    }
+    return summary
+
+
+def format_summary(summary):
+    """Text version of a trace summary for the test report"""
+    if not summary.get("events"):
+        return f"{summary['trace']}: empty trace"
+    commits = summary["react_commits"]
+    timing = (f"{commits['total_ms']:.0f} ms, slowest {commits['slowest_ms']:.0f} ms, "
+              f"{commits['over_16ms']} over 16 ms" if commits["timed"] else "not timed by this React build")
+    lines = [
+        f"{summary['trace']} ({summary['duration_ms']:.0f} ms traced)",
+        f"scripting {summary['scripting_ms']:.0f} ms, layout {summary['layout_ms']:.0f} ms, "
+        f"paint {summary['paint_ms']:.0f} ms",
+        f"long tasks: {summary['long_tasks']['count']} ({summary['long_tasks']['total_ms']:.0f} ms)",
+        f"React commits: {commits['count']} ({timing})",
+    ]
+    for cost, top in summary["top"].items():
+        for entry in top:
+            lines.append(f"  {cost:<10}{entry['self_ms']:>8.1f} ms at {entry['at_ms']:>8.0f} ms  "
+                         f"{entry['name']} {entry['detail'][:80]}")
+    return "\n".join(lines)